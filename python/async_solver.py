@@ -0,0 +1,223 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import multiprocessing
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Optional
+
+import metrics
+from board import Board
+from dictionary import Dictionary
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+from search_budget import CancellationToken, SearchBudget
+from solution import Solution
+from solver import solve_iter
+from turns import Turn
+
+# How often a worker sends the turns it has found.
+UPDATE_SECONDS = 0.1
+# The number of updates a worker gets ahead of a slow reader before it waits.
+MAX_QUEUED_UPDATES = 8
+# How often a waiting worker or reader checks whether the solve is over.
+POLL_SECONDS = 0.05
+
+
+class SolveUpdate:
+    """The best solutions found so far by a streaming solve, sorted by descending score."""
+
+    def __init__(self, solutions: list[Solution], is_final: bool, is_partial: bool):
+        self._solutions = solutions
+        self._is_final = is_final
+        self._is_partial = is_partial
+
+    @property
+    def solutions(self) -> list[Solution]:
+        return self._solutions
+
+    @property
+    def is_final(self) -> bool:
+        """Whether the search is over, so that no more updates follow."""
+        return self._is_final
+
+    @property
+    def is_partial(self) -> bool:
+        """Whether the search stopped at its time limit before finding every solution."""
+        return self._is_partial
+
+
+class AsyncSolver:
+    """Solves in a pool of worker processes without blocking the event loop.
+
+    The scoreboard and dictionary are sent to each worker once when the pool
+    starts. At most max_in_flight solves from each event loop run or wait in
+    the pool at a time, and further solves wait for a slot before they are
+    submitted. A slot is only freed once its worker has stopped, so that
+    cancelled solves do not pile up in the pool.
+    """
+
+    def __init__(self, scoreboard: Scoreboard, dictionary: Dictionary, workers: int = 1,
+                 max_in_flight: Optional[int] = None):
+        self._scoreboard = scoreboard
+        self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(scoreboard, dictionary))
+        # Shares the update queues and cancellation events with the workers.
+        self._manager = multiprocessing.Manager()
+        self._max_in_flight = max_in_flight if max_in_flight is not None else workers * 2
+        # An asyncio semaphore only works on one loop, so each loop that solves gets its own.
+        self._slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # Guards the count, which the pool's thread decrements as workers stop.
+        self._lock = threading.Lock()
+        self._num_in_flight = 0
+
+    @property
+    def num_in_flight(self) -> int:
+        return self._num_in_flight
+
+    async def __aenter__(self) -> AsyncSolver:
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+        self._manager.shutdown()
+
+    async def solve(self, board: Board, tiles: PlayerTiles, k: Optional[int] = None,
+                    time_limit: Optional[float] = None) -> SolveUpdate:
+        """Returns the final update of solve_async."""
+        update = SolveUpdate([], True, False)
+        async for update in self.solve_async(board, tiles, k, time_limit):
+            pass
+        return update
+
+    async def solve_async(self, board: Board, tiles: PlayerTiles, k: Optional[int] = None,
+                          time_limit: Optional[float] = None) -> AsyncIterator[SolveUpdate]:
+        """Yields the best k solutions found so far, or all of them without k, as the worker finds them.
+
+        The last update is final, and says whether the time limit cut the
+        search short. Cancelling the task, or closing the iterator early,
+        cancels the search in the worker, which stops within a few hundred
+        nodes.
+        """
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self._max_in_flight)
+        await slots.acquire()
+        updates = self._manager.Queue(MAX_QUEUED_UPDATES)
+        cancelled = self._manager.Event()
+        deadline = time.monotonic() + time_limit if time_limit is not None else None
+        try:
+            future = self._executor.submit(_solve_in_worker, board, tiles, k, deadline, updates, cancelled)
+        except BaseException:
+            slots.release()
+            raise
+        with self._lock:
+            self._num_in_flight += 1
+        future.add_done_callback(lambda _: self._release_slot(loop, slots))
+
+        solutions: list[Solution] = []
+        status = 'cancelled'
+        try:
+            while True:
+                turns = await loop.run_in_executor(None, _get_update, updates)
+                if turns is None:
+                    if future.done() and updates.empty():
+                        break
+                    continue
+                solutions.extend(Solution(board, self._scoreboard, turn) for turn in turns)
+                # The sort is stable, so that ties keep the solution found first, as in solve_top_k.
+                solutions.sort(reverse=True)
+                if k is not None:
+                    del solutions[k:]
+                yield SolveUpdate(solutions.copy(), False, False)
+            status = 'error'
+            is_partial = future.result()
+            status = 'partial' if is_partial else 'complete'
+            yield SolveUpdate(solutions, True, is_partial)
+        finally:
+            if not future.done():
+                cancelled.set()
+                future.cancel()
+            metrics.increment('async_solves_total', labels={'status': status})
+
+    def _release_slot(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore):
+        """Frees a solve's slot once its worker has stopped, from the pool's thread.
+
+        The semaphore is released on its loop's thread, unless the loop has
+        closed, in which case nothing can wait on it any more.
+        """
+        with self._lock:
+            self._num_in_flight -= 1
+        if not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(slots.release)
+            except RuntimeError:
+                # The loop closed since it was checked.
+                pass
+
+def _get_update(updates: queue.Queue) -> Optional[list[Turn]]:
+    """Waits a little for the worker's next turns, returning None if there are none yet."""
+    try:
+        return updates.get(timeout=POLL_SECONDS)
+    except queue.Empty:
+        return None
+
+
+# Set in each worker process of an AsyncSolver by _init_worker.
+_worker_scoreboard: Optional[Scoreboard] = None
+_worker_dictionary: Optional[Dictionary] = None
+
+
+def _init_worker(scoreboard: Scoreboard, dictionary: Dictionary):
+    global _worker_scoreboard, _worker_dictionary
+    _worker_scoreboard = scoreboard
+    _worker_dictionary = dictionary
+
+
+def _solve_in_worker(board: Board, tiles: PlayerTiles, k: Optional[int], deadline: Optional[float],
+                     updates: queue.Queue, cancelled) -> bool:
+    """Sends the turns found every UPDATE_SECONDS, returning whether the search stopped at the deadline.
+
+    With k, only the turns that are among the best k when found are sent.
+    """
+    if k is not None and k <= 0:
+        return False
+    token = CancellationToken(cancelled)
+    budget = SearchBudget(deadline - time.monotonic() if deadline is not None else None, token=token)
+    # A min-heap of the best k scores so far.
+    scores: list[int] = []
+    turns: list[Turn] = []
+    last_update_time = time.monotonic()
+    for solution in solve_iter(board, _worker_scoreboard, _worker_dictionary, tiles, budget=budget):
+        if k is not None:
+            if len(scores) < k:
+                heapq.heappush(scores, solution.score)
+            elif solution.score > scores[0]:
+                heapq.heapreplace(scores, solution.score)
+            else:
+                continue
+        turns.append(solution.turn)
+        if time.monotonic() - last_update_time >= UPDATE_SECONDS:
+            _put_update(updates, turns, token)
+            turns = []
+            last_update_time = time.monotonic()
+    if len(turns) > 0:
+        _put_update(updates, turns, token)
+    return budget.is_exhausted and not token.is_cancelled
+
+
+def _put_update(updates: queue.Queue, turns: list[Turn], token: CancellationToken):
+    """Waits for room in the queue, which a slow reader leaves full, unless the solve is cancelled."""
+    while not token.is_cancelled:
+        try:
+            updates.put(turns, timeout=POLL_SECONDS)
+            return
+        except queue.Full:
+            pass
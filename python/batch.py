@@ -0,0 +1,173 @@
+from __future__ import annotations
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+import metrics
+from dictionary import Dictionary
+from scoreboard import Scoreboard
+from server import parse_request, solve_request
+from solve_cache import SolveCache, get_cache_key
+
+
+def run_batch(scoreboard: Scoreboard, dictionary: Dictionary, jobs: TextIO, output: TextIO, workers: int = 1,
+              cache: Optional[SolveCache] = None):
+    """Solves one job per JSONL line and writes one JSONL result per job, in the same order.
+
+    A job is {"id": ..., "state": board state text, "tiles": "ABC*", "k": 5},
+    where "game": game file path can be given instead of "state", and "id"
+    and "k" are optional. A result is {"id": ..., "solutions": [...],
+    "seconds": ...}, or {"id": ..., "error": ...} if the job failed. Jobs
+    without an id are identified by their line number.
+
+    Results are written as soon as they are ready, and the solver output is
+    sent to stderr so that the output only has results. With more than one
+    worker, the jobs are solved in a process pool. With a cache, repeated
+    jobs are answered from it in this process.
+    """
+    start_time = time.time()
+    num_jobs = 0
+    num_errors = 0
+    for result in _solve_jobs(scoreboard, dictionary, _read_jobs(jobs), workers, cache):
+        output.write(json.dumps(result) + '\n')
+        output.flush()
+        num_jobs += 1
+        if 'error' in result:
+            num_errors += 1
+        metrics.increment('jobs_total', labels={'status': 'error' if 'error' in result else 'ok'})
+    elapsed = time.time() - start_time
+    rate = num_jobs / elapsed if elapsed > 0 else 0.0
+    print(f'Solved {num_jobs} jobs with {num_errors} errors in {elapsed:.3f} seconds ({rate:.2f} jobs/sec).',
+          file=sys.stderr)
+    if cache is not None:
+        print(f'Cache: {cache.hits} hits ({cache.disk_hits} from disk), {cache.misses} misses.', file=sys.stderr)
+
+
+def _read_jobs(jobs: TextIO) -> Iterator[tuple[int, str]]:
+    """Yields the line number and text of each non-blank line."""
+    for (line_number, line) in enumerate(jobs, start=1):
+        if line.strip() != '':
+            yield (line_number, line)
+
+
+def _solve_jobs(scoreboard: Scoreboard, dictionary: Dictionary, jobs: Iterable[tuple[int, str]],
+                workers: int, cache: Optional[SolveCache]) -> Iterator[dict]:
+    if workers <= 1:
+        for (line_number, line) in jobs:
+            yield solve_job(scoreboard, dictionary, line_number, line, cache)
+        return
+
+    # Only a few jobs per worker are submitted ahead, so that a large job file
+    # is streamed rather than read into memory, while keeping the results in order.
+    registry = metrics.get_registry()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scoreboard, dictionary)) as executor:
+        # Each entry is the future of a job, and the cache key and id of jobs that were looked up in the cache.
+        pending: deque[tuple[Future, Optional[str], Any]] = deque()
+        # The futures of the jobs being solved by cache key, which repeats of those jobs share.
+        in_flight: dict[str, Future] = {}
+        for (line_number, line) in jobs:
+            lookup = None
+            if cache is not None:
+                lookup = _look_up_job(scoreboard, dictionary, line_number, line, cache)
+            if lookup is None:
+                pending.append((executor.submit(_solve_job_in_worker, line_number, line, registry is not None),
+                                None, None))
+            else:
+                (job_id, key, solutions) = lookup
+                if solutions is not None:
+                    future: Future = Future()
+                    future.set_result(({'solutions': solutions, 'seconds': 0.0}, None))
+                elif key in in_flight:
+                    future = in_flight[key]
+                else:
+                    future = executor.submit(_solve_job_in_worker, line_number, line, registry is not None)
+                    in_flight[key] = future
+                pending.append((future, key, job_id))
+            if len(pending) >= workers * 2:
+                yield _get_job_result(*pending.popleft(), registry, cache, in_flight)
+        while pending:
+            yield _get_job_result(*pending.popleft(), registry, cache, in_flight)
+
+
+def _look_up_job(scoreboard: Scoreboard, dictionary: Dictionary, line_number: int, line: str,
+                 cache: SolveCache) -> Optional[tuple[Any, str, Optional[list[str]]]]:
+    """Returns the job's id, cache key, and solutions if they are cached.
+
+    Returns None for invalid jobs, which are left for the worker to report.
+    """
+    try:
+        job = _read_job(line)
+        _load_game(job)
+        (board, player_tiles, k) = parse_request(scoreboard, dictionary, job)
+    except (OSError, ValueError):
+        return None
+    key = get_cache_key(board, scoreboard, dictionary, player_tiles, k)
+    return (job.get('id', line_number), key, cache.get(key))
+
+
+def _get_job_result(future: Future, key: Optional[str], job_id: Any, registry: Optional[metrics.MetricsRegistry],
+                    cache: Optional[SolveCache], in_flight: dict[str, Future]) -> dict:
+    """Returns a job's result, merging the worker's metrics into this process and caching its solutions."""
+    (result, snapshot) = future.result()
+    if registry is not None and snapshot is not None:
+        registry.merge(snapshot)
+    if key is None:
+        return result
+    if in_flight.get(key) is future:
+        del in_flight[key]
+        if 'solutions' in result and not result.get('partial'):
+            cache.put(key, result['solutions'])
+    return {**result, 'id': job_id}
+
+
+def solve_job(scoreboard: Scoreboard, dictionary: Dictionary, line_number: int, line: str,
+              cache: Optional[SolveCache] = None) -> dict:
+    """Solves a single job line, returning its result."""
+    job_id = line_number
+    try:
+        job = _read_job(line)
+        job_id = job.get('id', line_number)
+        _load_game(job)
+        with redirect_stdout(sys.stderr):
+            result = solve_request(scoreboard, dictionary, job, cache)
+    except (OSError, ValueError) as e:
+        return {'id': job_id, 'error': str(e)}
+    return {'id': job_id, **result}
+
+
+def _read_job(line: str) -> dict:
+    job = json.loads(line)
+    if not isinstance(job, dict):
+        raise ValueError('Expected a JSON object.')
+    return job
+
+
+def _load_game(job: dict):
+    """Reads in the state of the job's game file, if it has one."""
+    if 'game' in job:
+        if not isinstance(job['game'], str):
+            raise ValueError('Expected "game" to be a file path.')
+        with open(job['game'], 'r') as file:
+            job['state'] = file.read()
+
+
+# Set in each worker process of _solve_jobs by _init_worker.
+_worker_scoreboard: Optional[Scoreboard] = None
+_worker_dictionary: Optional[Dictionary] = None
+
+
+def _init_worker(scoreboard: Scoreboard, dictionary: Dictionary):
+    global _worker_scoreboard, _worker_dictionary
+    _worker_scoreboard = scoreboard
+    _worker_dictionary = dictionary
+
+
+def _solve_job_in_worker(line_number: int, line: str, collect_metrics: bool) -> tuple[dict, Optional[dict]]:
+    if collect_metrics:
+        return metrics.collect(solve_job, _worker_scoreboard, _worker_dictionary, line_number, line)
+    return (solve_job(_worker_scoreboard, _worker_dictionary, line_number, line), None)
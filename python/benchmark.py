@@ -0,0 +1,222 @@
+from __future__ import annotations
+import gc
+import io
+import json
+import os
+import random
+import re
+import time
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Callable, Iterator, Optional
+
+import solver
+from board import Board
+from constants import TEST_FILE_PATTERN
+from board_analysis import BoardAnalysis
+from dictionary import Dictionary
+from gaddag import Gaddag
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+
+# Metrics that are the same on every run, so any change from the baseline is reported.
+EXACT_METRICS = ['nodes', 'lookups']
+# Metrics that vary between runs, so only increases beyond the tolerance are
+# reported. Increases smaller than the minimum change are always noise.
+MEASURED_METRICS = {'seconds': 0.01, 'peak_bytes': 64 * 1024}
+DEFAULT_TOLERANCE = 0.5
+
+# Tiles that generated positions draw their racks from, without the wildcards.
+_TILES = ('A' * 9 + 'B' * 2 + 'C' * 2 + 'D' * 4 + 'E' * 12 + 'F' * 2 + 'G' * 3 + 'H' * 2 + 'I' * 9 + 'J' + 'K'
+          + 'L' * 4 + 'M' * 2 + 'N' * 6 + 'O' * 8 + 'P' * 2 + 'Q' + 'R' * 6 + 'S' * 4 + 'T' * 6 + 'U' * 4
+          + 'V' * 2 + 'W' * 2 + 'X' + 'Y' * 2 + 'Z')
+_GENERATED_MOVES = 10
+
+
+class BenchmarkCase:
+    """A board and tiles to solve."""
+
+    def __init__(self, name: str, board: Board, tiles: PlayerTiles):
+        self._name = name
+        self._board = board
+        self._tiles = tiles
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def tiles(self) -> PlayerTiles:
+        return self._tiles
+
+
+def load_test_cases(scoreboard: Scoreboard, dictionary: Dictionary, directory: str) -> list[BenchmarkCase]:
+    cases = []
+    for filename in sorted(os.listdir(directory)):
+        match = re.match(TEST_FILE_PATTERN, filename)
+        if not match:
+            continue
+        name = match.groups()[0]
+        board = Board(scoreboard.size, dictionary)
+        with redirect_stdout(io.StringIO()):
+            board.load_state(os.path.join(directory, filename))
+        with open(os.path.join(directory, f'{name}_tiles.txt'), 'r') as file:
+            tiles = PlayerTiles(file.readline())
+        cases.append(BenchmarkCase(name, board, tiles))
+    return cases
+
+
+def generate_case(scoreboard: Scoreboard, dictionary: Dictionary, seed: int) -> BenchmarkCase:
+    """Plays the best move for random racks on an empty board, then ends with a rack with a wildcard.
+
+    The same seed and dictionary always generate the same case.
+    """
+    rng = random.Random(seed)
+    analysis = BoardAnalysis(Board(scoreboard.size, dictionary), scoreboard, dictionary)
+    with redirect_stdout(io.StringIO()):
+        for _ in range(_GENERATED_MOVES):
+            tiles = PlayerTiles(''.join(rng.choice(_TILES) for _ in range(7)))
+            solutions = solver.solve_top_k(analysis.board, scoreboard, dictionary, tiles, 1, analysis)
+            if solutions:
+                analysis = analysis.copy_and_apply_placements(solutions[0].turn.generate_placement_list())
+    tiles = PlayerTiles(''.join(rng.choice(_TILES) for _ in range(6)) + '*')
+    return BenchmarkCase(f'generated{seed}', analysis.board, tiles)
+
+
+@contextmanager
+def _count_calls(counts: dict[str, int], key: str, owner: Any, name: str) -> Iterator[None]:
+    """Counts the calls to a method while in the context."""
+    original = getattr(owner, name)
+
+    def wrapper(*args, **kwargs):
+        counts[key] += 1
+        return original(*args, **kwargs)
+
+    setattr(owner, name, wrapper)
+    try:
+        yield
+    finally:
+        setattr(owner, name, original)
+
+
+def _measure(phase: Callable[[], Any], repeat: int) -> tuple[Any, dict[str, int | float]]:
+    """Runs the phase in separate passes for time, memory and counts, so they do not skew each other.
+
+    The time is the fastest of the repeated runs. Nodes are the squares the
+    search fills or follows, and lookups are GADDAG edge and word lookups.
+    """
+    result = None
+    seconds = float('inf')
+    # Like timeit, collect garbage beforehand rather than during the timed runs.
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            result = phase()
+            seconds = min(seconds, time.perf_counter() - start_time)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    phase()
+    (_, peak_bytes) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    counts = {'nodes': 0, 'lookups': 0}
+    with _count_calls(counts, 'nodes', solver._TurnGenerator, '_after_start'), \
+            _count_calls(counts, 'nodes', solver._TurnGenerator, '_after_end'), \
+            _count_calls(counts, 'lookups', Gaddag, 'follow'), \
+            _count_calls(counts, 'lookups', Gaddag, '_walk_reversed'):
+        phase()
+    return (result, {'seconds': round(seconds, 6), 'peak_bytes': peak_bytes, **counts})
+
+
+def run_case(scoreboard: Scoreboard, dictionary: Dictionary, case: BenchmarkCase, repeat: int) -> dict:
+    """Benchmarks the phases of a solve: cross checks, turn generation and scoring."""
+    board = case.board
+    tiles = case.tiles
+    with redirect_stdout(io.StringIO()):
+        (analysis, cross_checks_metrics) = _measure(lambda: BoardAnalysis(board, scoreboard, dictionary), repeat)
+        (turns, generate_metrics) = _measure(
+            lambda: list(solver._generate_turns(board, scoreboard, dictionary, tiles, analysis)), repeat)
+        (_, score_metrics) = _measure(lambda: solver._score_turns(board, scoreboard, turns), repeat)
+    return {
+        'phases': {
+            'cross_checks': cross_checks_metrics,
+            'generate': generate_metrics,
+            'score': score_metrics,
+        },
+        'turns_generated': len(turns),
+        'turns_unique': len(set(turn.serialize() for turn in turns)),
+    }
+
+
+def run_benchmarks(scoreboard: Scoreboard, dictionary_filepath: str, omit_filepath: Optional[str], tests_directory: str,
+                   num_generated: int, repeat: int) -> dict:
+    """Benchmarks the dictionary load and every case, returning machine-readable results."""
+    with redirect_stdout(io.StringIO()):
+        (dictionary, dictionary_metrics) = _measure(lambda: Dictionary(dictionary_filepath, omit_filepath), repeat)
+    cases = load_test_cases(scoreboard, dictionary, tests_directory)
+    cases += [generate_case(scoreboard, dictionary, seed) for seed in range(1, num_generated + 1)]
+
+    results: dict[str, Any] = {'dictionary': dictionary_metrics, 'cases': {}}
+    for case in cases:
+        results['cases'][case.name] = run_case(scoreboard, dictionary, case, repeat)
+        print(format_case(case.name, results['cases'][case.name]))
+    return results
+
+
+def format_case(name: str, result: dict) -> str:
+    output = f"{name}: {result['turns_generated']} turns generated, {result['turns_unique']} unique"
+    for (phase, metrics) in result['phases'].items():
+        output += (f"\n  {phase:<12} {metrics['seconds']:>10.4f} s {metrics['peak_bytes'] / 1e6:>8.2f} MB peak"
+                   f" {metrics['nodes']:>9} nodes {metrics['lookups']:>9} lookups")
+    return output
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[str]:
+    """Returns a description of each regression from the baseline.
+
+    Node and lookup counts and turn counts must match exactly. Time and peak
+    memory regress when they grow by more than the tolerance, and by more
+    than a minimum change.
+    """
+    regressions = []
+
+    def compare(name: str, metrics: dict, baseline_metrics: dict):
+        for metric in EXACT_METRICS:
+            if metrics[metric] != baseline_metrics[metric]:
+                regressions.append(f'{name} {metric}: {baseline_metrics[metric]} -> {metrics[metric]}')
+        for (metric, min_change) in MEASURED_METRICS.items():
+            if (metrics[metric] > baseline_metrics[metric] * (1 + tolerance)
+                    and metrics[metric] - baseline_metrics[metric] > min_change):
+                regressions.append(f'{name} {metric}: {baseline_metrics[metric]} -> {metrics[metric]}')
+
+    compare('dictionary', results['dictionary'], baseline['dictionary'])
+    for (case_name, result) in results['cases'].items():
+        baseline_result = baseline['cases'].get(case_name)
+        if baseline_result is None:
+            continue
+        for key in ['turns_generated', 'turns_unique']:
+            if result[key] != baseline_result[key]:
+                regressions.append(f'{case_name} {key}: {baseline_result[key]} -> {result[key]}')
+        for (phase, metrics) in result['phases'].items():
+            compare(f'{case_name} {phase}', metrics, baseline_result['phases'][phase])
+    return regressions
+
+
+def save_results(results: dict, filepath: str):
+    with open(filepath, 'w') as file:
+        json.dump(results, file, indent=2)
+        file.write('\n')
+    print(f'Wrote {filepath}')
+
+
+def load_results(filepath: str) -> dict:
+    with open(filepath, 'r') as file:
+        return json.load(file)
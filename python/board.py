@@ -1,50 +1,148 @@
 from __future__ import annotations
 import copy
-from constants import CYAN, ENDC, RED
+import hashlib
+import random
+from constants import ALPHABET, CYAN, ENDC, MAX_BOARD_SIZE, RED
 from dictionary import Dictionary
-from enums import Direction, Shape
+from enums import Direction
 from iterators import BoardIterator
 from letter import Letter
 from placement import Placement
 from position import Position
-from range import Range
 from size import Size
 from typing import Optional, Union
 
 
+# Codes of the squares in the board array. Letters are stored as their
+# character codes, which are all greater than the empty and border codes.
+EMPTY_CODE = 0
+BORDER_CODE = 1
+
+# Shared letters for each character code, since the board only stores codes.
+_LETTERS: list[Optional[Letter]] = [None] * 256
+_WILDCARD_LETTERS: list[Optional[Letter]] = [None] * 256
+for _char in ALPHABET:
+    _LETTERS[ord(_char)] = Letter(_char)
+    _WILDCARD_LETTERS[ord(_char)] = Letter(_char, True)
+
+# A random 64-bit key for each letter, regular or wildcard, on each square of
+# the board array. The seed is fixed so that every process agrees on the hashes.
+ZOBRIST_SEED = 0x5C4A881E
+_zobrist_random = random.Random(ZOBRIST_SEED)
+_ZOBRIST_KEYS = [_zobrist_random.getrandbits(64) for _ in range((MAX_BOARD_SIZE + 2) ** 2 * 2 * len(ALPHABET))]
+
+
+def _get_zobrist_key(index: int, letter: Letter) -> int:
+    return _ZOBRIST_KEYS[(index * 2 + letter.is_wildcard) * len(ALPHABET) + ord(letter.val) - ord('A')]
+
+
 def get_chunks(value: list[Optional[Letter]]) -> list[str]:
     chunks = ''.join(map(lambda x: '-' if x is None else x.val, value)).split('-')
     return list(filter(lambda x: len(x) > 1, chunks))
 
 
 class Board:
+    """The letter tiles on the board, stored as a flat array of letter codes.
+
+    The array has a border of BORDER_CODE squares around the board, so
+    walking from a square stops at the border without a bounds check. Whether
+    each letter is a wildcard is stored in a parallel array, so copying the
+    board is just copying the two arrays.
+    """
+
     def __init__(self, size: Size, dictionary: Dictionary, state: Optional[list[list[Optional[Letter]]]] = None):
         self._size = size
         self._dictionary = dictionary
-        self._state: list[list[Optional[Letter]]] = [[None] * self._size.num_cols for _ in range(self._size.num_rows)]
+        self._stride = size.num_cols + 2
+        self._steps = {
+            Direction.LEFT: -1,
+            Direction.RIGHT: 1,
+            Direction.UP: -self._stride,
+            Direction.DOWN: self._stride,
+        }
+        self._codes = bytearray()
+        self._wildcards = bytearray()
+        self._num_tiles = 0
+        self._zobrist_hash = 0
+        self._clear()
         if state:
-            self._state = state
+            for (row, letters) in enumerate(state):
+                for (col, letter) in enumerate(letters):
+                    if letter is not None:
+                        self._set_letter(self._get_index(Position(row, col)), letter)
 
     def __str__(self):
         output = ''
-        for row in self._state:
-            output += ' '.join(map(lambda x: '-' if x is None else x.serialize(), row))
+        for row in range(self._size.num_rows):
+            output += ' '.join(map(lambda x: '-' if x is None else x.serialize(), self.get_row(row)))
             output += '\n'
         return output
 
     def __copy__(self):
-        return Board(self._size.copy(), self._dictionary, copy.deepcopy(self._state))
+        board = Board.__new__(Board)
+        board.__dict__.update(self.__dict__)
+        board._codes = self._codes[:]
+        board._wildcards = self._wildcards[:]
+        return board
 
     @property
     def size(self) -> Size:
         return self._size
 
+    @property
+    def zobrist_hash(self) -> int:
+        """A 64-bit hash of the tiles, updated as each tile is set rather than computed from the whole board.
+
+        It is the XOR of a random key for each letter on its square, so boards
+        with the same tiles have the same hash however they were filled.
+        """
+        return self._zobrist_hash
+
+    @property
+    def fingerprint(self) -> str:
+        """A digest of the size and tiles, which is the same for boards with the same tiles."""
+        return hashlib.blake2b(bytes(self._codes) + bytes(self._wildcards), digest_size=16).hexdigest()
+
+    def _clear(self):
+        num_rows = self._size.num_rows
+        num_cols = self._size.num_cols
+        self._codes = bytearray([BORDER_CODE]) * ((num_rows + 2) * self._stride)
+        self._wildcards = bytearray(len(self._codes))
+        self._num_tiles = 0
+        self._zobrist_hash = 0
+        for row in range(num_rows):
+            start = (row + 1) * self._stride + 1
+            self._codes[start:start + num_cols] = bytes(num_cols)
+
+    def _get_index(self, position: Position) -> int:
+        """Returns the index of an in bounds position in the board array."""
+        return (position.row + 1) * self._stride + position.col + 1
+
+    def _get_letter_at(self, index: int) -> Optional[Letter]:
+        if self._wildcards[index]:
+            return _WILDCARD_LETTERS[self._codes[index]]
+        return _LETTERS[self._codes[index]]
+
+    def _set_letter(self, index: int, letter: Letter):
+        self._codes[index] = ord(letter.val)
+        self._wildcards[index] = letter.is_wildcard
+        self._num_tiles += 1
+        self._zobrist_hash ^= _get_zobrist_key(index, letter)
+
+    def _walk_until_empty(self, position: Position, direction: Direction) -> int:
+        """Returns the number of contiguous filled squares after the position in the given direction."""
+        codes = self._codes
+        step = self._steps[direction]
+        index = self._get_index(position) + step
+        num_steps = 0
+        while codes[index] > BORDER_CODE:
+            index += step
+            num_steps += 1
+        return num_steps
+
     def is_empty(self) -> bool:
         """Returns whether or not there are no letter tiles on the board."""
-        for position in BoardIterator(self._size):
-            if self.get_tile(position) != '':
-                return False
-        return True
+        return self._num_tiles == 0
 
     def copy_and_apply_placements(self, placements: list[Placement]) -> Board:
         new_board = copy.copy(self)
@@ -53,33 +151,45 @@ class Board:
         return new_board
 
     def load_state(self, filepath: str):
-        self._state = []
         with open(filepath, 'r') as file:
-            for line in file.readlines():
-                if line == '':
-                    continue
-                row: list[Optional[Letter]] = []
-                for letter in line.strip().split(' '):
-                    if letter == '-':
-                        row.append(None)
-                    elif letter.isupper():
-                        row.append(Letter(letter))
-                    elif letter.islower():
-                        row.append(Letter(letter, True))
-                    else:
-                        raise ValueError(f'Invalid input letter: {letter}')
-                if len(row) != self._size.num_cols:
-                    raise ValueError(f'Expected {self._size.num_cols} columns, got {len(row)}')
-                self._state.append(row)
-            if len(self._state) != self._size.num_rows:
-                raise ValueError(f'Expected {self._size.num_rows} rows, got {len(self._state)}')
+            self._load_lines(file.readlines())
         print(f'Successfully loaded {filepath}')
 
+    def load_state_text(self, text: str):
+        """Loads a board state given in the same format as a state file."""
+        self._load_lines(text.splitlines())
+
+    def _load_lines(self, lines: list[str]):
+        self._clear()
+        num_rows = 0
+        for line in lines:
+            if line == '':
+                continue
+            row: list[Optional[Letter]] = []
+            for letter in line.strip().split(' '):
+                if letter == '-':
+                    row.append(None)
+                elif letter.isupper():
+                    row.append(Letter(letter))
+                elif letter.islower():
+                    row.append(Letter(letter, True))
+                else:
+                    raise ValueError(f'Invalid input letter: {letter}')
+            if len(row) != self._size.num_cols:
+                raise ValueError(f'Expected {self._size.num_cols} columns, got {len(row)}')
+            if num_rows < self._size.num_rows:
+                for (col, letter) in enumerate(row):
+                    if letter is not None:
+                        self._set_letter(self._get_index(Position(num_rows, col)), letter)
+            num_rows += 1
+        if num_rows != self._size.num_rows:
+            raise ValueError(f'Expected {self._size.num_rows} rows, got {num_rows}')
+
     def get_tile(self, position: Position) -> str:
-        tile = self._state[position.row][position.col]
-        if tile is None:
+        code = self._codes[self._get_index(position)]
+        if code == EMPTY_CODE:
             return ''
-        return tile.val
+        return chr(code)
 
     def get_tile_checked(self, position: Position) -> Union[None, str]:
         """Checks if the tile is within bounds, returning None if not. Otherwise returns the tile."""
@@ -88,25 +198,28 @@ class Board:
         return None
 
     def get_letter(self, position: Position) -> Optional[Letter]:
-        return self._state[position.row][position.col]
+        return self._get_letter_at(self._get_index(position))
 
     def get_letter_checked(self, position: Position) -> Optional[Letter]:
         """Checks if the tile is within bounds or is populated, returning None if not. Otherwise returns the Letter."""
         if self._size.is_within_bounds(position):
-            return self.get_letter(position)
+            return self._get_letter_at(self._get_index(position))
         return None
 
     def set_tile(self, placement: Placement):
-        if self.is_tile_filled(placement.position):
+        index = self._get_index(placement.position)
+        if self._codes[index] != EMPTY_CODE:
             raise ValueError(f"Cannot set non-empty tile: {placement.position}.")
-        self._state[placement.position.row][placement.position.col] = placement.letter
+        self._set_letter(index, placement.letter)
 
     def get_adjacent_tile(self, position: Position, direction: Direction) -> Union[None, str]:
         """Returns the value of the adjacent tile or None if the tile is out of bounds."""
-        adjacent_position = position.move(direction)
-        if self._size.is_within_bounds(adjacent_position):
-            return self.get_tile(adjacent_position)
-        return None
+        code = self._codes[self._get_index(position) + self._steps[direction]]
+        if code == BORDER_CODE:
+            return None
+        if code == EMPTY_CODE:
+            return ''
+        return chr(code)
 
     def get_adjacent_tiles_until_empty(self, position: Position, direction: Direction) -> str:
         """Traverses in the given direction until the end of the board or an empty tile.
@@ -117,53 +230,42 @@ class Board:
         This is EXCLUSIVE of the given position. i.e. The returned string starts from the
         adjacent tile.
         """
-        output = ''
-        curr_position = position.move(direction)
-        while True:
-            curr_tile = self.get_tile_checked(curr_position)
-            if curr_tile is None or curr_tile == '':
-                break
-            output += curr_tile
-            curr_position = curr_position.move(direction)
-        if direction == Direction.LEFT or direction == Direction.UP:
-            return output[::-1]
-        return output
+        return ''.join(letter.val for letter in self.get_adjacent_letters_until_empty(position, direction))
+
+    def get_adjacent_letters_until_empty(self, position: Position, direction: Direction) -> list[Letter]:
+        """Same as get_adjacent_tiles_until_empty, but returns the letters instead of a string."""
+        step = self._steps[direction]
+        index = self._get_index(position)
+        letters = [self._get_letter_at(index + step * i) for i in range(1, self._walk_until_empty(position, direction) + 1)]
+        if step < 0:
+            return letters[::-1]
+        return letters
 
     def get_last_non_empty_tile(self, position: Position, direction: Direction) -> Position:
         """Gets the N-most tile that is non-empty and contiguous from the given position."""
-        curr_position = position
-        while True:
-            next_position = curr_position.move(direction)
-            if not self._size.is_within_bounds(next_position) or self.is_tile_empty(next_position):
-                return curr_position
-            curr_position = next_position
+        return position.move(direction, self._walk_until_empty(position, direction))
 
     def get_next_empty_tile(self, position: Position, direction: Direction) -> None | Position:
         """Returns the next empty tile in the given direction. Returns None if no empty tiles exist."""
-        curr_position = position
-        while True:
-            new_position = curr_position.move(direction)
-            if not self._size.is_within_bounds(new_position):
-                return None
-            if self.is_tile_empty(new_position):
-                return new_position
-            curr_position = new_position
+        num_steps = self._walk_until_empty(position, direction) + 1
+        if self._codes[self._get_index(position) + self._steps[direction] * num_steps] == BORDER_CODE:
+            return None
+        return position.move(direction, num_steps)
 
     def are_adjacent_tiles_empty(self, position: Position) -> bool:
-        for direction in Direction:
-            tile = self.get_adjacent_tile(position, direction)
-            if tile is not None and tile != '':
-                return False
-        return True
+        return not self.is_any_adjacent_tile_filled(position)
 
     def is_tile_empty(self, position: Position) -> bool:
-        return self.get_tile(position) == ''
+        return self._codes[self._get_index(position)] == EMPTY_CODE
 
     def is_tile_filled(self, position: Position) -> bool:
-        return self.get_tile(position) != ''
+        return self._codes[self._get_index(position)] != EMPTY_CODE
 
     def is_any_adjacent_tile_filled(self, position: Position) -> bool:
-        return not self.are_adjacent_tiles_empty(position)
+        codes = self._codes
+        index = self._get_index(position)
+        return (codes[index - 1] > BORDER_CODE or codes[index + 1] > BORDER_CODE
+                or codes[index - self._stride] > BORDER_CODE or codes[index + self._stride] > BORDER_CODE)
 
     def is_state_valid(self) -> tuple[bool, list[str]]:
         # Check that all tiles are next to at least one other tile.
@@ -172,8 +274,8 @@ class Board:
                 return (False, [])
         chunks = []
         # Check rows.
-        for row in self._state:
-            chunks.extend(get_chunks(row))
+        for row_num in range(self._size.num_rows):
+            chunks.extend(get_chunks(self.get_row(row_num)))
         # Check columns.
         for col_num in range(self._size.num_cols):
             chunks.extend(get_chunks(self.get_column(col_num)))
@@ -195,39 +297,14 @@ class Board:
                 positions.append(position)
         return positions
 
-    def get_word_from_placement(self, placement: Placement, shape: Shape) -> tuple[str, Range]:
-        """Assumes the given placement and returns the word formed with the given shape."""
-        if shape == Shape.HORIZONTAL:
-            start = self.get_last_non_empty_tile(placement.position, Direction.LEFT)
-            end = self.get_last_non_empty_tile(placement.position, Direction.RIGHT)
-            word = ''
-            for col in range(start.col, end.col + 1):
-                position = Position(placement.position.row, col)
-                tile = self.get_tile(position)
-                if tile == '':
-                    word += placement.letter.val
-                else:
-                    word += tile
-            return (word, Range(start, end))
-        if shape == Shape.VERTICAL:
-            start = self.get_last_non_empty_tile(placement.position, Direction.UP)
-            end = self.get_last_non_empty_tile(placement.position, Direction.DOWN)
-            word = ''
-            for row in range(start.row, end.row + 1):
-                position = Position(row, placement.position.col)
-                tile = self.get_tile(position)
-                if tile == '':
-                    word += placement.letter.val
-                else:
-                    word += tile
-            return (word, Range(start, end))
-        raise RuntimeError(f'Invalid shape: {shape}')
+    def get_row(self, index) -> list[Optional[Letter]]:
+        start = self._get_index(Position(index, 0))
+        return [self._get_letter_at(i) for i in range(start, start + self._size.num_cols)]
 
     def get_column(self, index) -> list[Optional[Letter]]:
-        col = []
-        for row in self._state:
-            col.append(row[index])
-        return col
+        start = self._get_index(Position(0, index))
+        end = start + self._size.num_rows * self._stride
+        return [self._get_letter_at(i) for i in range(start, end, self._stride)]
 
     def save(self, filepath: str):
         with open(filepath, 'w') as file:
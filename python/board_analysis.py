@@ -0,0 +1,73 @@
+from __future__ import annotations
+import copy
+
+from board import Board
+from cross_checks import CrossChecks
+from dictionary import Dictionary
+from enums import Direction, Shape
+from placement import Placement
+from position import Position
+from scoreboard import Scoreboard
+
+
+class BoardAnalysis:
+    """The anchors and cross checks of a board, which are carried over from turn to turn.
+
+    The anchors are the empty squares next to a tile, where every turn must
+    place at least one tile. Placing a turn's tiles only changes the cross
+    checks of the empty squares at either end of the words through the new
+    tiles, and only adds anchors next to the new tiles, so only those squares
+    are recomputed rather than the whole board.
+    """
+
+    def __init__(self, board: Board, scoreboard: Scoreboard, dictionary: Dictionary):
+        self._board = board
+        self._scoreboard = scoreboard
+        self._dictionary = dictionary
+        self._cross_checks = CrossChecks(board, scoreboard, dictionary)
+        self._anchors = set(board.get_first_tile_positions())
+
+    @property
+    def board(self) -> Board:
+        return self._board
+
+    @property
+    def cross_checks(self) -> CrossChecks:
+        return self._cross_checks
+
+    def get_anchors(self) -> list[Position]:
+        """Returns the anchors from left to right, top to bottom."""
+        # For an empty board, any word must use the star tile.
+        if self._board.is_empty():
+            return [self._scoreboard.get_star_position()]
+        return sorted(self._anchors)
+
+    def copy_and_apply_placements(self, placements: list[Placement]) -> BoardAnalysis:
+        """Returns the analysis of the board after the placements, leaving this one unchanged."""
+        analysis = BoardAnalysis.__new__(BoardAnalysis)
+        analysis._board = self._board.copy_and_apply_placements(placements)
+        analysis._scoreboard = self._scoreboard
+        analysis._dictionary = self._dictionary
+        analysis._cross_checks = copy.copy(self._cross_checks)
+        analysis._anchors = set(self._anchors)
+        analysis._update(placements)
+        return analysis
+
+    def _update(self, placements: list[Placement]):
+        board = self._board
+        squares: set[tuple[Position, Shape]] = set()
+        for placement in placements:
+            position = placement.position
+            self._anchors.discard(position)
+            for direction in [Direction.LEFT, Direction.RIGHT, Direction.UP, Direction.DOWN]:
+                if board.get_adjacent_tile(position, direction) == '':
+                    self._anchors.add(position.move(direction))
+            for shape in [Shape.HORIZONTAL, Shape.VERTICAL]:
+                # The square itself is now filled, so its cross checks are cleared.
+                squares.add((position, shape))
+                for direction in [shape.start_direction, shape.end_direction]:
+                    end = board.get_next_empty_tile(position, direction)
+                    if end is not None:
+                        squares.add((end, shape))
+        for (position, shape) in squares:
+            self._cross_checks.update(board, self._scoreboard, self._dictionary, position, shape)
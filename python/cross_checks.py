@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import Optional
+
+from board import Board
+from constants import ALPHABET, MAX_BOARD_SIZE
+from dictionary import Dictionary
+from enums import Shape
+from iterators import BoardIterator
+from position import Position
+from scoreboard import Scoreboard
+
+ALL_LETTERS_MASK = (1 << len(ALPHABET)) - 1
+
+
+def get_letter_bit(char: str) -> int:
+    """Returns the mask bit for an uppercase letter, with A as the lowest bit."""
+    return 1 << (ord(char) - ord('A'))
+
+
+class CrossChecks:
+    """Which letters may be placed on each empty square, computed once per board.
+
+    For each empty square and each shape, the mask has a bit set for every
+    letter that forms a valid word together with the tiles already adjacent
+    to the square in that shape. A square with no adjacent tiles in that
+    shape allows every letter.
+
+    The cross score is the summed value of those adjacent tiles, or None if
+    there are no adjacent tiles and hence no word is formed.
+    """
+
+    def __init__(self, board: Board, scoreboard: Scoreboard, dictionary: Dictionary):
+        self._masks: dict[Shape, list[int]] = {}
+        self._cross_scores: dict[Shape, list[Optional[int]]] = {}
+        for shape in [Shape.HORIZONTAL, Shape.VERTICAL]:
+            self._masks[shape] = [ALL_LETTERS_MASK] * (board.size.num_rows * MAX_BOARD_SIZE)
+            self._cross_scores[shape] = [None] * (board.size.num_rows * MAX_BOARD_SIZE)
+
+        for position in BoardIterator(board.size):
+            if board.is_tile_filled(position):
+                continue
+            for shape in [Shape.HORIZONTAL, Shape.VERTICAL]:
+                self._update(board, scoreboard, dictionary, position, shape)
+
+    def __copy__(self):
+        cross_checks = CrossChecks.__new__(CrossChecks)
+        cross_checks._masks = {shape: masks[:] for (shape, masks) in self._masks.items()}
+        cross_checks._cross_scores = {shape: scores[:] for (shape, scores) in self._cross_scores.items()}
+        return cross_checks
+
+    def update(self, board: Board, scoreboard: Scoreboard, dictionary: Dictionary, position: Position, shape: Shape):
+        """Recomputes the square's mask and cross score for the shape after tiles were placed on the board."""
+        self._masks[shape][position.index] = ALL_LETTERS_MASK
+        self._cross_scores[shape][position.index] = None
+        if board.is_tile_empty(position):
+            self._update(board, scoreboard, dictionary, position, shape)
+
+    def _update(self, board: Board, scoreboard: Scoreboard, dictionary: Dictionary, position: Position, shape: Shape):
+        prefix = board.get_adjacent_letters_until_empty(position, shape.start_direction)
+        suffix = board.get_adjacent_letters_until_empty(position, shape.end_direction)
+        if len(prefix) == 0 and len(suffix) == 0:
+            return
+
+        prefix_word = ''.join(letter.val for letter in prefix)
+        suffix_word = ''.join(letter.val for letter in suffix)
+        mask = 0
+        for char in ALPHABET:
+            if dictionary.is_word(prefix_word + char + suffix_word):
+                mask |= get_letter_bit(char)
+        self._masks[shape][position.index] = mask
+        self._cross_scores[shape][position.index] = sum(
+            0 if letter.is_wildcard else scoreboard.get_letter_value(letter.val) for letter in prefix + suffix
+        )
+
+    def get_mask(self, position: Position, shape: Shape) -> int:
+        return self._masks[shape][position.index]
+
+    def has_adjacent_tiles(self, position: Position, shape: Shape) -> bool:
+        """Whether placing a letter on the square forms a word of the given shape with the adjacent tiles."""
+        return self._cross_scores[shape][position.index] is not None
+
+    def get_cross_score(self, position: Position, shape: Shape) -> Optional[int]:
+        return self._cross_scores[shape][position.index]
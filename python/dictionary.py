@@ -1,6 +1,10 @@
-from typing import Dict, Optional
+import hashlib
+import time
+from typing import Iterable, Optional, Union
 
-from util import get_all_substrings, timer
+from gaddag import Gaddag, OmittedWords
+from snapshot import Snapshot, get_snapshot_path, hash_file
+from util import timer
 from word_type import WordType
 
 
@@ -8,41 +12,112 @@ class Dictionary:
     """Loads from a dictionary file and provides utility methods.
 
     The expected file format is one word per line.
+
+    The built lexicon is compiled to a snapshot file next to the dictionary,
+    so that later loads memory map it instead of rebuilding. The snapshot is
+    rebuilt whenever the dictionary contents change.
+
+    Omitted words are not built into the lexicon, but applied over it at
+    lookup time, so changing them takes milliseconds rather than a rebuild.
     """
 
-    def __init__(self, filepath: str, omitted_words_filepath: Optional[str] = None):
-        self._words: set[str] = set()
-        self._substrings: set[str] = set()
-        self._substring_types: Dict[str, WordType] = {}
-        self._load(filepath, omitted_words_filepath)
+    def __init__(self, filepath: str, omitted_words_filepath: Optional[str] = None, use_snapshot: bool = True):
+        start_time = time.time()
+        self._snapshot_filepath = get_snapshot_path(filepath)
+        source_hash = hash_file(filepath)
 
-    def _load_omitted_words(self, filepath: str) -> set[str]:
-        unique_words = set(self._read_file(filepath))
-        return unique_words
+        snapshot = Snapshot.load(self._snapshot_filepath) if use_snapshot else None
+        if snapshot is not None and snapshot.is_current(source_hash):
+            source = self._snapshot_filepath
+            self._is_snapshot_saved = True
+        else:
+            if snapshot is not None:
+                print(f"Snapshot {self._snapshot_filepath} is out of date, rebuilding.")
+            (gaddag, num_words) = self._load(filepath)
+            snapshot = Snapshot(gaddag, num_words, source_hash)
+            source = filepath
+            self._is_snapshot_saved = use_snapshot and self._save_snapshot(snapshot)
+        self._snapshot = snapshot
+        # A copy of an unsaved snapshot that other processes map, once one has been sent there.
+        self._shared_filepath: Optional[str] = None
+        self._gaddag: Union[Gaddag, OmittedWords] = snapshot.gaddag
+        self._omitted_words: list[str] = []
+        if omitted_words_filepath:
+            self.set_omitted_words(self._read_file(omitted_words_filepath))
 
-    @timer
-    def _load(self, filepath: str, omit_filepath: Optional[str]):
-        # Load words to omit.
-        omitted_words = (
-            self._load_omitted_words(omit_filepath) if omit_filepath else set()
-        )
+        print(f"Loaded {self.num_words} dictionary words from {source} in {(time.time() - start_time):.3f} seconds.")
+
+    @property
+    def version(self) -> str:
+        """A digest of the dictionary contents and the omitted words that the lexicon answers for."""
+        omitted_words = "\n".join(self._omitted_words).encode()
+        return hashlib.sha256(self._snapshot.source_hash + hashlib.sha256(omitted_words).digest()).hexdigest()
+
+    @property
+    def num_words(self) -> int:
+        return self._snapshot.num_words - len(self._omitted_words)
+
+    @property
+    def omitted_words(self) -> list[str]:
+        """The omitted words that are in the dictionary, sorted."""
+        return self._omitted_words
+
+    def set_omitted_words(self, words: Iterable[str]):
+        """Omits the given words from every later lookup, replacing any words omitted before.
+
+        Substrings that are only part of omitted words are no longer found
+        either. Words that are not in the dictionary are ignored.
+        """
+        base = self._snapshot.gaddag
+        overlay = OmittedWords(base, (word.strip().upper() for word in words))
+        self._omitted_words = overlay.words
+        self._gaddag = overlay if len(overlay.words) > 0 else base
 
+    @timer
+    def _load(self, filepath: str) -> tuple[Gaddag, int]:
         # Load the words.
-        for word in self._read_file(filepath):
-            if word not in omitted_words and word not in self._words:
-                self._words.add(word)
+        words = set(self._read_file(filepath))
+        words.discard("")
+
+        # Build the lexicon that answers substring and word queries.
+        gaddag = Gaddag.from_words(words)
+
+        print(f"Built a GADDAG with {gaddag.num_nodes} nodes and {gaddag.num_edges} edges.")
+        return (gaddag, len(words))
+
+    def _save_snapshot(self, snapshot: Snapshot) -> bool:
+        try:
+            snapshot.save(self._snapshot_filepath)
+            print(f"Wrote {self._snapshot_filepath}")
+            return True
+        except OSError as e:
+            print(f"Unable to write {self._snapshot_filepath}: {e}")
+            return False
 
-        # Generate the substrings.
-        for word in self._words:
-            self._substrings.update(get_all_substrings(word))
+    def __getstate__(self):
+        """When sent to another process, the snapshot file is mapped there instead of sending the lexicon.
 
-        # Preprocess all the substrings.
-        for substring in self._substrings:
-            is_substring = True
-            is_word = substring in self._words
-            self._substring_types[substring] = WordType(is_substring, is_word)
+        If the snapshot was not saved, it is first written once to a shared
+        memory file, so that every process maps the same physical copy. The
+        omitted words are sent as a list and applied again.
+        """
+        if not self._is_snapshot_saved and self._shared_filepath is None:
+            self._shared_filepath = self._snapshot.save_shared()
+        state = self.__dict__.copy()
+        del state['_snapshot']
+        del state['_gaddag']
+        state['_snapshot_hash'] = self._snapshot.source_hash
+        return state
 
-        print(f"Loaded {len(self._words)} dictionary words and {len(self._substrings)} substrings.")
+    def __setstate__(self, state):
+        source_hash = state.pop('_snapshot_hash')
+        self.__dict__.update(state)
+        filepath = self._snapshot_filepath if self._is_snapshot_saved else self._shared_filepath
+        snapshot = Snapshot.load(filepath)
+        if snapshot is None or not snapshot.is_current(source_hash):
+            raise RuntimeError(f"Snapshot {filepath} changed while in use.")
+        self._snapshot = snapshot
+        self.set_omitted_words(self._omitted_words)
 
     def _read_file(self, filepath: str) -> list[str]:
         words = []
@@ -53,11 +128,28 @@ class Dictionary:
                 words.append(line.strip().upper())
         return words
 
+    def compile(self):
+        """Writes the loaded lexicon to its snapshot file."""
+        self._is_snapshot_saved = self._save_snapshot(self._snapshot)
+
+    @property
+    def gaddag(self) -> Union[Gaddag, OmittedWords]:
+        return self._gaddag
+
+    @property
+    def snapshot_filepath(self) -> str:
+        return self._snapshot_filepath
+
+    @property
+    def shared_filepath(self) -> Optional[str]:
+        """The shared memory copy of an unsaved snapshot, once the dictionary has been sent to another process."""
+        return self._shared_filepath
+
     def is_word(self, value: str) -> bool:
-        return value in self._words
+        return self._gaddag.is_word(value)
 
     def is_substring(self, value: str) -> bool:
-        return value in self._substrings
+        return self._gaddag.is_substring(value)
 
     def check(self, value: str) -> Optional[WordType]:
-        return self._substring_types.get(value)
+        return self._gaddag.check(value)
@@ -0,0 +1,47 @@
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from board import Board
+from dictionary import Dictionary
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+
+ROOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def load_scoreboard() -> Scoreboard:
+    with redirect_stdout(io.StringIO()):
+        return Scoreboard(os.path.join(ROOT_PATH, "boards", "official.txt"), os.path.join(ROOT_PATH, "points.txt"))
+
+
+def load_dictionary() -> Dictionary:
+    """Loads the 10k dictionary without a snapshot, so that tests never write one."""
+    with redirect_stdout(io.StringIO()):
+        return Dictionary(os.path.join(ROOT_PATH, "dictionaries", "10k-dictionary.txt"), use_snapshot=False)
+
+
+def load_test_board(scoreboard: Scoreboard, dictionary: Dictionary, test_name: str) -> Board:
+    """Loads the board of a test case in testcases/."""
+    board = Board(scoreboard.size, dictionary)
+    with redirect_stdout(io.StringIO()):
+        board.load_state(os.path.join(ROOT_PATH, "testcases", f"{test_name}_state.txt"))
+    return board
+
+
+def read_test_tiles(test_name: str) -> PlayerTiles:
+    with open(os.path.join(ROOT_PATH, "testcases", f"{test_name}_tiles.txt"), "r") as file:
+        return PlayerTiles(file.readline())
+
+
+class FixtureTestCase(unittest.TestCase):
+    """Loads the official scoreboard and the 10k dictionary once per test class."""
+
+    scoreboard: Scoreboard
+    dictionary: Dictionary
+
+    @classmethod
+    def setUpClass(cls):
+        cls.scoreboard = load_scoreboard()
+        cls.dictionary = load_dictionary()
@@ -0,0 +1,328 @@
+from __future__ import annotations
+from array import array
+from mmap import mmap
+from typing import BinaryIO, Callable, Iterable, Optional, Union
+
+from word_type import WordType
+
+# Marks the boundary between the reversed prefix and the suffix of a word.
+SEPARATOR = '>'
+SEPARATOR_CODE = ord(SEPARATOR)
+
+# Single byte search keys, indexed by character code. Searching for bytes
+# rather than ints lets the labels live in either a bytes object or an mmap.
+_KEYS = tuple(bytes([code]) for code in range(256))
+
+_ITEM_SIZE = array('I').itemsize
+
+# Shared results for check(), since every path in the graph is a substring.
+SUBSTRING = WordType(True, False)
+WORD = WordType(True, True)
+
+
+class Gaddag:
+    """A minimized GADDAG over a list of words, stored in flat arrays.
+
+    Every word W is stored once per split point as REV(PREFIX) + '>' + SUFFIX,
+    e.g. 'CAT' is stored as 'C>AT', 'AC>T' and 'TAC>'. Any substring S of a
+    word can therefore be found by walking REV(S) from the root, and S is a
+    word if the node reached after also walking '>' is final.
+
+    Nodes are numbered so that the root is the last node. The outgoing edges
+    of node N are at indices offsets[N] to offsets[N + 1] of the labels and
+    targets arrays, where labels holds the character code of each edge.
+
+    counts[N] is the number of paths from node N to a final node, which is
+    the number of entries that continue the string that reached N. It lets
+    an OmittedWords overlay tell when every such entry is omitted.
+
+    The arrays can be either owned by this object or be views into a memory
+    mapped snapshot (see write() and from_buffer()).
+    """
+
+    def __init__(self, labels: Union[bytes, mmap], targets: Union[array, memoryview], offsets: Union[array, memoryview],
+                 finals: Union[bytes, memoryview], counts: Union[array, memoryview, None] = None):
+        self._labels = labels
+        self._targets = targets
+        self._offsets = offsets
+        self._finals = finals
+        self._counts = counts if counts is not None else _count_paths(targets, offsets, finals)
+        self._root = len(finals) - 1
+
+    def __reduce__(self):
+        # Views into a memory mapped snapshot cannot be pickled, so copy them.
+        return (Gaddag, (bytes(self._labels[:self.num_edges]), array('I', self._targets),
+                         array('I', self._offsets), bytes(self._finals), array('I', self._counts)))
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> Gaddag:
+        """Builds a GADDAG from a list of unique, uppercase words.
+
+        The part after the separator for REV(PREFIX) + '>' is exactly the
+        state reached by PREFIX in a forward DAWG of the words. So the forward
+        DAWG is built first, and the reversed prefixes are then built on top of
+        it with their separator edges pointing into the DAWG.
+        """
+        builder = _Builder()
+        prefix_nodes: dict[str, int] = {}
+        builder.add_entries(((word, None) for word in sorted(words)), prefix_nodes.__setitem__)
+        reversed_prefixes = sorted((prefix[::-1], node) for prefix, node in prefix_nodes.items())
+        del prefix_nodes
+        builder.add_entries(reversed_prefixes)
+        return builder.finish()
+
+    @classmethod
+    def from_buffer(cls, buffer: mmap, num_nodes: int, num_edges: int) -> Gaddag:
+        """Creates a GADDAG backed by a buffer in the layout produced by write(), without copying it."""
+        view = memoryview(buffer)
+        finals = view[num_edges:num_edges + num_nodes]
+        offsets_start = _align(num_edges + num_nodes)
+        targets_start = offsets_start + (num_nodes + 1) * _ITEM_SIZE
+        offsets = view[offsets_start:targets_start].cast('I')
+        counts_start = targets_start + num_edges * _ITEM_SIZE
+        targets = view[targets_start:counts_start].cast('I')
+        counts = view[counts_start:counts_start + num_nodes * _ITEM_SIZE].cast('I')
+        return cls(buffer, targets, offsets, finals, counts)
+
+    def write(self, file: BinaryIO) -> int:
+        """Writes the arrays to the file in a layout that from_buffer() can map directly.
+
+        The labels come first, so that indices into the labels are also
+        positions in the buffer. Returns the number of bytes written.
+        """
+        num_bytes = file.write(self._labels[:self.num_edges])
+        num_bytes += file.write(self._finals[:self.num_nodes])
+        num_bytes += file.write(bytes(_align(num_bytes) - num_bytes))
+        num_bytes += file.write(self._offsets)
+        num_bytes += file.write(self._targets)
+        num_bytes += file.write(self._counts)
+        return num_bytes
+
+    @property
+    def root(self) -> int:
+        return self._root
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self._finals)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._targets)
+
+    def follow(self, node: int, char: str) -> int:
+        """Returns the node reached by following the edge labeled char, or -1 if there is none."""
+        index = self._labels.find(_KEYS[ord(char)], self._offsets[node], self._offsets[node + 1])
+        if index < 0:
+            return -1
+        return self._targets[index]
+
+    def is_final(self, node: int) -> bool:
+        return self._finals[node] == 1
+
+    def get_count(self, node: int) -> int:
+        """Returns the number of entries that continue the string that reached the node."""
+        return self._counts[node]
+
+    def _walk_reversed(self, value: str) -> int:
+        """Walks the reverse of the value from the root. Returns -1 if the path does not exist."""
+        labels = self._labels
+        targets = self._targets
+        offsets = self._offsets
+        node = self._root
+        for code in value[::-1].encode():
+            index = labels.find(_KEYS[code], offsets[node], offsets[node + 1])
+            if index < 0:
+                return -1
+            node = targets[index]
+        return node
+
+    def is_word(self, value: str) -> bool:
+        node = self._walk_reversed(value)
+        if node < 0 or value == '':
+            return False
+        node = self.follow(node, SEPARATOR)
+        return node >= 0 and self.is_final(node)
+
+    def is_substring(self, value: str) -> bool:
+        return value != '' and self._walk_reversed(value) >= 0
+
+    def check(self, value: str) -> Optional[WordType]:
+        if value == '':
+            return None
+        node = self._walk_reversed(value)
+        if node < 0:
+            return None
+        node = self.follow(node, SEPARATOR)
+        if node >= 0 and self.is_final(node):
+            return WORD
+        return SUBSTRING
+
+
+class OmittedWords:
+    """A GADDAG with some of its words omitted at lookup time, without rebuilding it.
+
+    The omitted words get a GADDAG of their own, which is walked alongside
+    the full one. Its entries are a subset of the full GADDAG's, so once the
+    two count the same entries below their nodes, every word that the string
+    so far is part of is omitted, and the path is cut off there. A final
+    node is not final if the omitted GADDAG's node is final too.
+
+    A node is the full GADDAG's node times the stride, plus one more than
+    the omitted GADDAG's node, or 0 once the string is in no omitted word.
+    So it has the same interface as a Gaddag, and the solver walks either.
+    """
+
+    def __init__(self, gaddag: Gaddag, words: Iterable[str]):
+        self._gaddag = gaddag
+        self._words = sorted(set(word for word in words if gaddag.is_word(word)))
+        self._omitted = Gaddag.from_words(self._words)
+        self._stride = self._omitted.num_nodes + 1
+        self._root = gaddag.root * self._stride + self._omitted.root + 1
+
+    @property
+    def words(self) -> list[str]:
+        """The omitted words that are in the GADDAG, sorted."""
+        return self._words
+
+    @property
+    def root(self) -> int:
+        return self._root
+
+    def follow(self, node: int, char: str) -> int:
+        """Returns the node reached by following the edge labeled char, or -1 if there is none."""
+        (node, omitted_node) = divmod(node, self._stride)
+        node = self._gaddag.follow(node, char)
+        if node < 0:
+            return -1
+        if omitted_node == 0:
+            return node * self._stride
+        omitted_node = self._omitted.follow(omitted_node - 1, char)
+        if omitted_node < 0:
+            return node * self._stride
+        if self._omitted.get_count(omitted_node) == self._gaddag.get_count(node):
+            return -1
+        return node * self._stride + omitted_node + 1
+
+    def is_final(self, node: int) -> bool:
+        (node, omitted_node) = divmod(node, self._stride)
+        return self._gaddag.is_final(node) and (omitted_node == 0 or not self._omitted.is_final(omitted_node - 1))
+
+    def _walk_reversed(self, value: str) -> int:
+        """Walks the reverse of the value from the root. Returns -1 if the path does not exist."""
+        node = self._root
+        for char in value[::-1]:
+            node = self.follow(node, char)
+            if node < 0:
+                return -1
+        return node
+
+    def is_word(self, value: str) -> bool:
+        node = self._walk_reversed(value)
+        if node < 0 or value == '':
+            return False
+        node = self.follow(node, SEPARATOR)
+        return node >= 0 and self.is_final(node)
+
+    def is_substring(self, value: str) -> bool:
+        return value != '' and self._walk_reversed(value) >= 0
+
+    def check(self, value: str) -> Optional[WordType]:
+        if value == '':
+            return None
+        node = self._walk_reversed(value)
+        if node < 0:
+            return None
+        node = self.follow(node, SEPARATOR)
+        if node >= 0 and self.is_final(node):
+            return WORD
+        return SUBSTRING
+
+
+def _count_paths(targets: Union[array, memoryview], offsets: Union[array, memoryview],
+                 finals: Union[bytes, memoryview]) -> array:
+    """Counts the paths from each node to a final node. Nodes are numbered after their children."""
+    counts = array('I', bytes(_ITEM_SIZE * len(finals)))
+    for node in range(len(finals)):
+        count = finals[node]
+        for index in range(offsets[node], offsets[node + 1]):
+            count += counts[targets[index]]
+        counts[node] = count
+    return counts
+
+
+def _align(num_bytes: int) -> int:
+    """Rounds up to the next multiple of the array item size."""
+    return -(-num_bytes // _ITEM_SIZE) * _ITEM_SIZE
+
+
+class _Builder:
+    """Builds a minimized graph from sorted entries using incremental minimization.
+
+    Nodes are only registered once all of their children are known, so a node
+    is always numbered after its children and identical nodes are shared.
+    """
+
+    def __init__(self):
+        self._register: dict[tuple, int] = {}
+        self._labels = bytearray()
+        self._targets = array('I')
+        self._offsets = array('I', [0])
+        self._finals = bytearray()
+        self._root_edges: dict[int, int] = {}
+
+    def add_entries(self, entries: Iterable[tuple[str, Optional[int]]], on_node: Optional[Callable[[str, int], None]] = None):
+        """Adds sorted (string, target) entries.
+
+        An entry without a target marks the end of the string as final. An
+        entry with a target instead ends with a separator edge to that node.
+        If given, on_node is called with each prefix and the node it reaches.
+        """
+        edges_stack: list[dict[int, int]] = [{}]
+        finals_stack = [False]
+        prev = ''
+        for value, target in entries:
+            common = 0
+            max_common = min(len(value), len(prev))
+            while common < max_common and value[common] == prev[common]:
+                common += 1
+            self._register_tail(prev, common, edges_stack, finals_stack, on_node)
+            for _ in range(len(value) - common):
+                edges_stack.append({})
+                finals_stack.append(False)
+            if target is None:
+                finals_stack[-1] = True
+            else:
+                edges_stack[-1][SEPARATOR_CODE] = target
+            prev = value
+        self._register_tail(prev, 0, edges_stack, finals_stack, on_node)
+        self._root_edges = edges_stack[0]
+
+    def _register_tail(self, prev: str, depth: int, edges_stack: list[dict[int, int]], finals_stack: list[bool],
+                       on_node: Optional[Callable[[str, int], None]]):
+        """Registers the nodes of the previous entry that are deeper than the given depth."""
+        for curr_depth in range(len(prev), depth, -1):
+            node = self._register_node(edges_stack.pop(), finals_stack.pop())
+            if on_node is not None:
+                on_node(prev[:curr_depth], node)
+            edges_stack[-1][ord(prev[curr_depth - 1])] = node
+
+    def _register_node(self, edges: dict[int, int], final: bool) -> int:
+        key = (final, *edges.items())
+        node = self._register.get(key)
+        if node is None:
+            node = len(self._finals)
+            self._register[key] = node
+            for label, target in sorted(edges.items()):
+                self._labels.append(label)
+                self._targets.append(target)
+            self._offsets.append(len(self._labels))
+            self._finals.append(final)
+        return node
+
+    def finish(self) -> Gaddag:
+        """Registers the root of the last added entries and returns the finished graph."""
+        # Clear the register first so that the root is always a new, last node.
+        self._register.clear()
+        self._register_node(self._root_edges, False)
+        return Gaddag(bytes(self._labels), self._targets, self._offsets, bytes(self._finals))
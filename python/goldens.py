@@ -0,0 +1,278 @@
+from __future__ import annotations
+import io
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from typing import Iterable, Iterator, Optional
+
+from board import Board
+from constants import ENDC, GREEN, RED
+from dictionary import Dictionary
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+from solution import Solution
+from solver import solve
+from turns import Turn
+
+GOLDEN_MAGIC = b'SCRBLGLD'
+GOLDEN_VERSION = 1
+TEXT_FORMAT = 'text'
+BINARY_FORMAT = 'binary'
+GOLDEN_EXTENSIONS = {TEXT_FORMAT: 'txt', BINARY_FORMAT: 'bin'}
+# The most extra, missing or incorrect turns listed in a failing test's report.
+MAX_DIFF_EXAMPLES = 5
+
+# Stored at the start of a binary golden: magic, version and the number of solutions.
+_HEADER = struct.Struct('<8sII')
+# Stored before the placements of each solution: its score and number of placements.
+_RECORD = struct.Struct('<HB')
+
+
+def get_turn_key(turn: Turn) -> bytes:
+    """Returns the turn's placements as a position index byte and a letter code byte each, by position.
+
+    The letter code is the ASCII of the serialized letter, which is lower case
+    for a wildcard. The key is how a turn is stored in a binary golden, and
+    is compared directly against the golden's keys.
+    """
+    placements = sorted((placement.position.index, ord(placement.letter.serialize()))
+                        for placement in turn.generate_placement_list())
+    return bytes(value for placement in placements for value in placement)
+
+
+def format_key(key: bytes) -> str:
+    """Returns the key in the placements format of a text golden."""
+    return '|'.join(f'{key[i]}{chr(key[i + 1])}' for i in range(0, len(key), 2))
+
+
+def get_golden_path(directory: str, test_name: str, golden_format: str = TEXT_FORMAT) -> str:
+    return os.path.join(directory, f'{test_name}_golden.{GOLDEN_EXTENSIONS[golden_format]}')
+
+
+def iter_golden(filepath: str) -> Iterator[tuple[bytes, int]]:
+    """Yields the key and score of each solution in a text golden, or in a binary golden if it ends in .bin."""
+    if filepath.endswith(f'.{GOLDEN_EXTENSIONS[BINARY_FORMAT]}'):
+        return _iter_binary_golden(filepath)
+    return _iter_text_golden(filepath)
+
+
+def _iter_text_golden(filepath: str) -> Iterator[tuple[bytes, int]]:
+    """Parses each "score||index letter|..." line with string splits rather than building Placements."""
+    with open(filepath, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line == '':
+                continue
+            (score, separator, placement_strings) = line.partition('||')
+            try:
+                if separator == '':
+                    raise ValueError
+                placements = sorted((int(string[:-1]), ord(string[-1])) for string in placement_strings.split('|'))
+                yield (bytes(value for placement in placements for value in placement), int(score))
+            except ValueError:
+                raise ValueError(f'Improperly formatted line: {line}') from None
+
+
+def _iter_binary_golden(filepath: str) -> Iterator[tuple[bytes, int]]:
+    with open(filepath, 'rb') as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f'Truncated golden: {filepath}')
+    (magic, version, num_solutions) = _HEADER.unpack_from(data)
+    if magic != GOLDEN_MAGIC or version != GOLDEN_VERSION:
+        raise ValueError(f'Unsupported golden format: {filepath}')
+    offset = _HEADER.size
+    for _ in range(num_solutions):
+        if offset + _RECORD.size > len(data):
+            raise ValueError(f'Truncated golden: {filepath}')
+        (score, num_placements) = _RECORD.unpack_from(data, offset)
+        offset += _RECORD.size
+        key = data[offset:offset + 2 * num_placements]
+        if len(key) != 2 * num_placements:
+            raise ValueError(f'Truncated golden: {filepath}')
+        offset += 2 * num_placements
+        yield (key, score)
+
+
+def write_golden(filepath: str, solutions: Iterable[Solution]):
+    """Writes the solutions as a text golden, or as a binary golden if the path ends in .bin."""
+    if filepath.endswith(f'.{GOLDEN_EXTENSIONS[BINARY_FORMAT]}'):
+        records = []
+        for solution in solutions:
+            key = get_turn_key(solution.turn)
+            records.append(_RECORD.pack(solution.score, len(key) // 2) + key)
+        with open(filepath, 'wb') as file:
+            file.write(_HEADER.pack(GOLDEN_MAGIC, GOLDEN_VERSION, len(records)))
+            file.write(b''.join(records))
+    else:
+        with open(filepath, 'w') as file:
+            file.writelines(solution.serialize() + '\n' for solution in solutions)
+
+
+class GoldenDiff:
+    """The differences between a test's solutions and its golden.
+
+    Extra turns were found but are not in the golden, missing turns are in
+    the golden but were not found, and incorrect turns were found with a
+    different score than the golden's. Only the first few of each are kept.
+    """
+
+    def __init__(self, test_name: str, num_turns: int, seconds: float):
+        self._test_name = test_name
+        self._num_turns = num_turns
+        self._seconds = seconds
+        self._num_extra = 0
+        self._num_missing = 0
+        self._num_incorrect = 0
+        self._examples: list[str] = []
+        self._error: Optional[str] = None
+
+    @property
+    def test_name(self) -> str:
+        return self._test_name
+
+    @property
+    def num_turns(self) -> int:
+        return self._num_turns
+
+    @property
+    def seconds(self) -> float:
+        return self._seconds
+
+    @property
+    def num_extra(self) -> int:
+        return self._num_extra
+
+    @property
+    def num_missing(self) -> int:
+        return self._num_missing
+
+    @property
+    def num_incorrect(self) -> int:
+        return self._num_incorrect
+
+    @property
+    def examples(self) -> list[str]:
+        return self._examples
+
+    @property
+    def error(self) -> Optional[str]:
+        """Why the test could not be compared, such as a missing or malformed golden."""
+        return self._error
+
+    @property
+    def is_pass(self) -> bool:
+        return self._error is None and self._num_extra == 0 and self._num_missing == 0 and self._num_incorrect == 0
+
+    def add_extra(self, key: bytes, score: int):
+        self._num_extra += 1
+        self._add_example(f'extra {score}||{format_key(key)}')
+
+    def add_missing(self, key: bytes, score: int):
+        self._num_missing += 1
+        self._add_example(f'missing {score}||{format_key(key)}')
+
+    def add_incorrect(self, key: bytes, actual_score: int, expected_score: int):
+        self._num_incorrect += 1
+        self._add_example(f'incorrect {actual_score}||{format_key(key)}, expected {expected_score}')
+
+    def set_error(self, error: str):
+        self._error = error
+
+    def _add_example(self, example: str):
+        if len(self._examples) < MAX_DIFF_EXAMPLES:
+            self._examples.append(example)
+
+
+def compare_golden(test_name: str, solutions: list[Solution], golden: Iterable[tuple[bytes, int]],
+                   seconds: float = 0.0) -> GoldenDiff:
+    """Compares the solutions against the golden's (key, score) pairs as they are read."""
+    diff = GoldenDiff(test_name, len(solutions), seconds)
+    actual = {get_turn_key(solution.turn): solution.score for solution in solutions}
+    unmatched = dict(actual)
+    for (key, expected_score) in golden:
+        actual_score = actual.get(key)
+        if actual_score is None:
+            diff.add_missing(key, expected_score)
+        elif actual_score != expected_score:
+            diff.add_incorrect(key, actual_score, expected_score)
+        unmatched.pop(key, None)
+    for (key, score) in unmatched.items():
+        diff.add_extra(key, score)
+    return diff
+
+
+def run_goldens(scoreboard: Scoreboard, dictionary: Dictionary, directory: str, test_names: list[str],
+                golden_format: str = TEXT_FORMAT, workers: int = 1, regenerate: bool = False) -> Iterator[GoldenDiff]:
+    """Solves each test case and compares it against its golden, yielding each diff as its test finishes.
+
+    With regenerate, the golden is written from the solutions instead, and
+    the diff is empty. With more than one worker, the tests are solved in a
+    process pool that gets the scoreboard and dictionary once, largest
+    golden first, so that the slowest test does not start last.
+    """
+    if workers <= 1:
+        for test_name in test_names:
+            yield _run_golden(scoreboard, dictionary, directory, test_name, golden_format, regenerate)
+        return
+
+    def get_size(test_name: str) -> int:
+        filepath = get_golden_path(directory, test_name, golden_format)
+        return os.path.getsize(filepath) if os.path.exists(filepath) else 0
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scoreboard, dictionary)) as executor:
+        futures = [executor.submit(_run_golden_in_worker, directory, test_name, golden_format, regenerate)
+                   for test_name in sorted(test_names, key=get_size, reverse=True)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def format_diff(diff: GoldenDiff) -> str:
+    if diff.error is not None:
+        return f'{RED}FAIL{ENDC} {diff.test_name}: {diff.error}'
+    if diff.is_pass:
+        return f'{GREEN}PASS{ENDC} {diff.test_name}: {diff.num_turns} turns match the golden ({diff.seconds:.2f} seconds)'
+    lines = [f'{RED}FAIL{ENDC} {diff.test_name}: {diff.num_extra} extra, {diff.num_missing} missing and {diff.num_incorrect}'
+             f' incorrect turns of {diff.num_turns} ({diff.seconds:.2f} seconds)']
+    lines.extend(f'    {example}' for example in diff.examples)
+    return '\n'.join(lines)
+
+
+def _run_golden(scoreboard: Scoreboard, dictionary: Dictionary, directory: str, test_name: str,
+                golden_format: str, regenerate: bool) -> GoldenDiff:
+    golden_file = get_golden_path(directory, test_name, golden_format)
+    start_time = time.time()
+    try:
+        board = Board(scoreboard.size, dictionary)
+        with open(os.path.join(directory, f'{test_name}_tiles.txt'), 'r') as file:
+            player_tiles = PlayerTiles(file.readline())
+        with redirect_stdout(io.StringIO()):
+            board.load_state(os.path.join(directory, f'{test_name}_state.txt'))
+            solutions = solve(board, scoreboard, dictionary, player_tiles)
+        seconds = time.time() - start_time
+        if regenerate:
+            write_golden(golden_file, solutions)
+            return GoldenDiff(test_name, len(solutions), seconds)
+        return compare_golden(test_name, solutions, iter_golden(golden_file), seconds)
+    except (OSError, ValueError) as e:
+        diff = GoldenDiff(test_name, 0, time.time() - start_time)
+        diff.set_error(str(e))
+        return diff
+
+
+# Set in each worker process of run_goldens by _init_worker.
+_worker_scoreboard: Optional[Scoreboard] = None
+_worker_dictionary: Optional[Dictionary] = None
+
+
+def _init_worker(scoreboard: Scoreboard, dictionary: Dictionary):
+    global _worker_scoreboard, _worker_dictionary
+    _worker_scoreboard = scoreboard
+    _worker_dictionary = dictionary
+
+
+def _run_golden_in_worker(directory: str, test_name: str, golden_format: str, regenerate: bool) -> GoldenDiff:
+    return _run_golden(_worker_scoreboard, _worker_dictionary, directory, test_name, golden_format, regenerate)
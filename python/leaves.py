@@ -0,0 +1,181 @@
+from __future__ import annotations
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter
+from itertools import combinations_with_replacement
+from typing import Iterable, Optional
+
+from constants import ALPHABET
+from player_tiles import PlayerTiles
+from turns import Turn
+
+LEAVES_MAGIC = b'SCRBLLVS'
+LEAVES_VERSION = 1
+# The most tiles that can be kept, since a turn places at least one of the seven.
+MAX_LEAVE_TILES = 6
+# Tiles are coded A-Z as 0-25 and the wildcard as 26, so that a wildcard sorts last.
+WILDCARD_CODE = len(ALPHABET)
+NUM_TILE_CODES = WILDCARD_CODE + 1
+# Values are stored as hundredths of a point.
+VALUE_SCALE = 100
+# The number of samples that an estimate from smaller leaves counts as.
+PRIOR_WEIGHT = 10
+
+# Stored at the start of the file: magic, version, whether the values are
+# little endian, the most tiles in a leave and the number of values. The
+# padding keeps the values aligned.
+_HEADER = struct.Struct('<8sI?3xII')
+_TILE_CODES = {char: code for (code, char) in enumerate(ALPHABET)}
+# _BINOMIALS[n][r] is n choose r.
+_BINOMIALS = [[math.comb(n, r) for r in range(MAX_LEAVE_TILES + 2)] for n in range(NUM_TILE_CODES + MAX_LEAVE_TILES)]
+# The index of the first leave with each number of tiles.
+_OFFSETS = [sum(math.comb(WILDCARD_CODE + size, size) for size in range(num_tiles))
+            for num_tiles in range(MAX_LEAVE_TILES + 2)]
+NUM_LEAVES = _OFFSETS[-1]
+
+
+def get_tile_code(tile: str) -> int:
+    return WILDCARD_CODE if tile == '*' else _TILE_CODES[tile]
+
+
+def get_leave_index(codes: Iterable[int]) -> int:
+    """Returns the position of a leave in the table, given its tile codes in ascending order.
+
+    Leaves are ordered by size, and then by the colexicographic rank of the
+    multiset, which is the rank of the combination with the i-th code
+    shifted up by i. Every multiset of up to MAX_LEAVE_TILES tiles has its
+    own index below NUM_LEAVES, so no keys are stored.
+    """
+    rank = 0
+    size = 0
+    for code in codes:
+        size += 1
+        rank += _BINOMIALS[code + size - 1][size]
+    return _OFFSETS[size] + rank
+
+
+class LeaveTable:
+    """The value of keeping each multiset of up to MAX_LEAVE_TILES tiles, indexed by get_leave_index.
+
+    A leave's value is how many more points than average the player scores
+    on their next turn after keeping those tiles.
+    """
+
+    def __init__(self, values):
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get_value(self, leave: str) -> float:
+        """Returns the value of the tiles, with * for a wildcard, in any order."""
+        return self.get_index_value(get_leave_index(sorted(get_tile_code(tile) for tile in leave)))
+
+    def get_index_value(self, index: int) -> float:
+        return self._values[index] / VALUE_SCALE
+
+    def get_rack_leaves(self, tiles: PlayerTiles) -> RackLeaves:
+        return RackLeaves(self, tiles)
+
+    @classmethod
+    def from_samples(cls, samples: Iterable[tuple[str, int]], prior_weight: int = PRIOR_WEIGHT) -> LeaveTable:
+        """Estimates the leave values from (leave, score of the player's next turn) samples.
+
+        Few leaves of five or six tiles are ever sampled, so each estimate is
+        shrunk towards value(leave - t) + value(t) - value(empty), where t is
+        its last tile, with the weight of prior_weight samples.
+        """
+        totals: dict[int, list[int]] = {}
+        num_samples = 0
+        total_score = 0
+        for (leave, score) in samples:
+            entry = totals.setdefault(get_leave_index(sorted(get_tile_code(tile) for tile in leave)), [0, 0])
+            entry[0] += 1
+            entry[1] += score
+            num_samples += 1
+            total_score += score
+        mean_score = total_score / num_samples if num_samples > 0 else 0.0
+
+        # Leaves are estimated by size, so that the smaller leaves are done first.
+        estimates = array('d', bytes(8 * NUM_LEAVES))
+        for num_tiles in range(MAX_LEAVE_TILES + 1):
+            for codes in combinations_with_replacement(range(NUM_TILE_CODES), num_tiles):
+                index = get_leave_index(codes)
+                prior = 0.0
+                if num_tiles > 1:
+                    last = codes[-1]
+                    # The index of the leave without its last tile.
+                    rest = (index - _OFFSETS[num_tiles] + _OFFSETS[num_tiles - 1]
+                            - _BINOMIALS[last + num_tiles - 1][num_tiles])
+                    prior = estimates[rest] + estimates[_OFFSETS[1] + last] - estimates[0]
+                (count, total) = totals.get(index, (0, 0))
+                estimates[index] = (total - count * mean_score + prior_weight * prior) / (count + prior_weight)
+
+        values = array('h', (max(-32768, min(32767, round(estimate * VALUE_SCALE))) for estimate in estimates))
+        return cls(values)
+
+    def save(self, filepath: str):
+        """Writes the table, replacing any existing file only once it is complete."""
+        temp_filepath = f'{filepath}.{os.getpid()}.tmp'
+        with open(temp_filepath, 'wb') as file:
+            file.write(_HEADER.pack(LEAVES_MAGIC, LEAVES_VERSION, sys.byteorder == 'little', MAX_LEAVE_TILES,
+                                    len(self._values)))
+            file.write(memoryview(self._values).cast('B'))
+        os.replace(temp_filepath, filepath)
+
+    @classmethod
+    def load(cls, filepath: str) -> Optional[LeaveTable]:
+        """Maps the table file. Returns None if it is missing or was written in an incompatible format."""
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'rb') as file:
+            if os.fstat(file.fileno()).st_size != _HEADER.size + 2 * NUM_LEAVES:
+                return None
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, is_little_endian, max_leave_tiles, num_values) = _HEADER.unpack(buffer[:_HEADER.size])
+        if (magic != LEAVES_MAGIC or version != LEAVES_VERSION or is_little_endian != (sys.byteorder == 'little')
+                or max_leave_tiles != MAX_LEAVE_TILES or num_values != NUM_LEAVES):
+            buffer.close()
+            return None
+        return cls(memoryview(buffer)[_HEADER.size:].cast('h'))
+
+
+class RackLeaves:
+    """The values of every leave of one rack, found by the tiles that a turn places.
+
+    Each kind of tile on the rack is a digit of the key, counting how many
+    of that tile are placed, so a rack has at most 2^7 keys. The values of
+    all of them are looked up once, and each turn then only adds up the
+    digits of its tiles and does one list lookup.
+    """
+
+    def __init__(self, table: LeaveTable, tiles: PlayerTiles):
+        counts = Counter([letter.val for letter in tiles.letters] + ['*'] * tiles.num_wildcards)
+        tile_counts = sorted(counts.items(), key=lambda item: get_tile_code(item[0]))
+        self._weights: dict[str, int] = {}
+        num_keys = 1
+        for (tile, count) in tile_counts:
+            self._weights[tile] = num_keys
+            num_keys *= count + 1
+        self._wildcard_weight = self._weights.get('*', 0)
+
+        self._values = [0.0] * num_keys
+        for key in range(num_keys):
+            leave = []
+            for (tile, count) in tile_counts:
+                num_placed = key // self._weights[tile] % (count + 1)
+                leave.extend([get_tile_code(tile)] * (count - num_placed))
+            # Keeping every tile is a pass, not a turn.
+            if len(leave) <= MAX_LEAVE_TILES:
+                self._values[key] = table.get_index_value(get_leave_index(leave))
+
+    def get_turn_value(self, turn: Turn) -> float:
+        """Returns the value of the tiles left on the rack after the turn."""
+        key = 0
+        for letter in turn.letters:
+            key += self._wildcard_weight if letter.is_wildcard else self._weights[letter.val]
+        return self._values[key]
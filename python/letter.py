@@ -3,15 +3,36 @@ import re
 
 LETTER_PATTERN = r"^[a-zA-Z]$"
 
+# Interned letters, keyed by the arguments they were created with.
+_LETTERS: dict[tuple[str, bool], Letter] = {}
+
 
 class Letter:
-    """Represents a single letter."""
+    """Represents a single letter.
+
+    Letters are interned, so the regex check only runs the first time each
+    letter and wildcard variant is created.
+    """
+
+    __slots__ = ('_val', '_is_wildcard')
 
-    def __init__(self, val: str, is_wildcard: bool = False) -> None:
+    def __new__(cls, val: str, is_wildcard: bool = False) -> Letter:
+        letter = _LETTERS.get((val, is_wildcard))
+        if letter is not None:
+            return letter
         if not re.match(LETTER_PATTERN, val):
             raise ValueError("Expected a single letter.")
-        self._val = val.upper()
-        self._is_wildcard = is_wildcard
+        letter = super().__new__(cls)
+        letter._val = val.upper()
+        letter._is_wildcard = bool(is_wildcard)
+        _LETTERS[(val, is_wildcard)] = letter
+        return letter
+
+    def __copy__(self):
+        return self
+
+    def __reduce__(self):
+        return (Letter, (self._val, self._is_wildcard))
 
     def __lt__(self, other: Letter) -> bool:
         """Non wildcard letters come before wildcard letters."""
@@ -22,6 +43,8 @@ class Letter:
         return self.val < other.val
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Letter):
             return NotImplemented
         return self.val == other.val and self.is_wildcard == other.is_wildcard
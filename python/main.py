@@ -1,8 +1,21 @@
 from __future__ import annotations
 import argparse
+import atexit
+import io
 import os
 import re
+import sys
+import time
+from batch import run_batch
+from benchmark import (
+    DEFAULT_TOLERANCE,
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
 from board import Board
+from contextlib import redirect_stdout
 from constants import (
     ENDC,
     GAME_FILE_PATTERN,
@@ -14,11 +27,19 @@ from constants import (
 )
 from dictionary import Dictionary
 from enums import MenuSelection
+from goldens import BINARY_FORMAT, TEXT_FORMAT, format_diff, get_golden_path, run_goldens
+from leaves import LeaveTable
+import metrics
 from placements import Placements
 from player_tiles import PlayerTiles
 from scoreboard import Scoreboard
+from search_budget import SearchBudget
+from ranker import DEFAULT_CANDIDATES, DEFAULT_PLIES, rank_moves
+from server import DEFAULT_HOST, DEFAULT_PORT, serve
+from simulator import format_summary, generate_leave_table, load_tile_counts, run_games
 from solution import Solution
-from solver import solve
+from solve_cache import DEFAULT_MAX_ENTRIES, SolveCache
+from solver import solve, solve_top_k
 from typing import Optional
 
 
@@ -46,13 +67,347 @@ def main():
     parser.add_argument(
         "--games", default="games/", help="Games directory path (default: %(default)s)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of processes to solve with (default: 1, or every core when ranking or running goldens)",
+    )
+    parser.add_argument(
+        "--metrics",
+        choices=["json", "prometheus"],
+        help="Record metrics and write them to stderr in this format on exit,"
+        " and serve them at /metrics when serving",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Number of solve results to keep in memory when serving or batching, or 0 to disable the cache"
+        " (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory to also keep solve results in, so that they are kept across runs",
+    )
+    parser.add_argument(
+        "--leaves",
+        help="Leave values file path, to rank the solutions of a game by score plus the value of the tiles kept",
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        help="Seconds to solve a game for, after which the best solutions found so far are shown",
+    )
     parser.add_argument(
         "--tests",
         default="testcases/",
         help="Test case directory path (default: %(default)s)",
     )
 
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser(
+        "compile",
+        help="Compile the dictionary snapshot and exit",
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve solve requests over localhost HTTP until interrupted",
+    )
+    serve_parser.add_argument(
+        "--host", default=DEFAULT_HOST, help="Host to listen on (default: %(default)s)"
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help="Port to listen on (default: %(default)s)",
+    )
+
+    batch_parser = subparsers.add_parser(
+        "batch",
+        help="Solve the jobs in a JSONL file and write one JSONL result per job",
+    )
+    batch_parser.add_argument(
+        "jobs",
+        nargs="?",
+        default="-",
+        help="JSONL job file path, or - for stdin (default: %(default)s)",
+    )
+    batch_parser.add_argument(
+        "--output",
+        default="-",
+        help="JSONL result file path, or - for stdout (default: %(default)s)",
+    )
+
+    simulate_parser = subparsers.add_parser(
+        "simulate",
+        help="Play games where each player makes the highest scoring move, and report the throughput",
+    )
+    simulate_parser.add_argument(
+        "--games", type=int, default=10, help="Number of games (default: %(default)s)"
+    )
+    simulate_parser.add_argument(
+        "--seed", type=int, default=1, help="Seed of the first game (default: %(default)s)"
+    )
+    simulate_parser.add_argument(
+        "--players", type=int, default=2, help="Players per game (default: %(default)s)"
+    )
+    simulate_parser.add_argument(
+        "--tiles",
+        default="tiles.txt",
+        help="Tile bag counts file path (default: %(default)s)",
+    )
+
+    leaves_parser = subparsers.add_parser(
+        "leaves",
+        help="Estimate the value of keeping each set of up to 6 tiles from simulated games, and write the table",
+    )
+    leaves_parser.add_argument(
+        "--games", type=int, default=100, help="Number of games (default: %(default)s)"
+    )
+    leaves_parser.add_argument(
+        "--seed", type=int, default=1, help="Seed of the first game (default: %(default)s)"
+    )
+    leaves_parser.add_argument(
+        "--tiles",
+        default="tiles.txt",
+        help="Tile bag counts file path (default: %(default)s)",
+    )
+    leaves_parser.add_argument(
+        "--output",
+        default="leaves.bin",
+        help="Leave values file path (default: %(default)s)",
+    )
+
+    rank_parser = subparsers.add_parser(
+        "rank",
+        help="Rank the highest scoring moves of a game by simulating the replies, within a time budget",
+    )
+    rank_parser.add_argument("game", help="Game or board state file path")
+    rank_parser.add_argument("rack", help="Player tiles, with * for a wildcard")
+    rank_parser.add_argument(
+        "--budget",
+        type=float,
+        default=5.0,
+        help="Seconds to rank within (default: %(default)s)",
+    )
+    rank_parser.add_argument(
+        "--candidates",
+        type=int,
+        default=DEFAULT_CANDIDATES,
+        help="Number of highest scoring moves to rank (default: %(default)s)",
+    )
+    rank_parser.add_argument(
+        "--plies",
+        type=int,
+        default=DEFAULT_PLIES,
+        help="Turns to simulate after each move (default: %(default)s)",
+    )
+    rank_parser.add_argument(
+        "--tiles",
+        default="tiles.txt",
+        help="Tile bag counts file path (default: %(default)s)",
+    )
+
+    benchmark_parser = subparsers.add_parser(
+        "benchmark",
+        help="Benchmark the test cases and generated positions, and compare against a baseline",
+    )
+    benchmark_parser.add_argument(
+        "--output",
+        default="benchmark.json",
+        help="Results file path (default: %(default)s)",
+    )
+    benchmark_parser.add_argument(
+        "--baseline",
+        default="benchmarks/baseline.json",
+        help="Baseline results file path (default: %(default)s)",
+    )
+    benchmark_parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the results to the baseline instead of comparing against it",
+    )
+    benchmark_parser.add_argument(
+        "--generated",
+        type=int,
+        default=3,
+        help="Number of generated positions (default: %(default)s)",
+    )
+    benchmark_parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Runs per phase, keeping the fastest time (default: %(default)s)",
+    )
+    benchmark_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed fractional increase in time and memory (default: %(default)s)",
+    )
+
+    goldens_parser = subparsers.add_parser(
+        "goldens",
+        help="Solve every test case in parallel and compare against its golden, or regenerate the goldens",
+    )
+    goldens_parser.add_argument(
+        "names",
+        nargs="*",
+        help="Test case names (default: every test case)",
+    )
+    goldens_parser.add_argument(
+        "--format",
+        choices=[TEXT_FORMAT, BINARY_FORMAT],
+        default=TEXT_FORMAT,
+        help="Golden format, where binary goldens end in .bin (default: %(default)s)",
+    )
+    goldens_parser.add_argument(
+        "--regenerate",
+        action="store_true",
+        help="Write the goldens from the solutions instead of comparing against them",
+    )
+
     args = parser.parse_args()
+    if args.metrics:
+        metrics.enable()
+        atexit.register(print_metrics, args.metrics)
+
+    if args.command == "compile":
+        Dictionary(args.dictionary, use_snapshot=False).compile()
+        return
+    if args.command == "batch":
+        # Keep stdout for the results.
+        with redirect_stdout(sys.stderr):
+            scoreboard = Scoreboard(args.board, args.points)
+            dictionary = Dictionary(args.dictionary, args.omit)
+        jobs = sys.stdin if args.jobs == "-" else open(args.jobs, "r")
+        output = sys.stdout if args.output == "-" else open(args.output, "w")
+        try:
+            run_batch(scoreboard, dictionary, jobs, output, args.workers or 1, create_cache(args))
+        finally:
+            if jobs is not sys.stdin:
+                jobs.close()
+            if output is not sys.stdout:
+                output.close()
+        return
+    if args.command == "simulate":
+        scoreboard = Scoreboard(args.board, args.points)
+        dictionary = Dictionary(args.dictionary, args.omit)
+        start_time = time.time()
+        results = run_games(
+            scoreboard,
+            dictionary,
+            load_tile_counts(args.tiles),
+            args.games,
+            args.seed,
+            args.players,
+            args.workers or 1,
+        )
+        print(format_summary(results, time.time() - start_time))
+        return
+    if args.command == "leaves":
+        scoreboard = Scoreboard(args.board, args.points)
+        dictionary = Dictionary(args.dictionary, args.omit)
+        start_time = time.time()
+        (leaves, num_samples) = generate_leave_table(
+            scoreboard,
+            dictionary,
+            load_tile_counts(args.tiles),
+            args.games,
+            args.seed,
+            args.workers or 1,
+        )
+        leaves.save(args.output)
+        print(
+            f"Estimated {len(leaves)} leave values from {num_samples} samples of {args.games} games"
+            f" in {time.time() - start_time:.2f} seconds, and wrote {args.output}"
+        )
+        return
+    if args.command == "rank":
+        scoreboard = Scoreboard(args.board, args.points)
+        dictionary = Dictionary(args.dictionary, args.omit)
+        board = Board(scoreboard.size, dictionary)
+        board.load_state(args.game)
+        start_time = time.time()
+        moves = rank_moves(
+            board,
+            scoreboard,
+            dictionary,
+            PlayerTiles(args.rack),
+            load_tile_counts(args.tiles),
+            args.budget,
+            args.candidates,
+            args.plies,
+            args.workers,
+        )
+        print(f"Ranked {len(moves)} moves in {time.time() - start_time:.2f} seconds.")
+        for move in moves:
+            spread = "no samples" if move.mean_spread is None else f"{move.mean_spread:+.1f} spread"
+            print(f"{move.value:7.1f}: {move.solution.serialize()} ({spread}, {move.num_samples} samples)")
+        return
+    if args.command == "benchmark":
+        # The goldens are generated without the omit list, so benchmark without it too.
+        with redirect_stdout(io.StringIO()):
+            scoreboard = Scoreboard(args.board, args.points)
+        results = run_benchmarks(
+            scoreboard, args.dictionary, None, args.tests, args.generated, args.repeat
+        )
+        if args.update_baseline:
+            save_results(results, args.baseline)
+            return
+        save_results(results, args.output)
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}.")
+            return
+        regressions = compare_results(results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"{RED}REGRESSION{ENDC}: {regression}")
+        if len(regressions) > 0:
+            sys.exit(1)
+        print(f"{GREEN}PASS{ENDC}: No regressions from {args.baseline}.")
+        return
+    if args.command == "goldens":
+        # The goldens are generated without the omit list.
+        with redirect_stdout(io.StringIO()):
+            scoreboard = Scoreboard(args.board, args.points)
+            dictionary = Dictionary(args.dictionary)
+        test_names = args.names or get_tests(args.tests)
+        start_time = time.time()
+        num_failed = 0
+        for diff in run_goldens(
+            scoreboard,
+            dictionary,
+            args.tests,
+            test_names,
+            args.format,
+            args.workers or os.cpu_count() or 1,
+            args.regenerate,
+        ):
+            if args.regenerate and diff.error is None:
+                print(f"Wrote {get_golden_path(args.tests, diff.test_name, args.format)} ({diff.num_turns} turns)")
+            else:
+                print(format_diff(diff))
+            if not diff.is_pass:
+                num_failed += 1
+        print(
+            f"{len(test_names) - num_failed} of {len(test_names)} tests passed"
+            f" in {time.time() - start_time:.2f} seconds."
+        )
+        if num_failed > 0:
+            sys.exit(1)
+        return
+    if args.command == "serve":
+        serve(
+            Scoreboard(args.board, args.points),
+            Dictionary(args.dictionary, args.omit),
+            args.host,
+            args.port,
+            args.workers or 1,
+            create_cache(args),
+        )
+        return
 
     selection = select_menu_option()
     if selection == MenuSelection.NEW_GAME:
@@ -63,8 +418,8 @@ def main():
         dictionary = Dictionary(args.dictionary, args.omit)
         board = Board(scoreboard.size, dictionary)
 
-        solutions = solve(board, scoreboard, dictionary, player_tiles)
-        selected_solution = select_solution(solutions[:MAX_SOLUTIONS_TO_SHOW])
+        solutions = solve_game(board, scoreboard, dictionary, player_tiles, args)
+        selected_solution = select_solution(solutions)
         if not selected_solution:
             return
         game_name = input("Enter a game name: ")
@@ -89,7 +444,7 @@ def main():
         board = Board(scoreboard.size, dictionary)
         board.load_state(game_file)
 
-        solutions = solve(board, scoreboard, dictionary, player_tiles)
+        solutions = solve_game(board, scoreboard, dictionary, player_tiles, args)
         selected_solution = select_solution(solutions)
         if selected_solution:
             selected_solution.save(game_file)
@@ -107,7 +462,7 @@ def main():
         board.load_state(state_file)
         player_tiles = read_player_tiles_file(player_tiles_file)
 
-        solutions = solve(board, scoreboard, dictionary, player_tiles)
+        solutions = solve(board, scoreboard, dictionary, player_tiles, workers=args.workers or 1)
 
         actual = list(
             map(
@@ -134,7 +489,7 @@ def main():
         board.load_state(state_file)
         player_tiles = read_player_tiles_file(player_tiles_file)
 
-        solutions = solve(board, scoreboard, dictionary, player_tiles)
+        solutions = solve(board, scoreboard, dictionary, player_tiles, workers=args.workers or 1)
         with open(golden_file, "w") as file:
             file.writelines(
                 map(lambda solution: solution.serialize() + "\n", solutions)
@@ -184,6 +539,51 @@ def generate_file_name(directory_path: str, game_name: str) -> str:
     return os.path.join(directory_path, filename)
 
 
+def create_cache(args: argparse.Namespace) -> Optional[SolveCache]:
+    if args.cache_size <= 0 and args.cache_dir is None:
+        return None
+    return SolveCache(args.cache_size, args.cache_dir)
+
+
+def solve_game(
+    board: Board,
+    scoreboard: Scoreboard,
+    dictionary: Dictionary,
+    player_tiles: PlayerTiles,
+    args: argparse.Namespace,
+) -> list[Solution]:
+    budget = SearchBudget(args.time_limit) if args.time_limit is not None else None
+    solutions = solve_top_k(
+        board,
+        scoreboard,
+        dictionary,
+        player_tiles,
+        MAX_SOLUTIONS_TO_SHOW,
+        leaves=load_leaves(args),
+        budget=budget,
+    )
+    if budget is not None and budget.is_exhausted:
+        print(f"Stopped after {args.time_limit} seconds, these are the best solutions found so far.")
+    return solutions
+
+
+def load_leaves(args: argparse.Namespace) -> Optional[LeaveTable]:
+    if args.leaves is None:
+        return None
+    leaves = LeaveTable.load(args.leaves)
+    if leaves is None:
+        sys.exit(f"Unable to load leave values from {args.leaves}.")
+    return leaves
+
+
+def print_metrics(metrics_format: str):
+    registry = metrics.get_registry()
+    if registry is None:
+        return
+    output = registry.to_json() + "\n" if metrics_format == "json" else registry.to_prometheus()
+    sys.stderr.write(output)
+
+
 def select_menu_option() -> MenuSelection:
     print("")
     for index, option in enumerate(MenuSelection):
@@ -236,7 +636,7 @@ def read_player_tiles_file(filepath: str) -> PlayerTiles:
 
 
 def select_solution(solutions: list[Solution]) -> Optional[Solution]:
-    print(f"Generated {len(solutions)} solutions")
+    print(f"Showing the top {len(solutions[:MAX_SOLUTIONS_TO_SHOW])} solutions")
     for index, solution in enumerate(solutions[:MAX_SOLUTIONS_TO_SHOW]):
         print(f"\n---------Solution {index + 1}-----------\n{solution}")
     while True:
@@ -0,0 +1,211 @@
+from __future__ import annotations
+import json
+import math
+import threading
+from typing import Callable, Optional, TypeVar
+
+# Upper bounds of the histogram buckets for durations in seconds and for counts.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, math.inf)
+COUNT_BUCKETS = (1, 10, 100, 1000, 10000, 100000, math.inf)
+
+PROMETHEUS_PREFIX = 'scrabble_'
+
+T = TypeVar('T')
+
+# A metric is identified by its name and its sorted label pairs.
+MetricKey = tuple[str, tuple[tuple[str, str], ...]]
+
+
+def _get_key(name: str, labels: Optional[dict[str, str]]) -> MetricKey:
+    return (name, tuple(sorted(labels.items())) if labels else ())
+
+
+class Histogram:
+    """Counts observed values into cumulative buckets, along with their count and sum."""
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self._buckets = buckets
+        self._bucket_counts = [0] * len(buckets)
+        self._count = 0
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        for (index, bound) in enumerate(self._buckets):
+            if value <= bound:
+                self._bucket_counts[index] += 1
+        self._count += 1
+        self._sum += value
+
+    def add(self, count: int, total: float, bucket_counts: list[int]):
+        """Adds the values of another histogram with the same buckets."""
+        if len(bucket_counts) != len(self._bucket_counts):
+            raise ValueError('Expected the same buckets.')
+        for (index, bucket_count) in enumerate(bucket_counts):
+            self._bucket_counts[index] += bucket_count
+        self._count += count
+        self._sum += total
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def get_buckets(self) -> list[tuple[float, int]]:
+        """Returns each bucket's upper bound and the number of values at or below it."""
+        return list(zip(self._buckets, self._bucket_counts))
+
+
+class MetricsRegistry:
+    """Counters and histograms, safe to update from several threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[MetricKey, float] = {}
+        self._histograms: dict[MetricKey, Histogram] = {}
+
+    def increment(self, name: str, amount: float = 1, labels: Optional[dict[str, str]] = None):
+        key = _get_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Optional[dict[str, str]] = None,
+                buckets: tuple[float, ...] = DURATION_BUCKETS):
+        key = _get_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = Histogram(buckets)
+                self._histograms[key] = histogram
+            histogram.observe(value)
+
+    def merge(self, snapshot: dict):
+        """Adds the values of a snapshot, such as one taken in a worker process."""
+        for counter in snapshot['counters']:
+            self.increment(counter['name'], counter['value'], counter['labels'])
+        with self._lock:
+            for entry in snapshot['histograms']:
+                key = _get_key(entry['name'], entry['labels'])
+                buckets = tuple(float(bound) for (bound, _) in entry['buckets'])
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = Histogram(buckets)
+                    self._histograms[key] = histogram
+                histogram.add(entry['count'], entry['sum'], [count for (_, count) in entry['buckets']])
+
+    def get_counter(self, name: str, labels: Optional[dict[str, str]] = None) -> float:
+        return self._counters.get(_get_key(name, labels), 0)
+
+    def get_histogram(self, name: str, labels: Optional[dict[str, str]] = None) -> Optional[Histogram]:
+        return self._histograms.get(_get_key(name, labels))
+
+    def snapshot(self) -> dict:
+        """Returns the current values as plain data."""
+        with self._lock:
+            return {
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for ((name, labels), value) in sorted(self._counters.items())
+                ],
+                'histograms': [
+                    {
+                        'name': name,
+                        'labels': dict(labels),
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'buckets': [[_format_bound(bound), count] for (bound, count) in histogram.get_buckets()],
+                    }
+                    for ((name, labels), histogram) in sorted(self._histograms.items())
+                ],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Returns the values in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        declared = set()
+        for counter in snapshot['counters']:
+            name = PROMETHEUS_PREFIX + counter['name']
+            if name not in declared:
+                lines.append(f'# TYPE {name} counter')
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(counter['labels'])} {_format_value(counter['value'])}")
+        for histogram in snapshot['histograms']:
+            name = PROMETHEUS_PREFIX + histogram['name']
+            if name not in declared:
+                lines.append(f'# TYPE {name} histogram')
+                declared.add(name)
+            for (bound, count) in histogram['buckets']:
+                lines.append(f"{name}_bucket{_format_labels({**histogram['labels'], 'le': bound})} {count}")
+            lines.append(f"{name}_sum{_format_labels(histogram['labels'])} {_format_value(histogram['sum'])}")
+            lines.append(f"{name}_count{_format_labels(histogram['labels'])} {histogram['count']}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == math.inf else _format_value(bound)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{value}"' for (key, value) in labels.items())
+    return '{' + pairs + '}'
+
+
+# The registry that metrics are recorded to, or None while metrics are disabled.
+_registry: Optional[MetricsRegistry] = None
+
+
+def enable() -> MetricsRegistry:
+    """Starts recording metrics to a registry, which is returned. Keeps the existing registry if already enabled."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def disable():
+    """Stops recording metrics. Recording calls then return immediately."""
+    global _registry
+    _registry = None
+
+
+def get_registry() -> Optional[MetricsRegistry]:
+    return _registry
+
+
+def increment(name: str, amount: float = 1, labels: Optional[dict[str, str]] = None):
+    if _registry is not None:
+        _registry.increment(name, amount, labels)
+
+
+def observe(name: str, value: float, labels: Optional[dict[str, str]] = None,
+            buckets: tuple[float, ...] = DURATION_BUCKETS):
+    if _registry is not None:
+        _registry.observe(name, value, labels, buckets)
+
+
+def collect(func: Callable[..., T], *args) -> tuple[T, dict]:
+    """Calls the function with metrics recorded to a new registry, returning its result and a snapshot.
+
+    Used in worker processes, whose snapshots are merged into the registry of
+    the main process. The previous registry is restored afterwards.
+    """
+    global _registry
+    previous = _registry
+    _registry = MetricsRegistry()
+    try:
+        result = func(*args)
+        return (result, _registry.snapshot())
+    finally:
+        _registry = previous
@@ -1,20 +1,57 @@
 from __future__ import annotations
+from typing import Optional
+
 from constants import MAX_BOARD_SIZE
 from enums import Direction
 
+# Positions are interned for every square of the largest board plus a ring
+# around it, so that moving one step off the board is still a table lookup.
+_MIN = -1
+_MAX = MAX_BOARD_SIZE
+_STRIDE = _MAX - _MIN + 1
+_POSITIONS: list[Optional[Position]] = [None] * (_STRIDE * _STRIDE)
+
+
+def _get_key(row: int, col: int) -> int:
+    """Returns the index into the interned tables, or -1 if the position is not interned."""
+    if _MIN <= row <= _MAX and _MIN <= col <= _MAX:
+        return (row - _MIN) * _STRIDE + (col - _MIN)
+    return -1
+
 
 class Position:
-    def __init__(self, row: int, col: int):
-        self._row = row
-        self._col = col
+    """A square on the board, interned so that equal positions are the same object.
+
+    Positions far off the board are not interned, but still compare equal by
+    row and col.
+    """
+
+    __slots__ = ('_row', '_col', '_key')
+
+    def __new__(cls, row: int, col: int) -> Position:
+        key = _get_key(row, col)
+        if key >= 0:
+            position = _POSITIONS[key]
+            if position is not None:
+                return position
+        position = super().__new__(cls)
+        position._row = row
+        position._col = col
+        position._key = key
+        return position
 
     def __copy__(self):
-        return Position(self._row, self._col)
+        return self
+
+    def __reduce__(self):
+        return (Position, (self._row, self._col))
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Position):
             return NotImplemented
-        return self.row == other.row and self.col == other.col
+        return self._row == other._row and self._col == other._col
 
     def __lt__(self, other: Position):
         if self.row != other.row:
@@ -36,6 +73,10 @@ class Position:
 
     def move(self, direction: Direction, steps: int = 1) -> Position:
         """Moves N steps in the given direction."""
+        if steps == 1 and self._key >= 0:
+            neighbor = _NEIGHBORS[direction][self._key]
+            if neighbor is not None:
+                return neighbor
         if direction == Direction.UP:
             return Position(self.row - steps, self.col)
         if direction == Direction.DOWN:
@@ -56,4 +97,23 @@ class Position:
 
     @property
     def index(self) -> int:
-        return self.row * MAX_BOARD_SIZE + self.col
+        return self._row * MAX_BOARD_SIZE + self._col
+
+
+for _row in range(_MIN, _MAX + 1):
+    for _col in range(_MIN, _MAX + 1):
+        _POSITIONS[_get_key(_row, _col)] = Position(_row, _col)
+
+# The neighbor in each direction of every interned position, or None if the
+# neighbor is not interned.
+_NEIGHBORS: dict[Direction, list[Optional[Position]]] = {direction: [None] * len(_POSITIONS) for direction in Direction}
+for _position in _POSITIONS:
+    for (_direction, _row, _col) in [
+        (Direction.UP, _position.row - 1, _position.col),
+        (Direction.DOWN, _position.row + 1, _position.col),
+        (Direction.LEFT, _position.row, _position.col - 1),
+        (Direction.RIGHT, _position.row, _position.col + 1),
+    ]:
+        _key = _get_key(_row, _col)
+        if _key >= 0:
+            _NEIGHBORS[_direction][_position._key] = _POSITIONS[_key]
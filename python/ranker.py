@@ -0,0 +1,197 @@
+from __future__ import annotations
+import multiprocessing
+import os
+import queue
+import random
+from typing import Optional
+
+import metrics
+from board import Board
+from board_analysis import BoardAnalysis
+from constants import MAX_PLAYER_TILES
+from dictionary import Dictionary
+from placement import Placement
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+from search_budget import SearchBudget
+from simulator import WILDCARD, remove_placed_tiles
+from solution import Solution
+from solver import solve_top_k
+
+DEFAULT_CANDIDATES = 10
+DEFAULT_PLIES = 2
+
+
+class RankedMove:
+    """A candidate move and the spread of the simulated plies after it."""
+
+    def __init__(self, solution: Solution):
+        self._solution = solution
+        self._num_samples = 0
+        self._total_spread = 0
+
+    @property
+    def solution(self) -> Solution:
+        return self._solution
+
+    @property
+    def num_samples(self) -> int:
+        return self._num_samples
+
+    @property
+    def mean_spread(self) -> Optional[float]:
+        """The mean of our points minus the opponent's points over the simulated plies, or None without samples."""
+        if self._num_samples == 0:
+            return None
+        return self._total_spread / self._num_samples
+
+    @property
+    def value(self) -> float:
+        """The move's score plus the mean spread, or just the score without samples."""
+        return self._solution.score + (self.mean_spread or 0.0)
+
+    def add_sample(self, spread: int):
+        self._num_samples += 1
+        self._total_spread += spread
+
+
+def get_unseen_tiles(board: Board, tiles: PlayerTiles, tile_counts: dict[str, int]) -> list[str]:
+    """Returns the tiles in the bag or on the opponent's rack, i.e. the tiles not on the board or our rack."""
+    counts = dict(tile_counts)
+    seen = [letter for row in range(board.size.num_rows) for letter in board.get_row(row) if letter is not None]
+    for letter in seen:
+        counts[WILDCARD if letter.is_wildcard else letter.val] -= 1
+    for letter in tiles.letters:
+        counts[letter.val] -= 1
+    counts[WILDCARD] = counts.get(WILDCARD, 0) - tiles.num_wildcards
+    return [tile for (tile, count) in sorted(counts.items()) for _ in range(max(0, count))]
+
+
+def rank_moves(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+               tile_counts: dict[str, int], budget_seconds: float, num_candidates: int = DEFAULT_CANDIDATES,
+               plies: int = DEFAULT_PLIES, workers: Optional[int] = None, seed: int = 0) -> list[RankedMove]:
+    """Ranks the highest scoring moves by simulating the plies after each, within a wall-clock budget.
+
+    Each sample draws our new tiles and the opponent's rack from the unseen
+    tiles, then both sides take turns playing their highest scoring move.
+    The candidates take turns being sampled, and the n-th sample of every
+    candidate draws the same tiles, so they are compared on the same racks.
+
+    The samples run in a pool of worker processes, every core by default,
+    which is terminated once the budget runs out, so that the ranking returns
+    on time with the samples finished so far. Moves are sorted by value, and
+    moves without samples come last by score. The budget includes finding
+    the candidates, which stops at the deadline with the best found so far.
+    """
+    budget = SearchBudget(budget_seconds)
+    candidates = solve_top_k(board, scoreboard, dictionary, tiles, num_candidates, budget=budget)
+    moves = [RankedMove(solution) for solution in candidates]
+    if len(moves) > 1 and budget.get_remaining_seconds() > 0:
+        _sample_moves(board, scoreboard, dictionary, tiles, tile_counts, moves, plies, workers or os.cpu_count() or 1,
+                      seed, budget)
+    return sorted(moves, key=lambda move: (move.num_samples > 0, move.value), reverse=True)
+
+
+def _sample_moves(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+                  tile_counts: dict[str, int], moves: list[RankedMove], plies: int, workers: int, seed: int,
+                  budget: SearchBudget):
+    rack = [letter.val for letter in tiles.letters] + [WILDCARD] * tiles.num_wildcards
+    unseen = get_unseen_tiles(board, tiles, tile_counts)
+    placements = [move.solution.turn.generate_placement_list() for move in moves]
+    # Filled by the pool's result thread with (move index, spread), or the error of a sample.
+    results: queue.SimpleQueue = queue.SimpleQueue()
+    pool = multiprocessing.Pool(workers, initializer=_init_worker,
+                                initargs=(board, scoreboard, dictionary, rack, unseen, placements, plies))
+    try:
+        num_submitted = 0
+        num_pending = 0
+        while True:
+            # Keep a couple of samples queued per worker, so that no worker waits.
+            while num_pending < workers * 2:
+                (sample, index) = divmod(num_submitted, len(moves))
+                pool.apply_async(_simulate, (index, hash((seed, sample))), callback=results.put,
+                                 error_callback=results.put)
+                num_submitted += 1
+                num_pending += 1
+            remaining = budget.get_remaining_seconds()
+            if remaining <= 0:
+                break
+            try:
+                result = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if isinstance(result, BaseException):
+                raise result
+            num_pending -= 1
+            (index, spread) = result
+            moves[index].add_sample(spread)
+            metrics.increment('ranker_samples_total')
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+# Set in each worker process of _sample_moves by _init_worker.
+_worker_scoreboard: Optional[Scoreboard] = None
+_worker_dictionary: Optional[Dictionary] = None
+_worker_rack: list[str] = []
+_worker_unseen: list[str] = []
+_worker_placements: list[list[Placement]] = []
+_worker_plies = DEFAULT_PLIES
+_worker_analysis: Optional[BoardAnalysis] = None
+# The analysis after each candidate move, by move index.
+_worker_move_analyses: dict[int, BoardAnalysis] = {}
+
+
+def _init_worker(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, rack: list[str], unseen: list[str],
+                 placements: list[list[Placement]], plies: int):
+    global _worker_scoreboard, _worker_dictionary, _worker_rack, _worker_unseen, _worker_placements, _worker_plies
+    global _worker_analysis, _worker_move_analyses
+    _worker_scoreboard = scoreboard
+    _worker_dictionary = dictionary
+    _worker_rack = rack
+    _worker_unseen = unseen
+    _worker_placements = placements
+    _worker_plies = plies
+    _worker_analysis = BoardAnalysis(board, scoreboard, dictionary)
+    _worker_move_analyses = {}
+
+
+def _simulate(index: int, sample_seed: int) -> tuple[int, int]:
+    """Plays out the plies after a candidate move, returning the move index and our spread over those plies."""
+    placements = _worker_placements[index]
+    analysis = _worker_move_analyses.get(index)
+    if analysis is None:
+        analysis = _worker_analysis.copy_and_apply_placements(placements)
+        _worker_move_analyses[index] = analysis
+
+    bag = _worker_unseen[:]
+    random.Random(sample_seed).shuffle(bag)
+    rack = _worker_rack[:]
+    remove_placed_tiles(rack, placements)
+    racks = [rack, []]
+    for player_rack in racks:
+        _draw(player_rack, bag)
+
+    spread = 0
+    # The opponent plays first.
+    player = 1
+    for _ in range(_worker_plies):
+        player_rack = racks[player]
+        if len(player_rack) > 0:
+            solutions = solve_top_k(analysis.board, _worker_scoreboard, _worker_dictionary,
+                                    PlayerTiles(''.join(player_rack)), 1, analysis)
+            if len(solutions) > 0:
+                solution = solutions[0]
+                placements = solution.turn.generate_placement_list()
+                analysis = analysis.copy_and_apply_placements(placements)
+                remove_placed_tiles(player_rack, placements)
+                _draw(player_rack, bag)
+                spread += solution.score if player == 0 else -solution.score
+        player = 1 - player
+    return (index, spread)
+
+
+def _draw(rack: list[str], bag: list[str]):
+    while len(rack) < MAX_PLAYER_TILES and len(bag) > 0:
+        rack.append(bag.pop())
@@ -1,3 +1,5 @@
+import hashlib
+
 from enums import Tile
 from iterators import BoardIterator
 from position import Position
@@ -37,6 +39,9 @@ class Scoreboard:
                 self._letter_values[elements[0]] = int(elements[1])
         if len(self._letter_values) != 26:
             raise ValueError(f"Expected 26 letters, got {len(self._letter_values)}")
+        layout = ' '.join(tile.value for row in self._board for tile in row)
+        values = ' '.join(f"{letter}{value}" for (letter, value) in sorted(self._letter_values.items()))
+        self._fingerprint = hashlib.sha256(f"{self._size}|{layout}|{values}".encode()).hexdigest()
 
     def get_letter_value(self, letter: str) -> int:
         return self._letter_values[letter]
@@ -71,3 +76,8 @@ class Scoreboard:
     @property
     def size(self) -> Size:
         return self._size
+
+    @property
+    def fingerprint(self) -> str:
+        """A digest of the layout and letter values."""
+        return self._fingerprint
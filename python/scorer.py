@@ -1,7 +1,11 @@
+from typing import Optional
+
 from board import Board
 from constants import MAX_LENGTH_WORD_SCORE, MAX_PLAYER_TILES
+from cross_checks import CrossChecks
 from enums import Direction, Shape
 from letter import Letter
+from placement import Placement
 from position import Position
 from scoreboard import Scoreboard
 from scored_letter import ScoredLetter
@@ -9,7 +13,11 @@ from turns import Turn
 
 
 def calculate_score(board: Board, scoreboard: Scoreboard, turn: Turn) -> int:
-    """Calculates the score based on applying the placements to the current board."""
+    """Calculates the score based on applying the placements to the current board.
+
+    This is the reference scoring path. The solver instead tracks the score as
+    it places tiles, see calculate_tracked_score.
+    """
     placements = turn.generate_placement_list()
     # Get the word by selecting the first placement and expanding
     # in both directions.
@@ -45,6 +53,38 @@ def calculate_score(board: Board, scoreboard: Scoreboard, turn: Turn) -> int:
     return score
 
 
+def calculate_tracked_score(turn: Turn) -> Optional[int]:
+    """Combines the score parts tracked by the solver. Returns None if the turn has none."""
+    if turn.main_word_score is None:
+        return None
+    score = turn.cross_words_score
+    # A single letter main word only scores through its cross word.
+    if turn.range.start != turn.range.end:
+        score += turn.main_word_score * turn.word_multiplier
+    if turn.num_placements == MAX_PLAYER_TILES:
+        score += MAX_LENGTH_WORD_SCORE
+    return score
+
+
+def score_placement(scoreboard: Scoreboard, cross_checks: CrossChecks, placement: Placement, shape: Shape) -> tuple[int, int, int]:
+    """Scores a tile placed as part of a main word of the given shape.
+
+    Returns the letter score within the main word, the word multiplier of the
+    square, and the score of the cross word formed by the tile, if any.
+    """
+    letter_score = _score_letter(scoreboard, placement.letter) * scoreboard.get_letter_multiplier(placement.position)
+    word_multiplier = scoreboard.get_word_multiplier(placement.position)
+    cross_score = cross_checks.get_cross_score(placement.position, shape.opposite)
+    if cross_score is None:
+        return (letter_score, word_multiplier, 0)
+    return (letter_score, word_multiplier, (cross_score + letter_score) * word_multiplier)
+
+
+def score_board_letter(scoreboard: Scoreboard, letter: Letter) -> int:
+    """Scores a letter that is already on the board, which gets no multipliers."""
+    return _score_letter(scoreboard, letter)
+
+
 def _expand_tiles(
     board: Board, turn: Turn, position: Position, direction: Direction
 ) -> list[ScoredLetter]:
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Optional
+
+# The clock and the cancellation token are only checked every this many nodes.
+CHECK_INTERVAL = 256
+
+
+class CancellationToken:
+    """Stops the searches it is given to, from any thread.
+
+    The token is set through an event, a threading.Event by default. A
+    multiprocessing manager's Event cancels a search in another process.
+    """
+
+    def __init__(self, event=None):
+        self._event = event if event is not None else threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class SearchBudget:
+    """Bounds a search by time, by the number of nodes visited, and by a cancellation token.
+
+    The solver spends a node on each square it tries to fill. Once any limit
+    is reached the budget stays exhausted, and the search returns the turns
+    found so far, so is_exhausted after a solve says the result is partial.
+
+    The deadline is on time.monotonic, which is shared by the processes of
+    one machine, so a budget can be recreated in a worker process from it.
+    """
+
+    def __init__(self, seconds: Optional[float] = None, max_nodes: Optional[int] = None,
+                 token: Optional[CancellationToken] = None):
+        self._deadline = time.monotonic() + seconds if seconds is not None else None
+        self._max_nodes = max_nodes
+        self._token = token
+        self._num_nodes = 0
+        self._is_exhausted = False
+
+    @property
+    def deadline(self) -> Optional[float]:
+        return self._deadline
+
+    @property
+    def num_nodes(self) -> int:
+        return self._num_nodes
+
+    @property
+    def is_exhausted(self) -> bool:
+        return self._is_exhausted
+
+    def get_remaining_seconds(self) -> Optional[float]:
+        return self._deadline - time.monotonic() if self._deadline is not None else None
+
+    def spend(self, num_nodes: int = 1) -> bool:
+        """Counts visited nodes, returning whether the search may continue."""
+        if self._is_exhausted:
+            return False
+        previous = self._num_nodes
+        self._num_nodes += num_nodes
+        if self._max_nodes is not None and self._num_nodes > self._max_nodes:
+            self._is_exhausted = True
+        elif previous // CHECK_INTERVAL != self._num_nodes // CHECK_INTERVAL:
+            self.check()
+        return not self._is_exhausted
+
+    def check(self) -> bool:
+        """Checks the clock and the token, returning whether the search may continue."""
+        if ((self._deadline is not None and time.monotonic() >= self._deadline)
+                or (self._token is not None and self._token.is_cancelled)):
+            self._is_exhausted = True
+        return not self._is_exhausted
@@ -0,0 +1,237 @@
+from __future__ import annotations
+import json
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import metrics
+from board import Board
+from dictionary import Dictionary
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+from search_budget import SearchBudget
+from solve_cache import SolveCache, get_cache_key
+from solver import solve, solve_top_k
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+SOLVE_PATH = '/solve'
+METRICS_PATH = '/metrics'
+
+
+def parse_request(scoreboard: Scoreboard, dictionary: Dictionary,
+                  request: dict) -> tuple[Board, PlayerTiles, Optional[int]]:
+    """Returns the board, tiles and k of a {"state", "tiles", "k"} request.
+
+    The state is a board in the same format as a state file. Raises
+    ValueError for an invalid request.
+    """
+    state = request.get('state')
+    tiles = request.get('tiles')
+    k = request.get('k')
+    if not isinstance(state, str) or not isinstance(tiles, str):
+        raise ValueError('Expected "state" and "tiles" strings.')
+    if k is not None and (not isinstance(k, int) or isinstance(k, bool)):
+        raise ValueError('Expected "k" to be an integer.')
+
+    board = Board(scoreboard.size, dictionary)
+    board.load_state_text(state)
+    return (board, PlayerTiles(tiles), k)
+
+
+def parse_budget(request: dict) -> Optional[SearchBudget]:
+    """Returns the budget of a request's optional "time_limit" seconds and "max_nodes", or None without either.
+
+    Raises ValueError for an invalid limit.
+    """
+    time_limit = request.get('time_limit')
+    max_nodes = request.get('max_nodes')
+    if time_limit is not None and (not isinstance(time_limit, (int, float)) or isinstance(time_limit, bool)):
+        raise ValueError('Expected "time_limit" to be a number of seconds.')
+    if max_nodes is not None and (not isinstance(max_nodes, int) or isinstance(max_nodes, bool)):
+        raise ValueError('Expected "max_nodes" to be an integer.')
+    if time_limit is None and max_nodes is None:
+        return None
+    return SearchBudget(time_limit, max_nodes)
+
+
+def solve_request(scoreboard: Scoreboard, dictionary: Dictionary, request: dict,
+                  cache: Optional[SolveCache] = None) -> dict:
+    """Solves a {"state", "tiles", "k"} request and returns the serialized solutions.
+
+    Without k, all solutions are returned. A request found in the cache is
+    returned without solving. Raises ValueError for an invalid request.
+
+    With a "time_limit" or "max_nodes", the response also says whether the
+    solutions are "partial", the best found before the limit. Partial
+    solutions are not cached.
+    """
+    (board, player_tiles, k) = parse_request(scoreboard, dictionary, request)
+    budget = parse_budget(request)
+    start_time = time.time()
+    key = None
+    if cache is not None:
+        key = get_cache_key(board, scoreboard, dictionary, player_tiles, k)
+        solutions = cache.get(key)
+        if solutions is not None:
+            return _get_cached_response(solutions, start_time, budget)
+    if k is None:
+        solutions = solve(board, scoreboard, dictionary, player_tiles, budget=budget)
+    else:
+        solutions = solve_top_k(board, scoreboard, dictionary, player_tiles, k, budget=budget)
+    response = {'solutions': [solution.serialize() for solution in solutions],
+                'seconds': round(time.time() - start_time, 3)}
+    if budget is not None:
+        response['partial'] = budget.is_exhausted
+    if cache is not None and not response.get('partial'):
+        cache.put(key, response['solutions'])
+    return response
+
+
+def _get_cached_response(solutions: list[str], start_time: float, budget: Optional[SearchBudget]) -> dict:
+    """Only complete solutions are cached, so a cached response is never partial."""
+    response = {'solutions': solutions, 'seconds': round(time.time() - start_time, 3)}
+    if budget is not None:
+        response['partial'] = False
+    return response
+
+
+# Set in each worker process of a SolverServer by _init_worker.
+_worker_scoreboard: Optional[Scoreboard] = None
+_worker_dictionary: Optional[Dictionary] = None
+
+
+def _init_worker(scoreboard: Scoreboard, dictionary: Dictionary):
+    global _worker_scoreboard, _worker_dictionary
+    _worker_scoreboard = scoreboard
+    _worker_dictionary = dictionary
+
+
+def _solve_in_worker(request: dict, collect_metrics: bool) -> tuple[dict, Optional[dict]]:
+    """Solves a request, along with a snapshot of its metrics if they are collected."""
+    if collect_metrics:
+        return metrics.collect(solve_request, _worker_scoreboard, _worker_dictionary, request)
+    return (solve_request(_worker_scoreboard, _worker_dictionary, request), None)
+
+
+class SolverServer(ThreadingHTTPServer):
+    """Serves solve requests over HTTP, with the scoreboard and dictionary loaded once.
+
+    POST /solve with {"state": ..., "tiles": "ABC*", "k": 5} returns
+    {"solutions": [...], "seconds": ...}, where each solution is in the
+    Solution.serialize format, sorted by descending score. A request may
+    also limit the search, see solve_request.
+
+    GET /metrics returns the metrics in the Prometheus text format, if
+    metrics are enabled.
+
+    Each request is handled on its own thread. With more than one worker,
+    the solves run in a process pool so that concurrent requests use
+    several cores, and their metrics are merged into this process. With a
+    cache, repeated requests are answered from it in this process.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], scoreboard: Scoreboard, dictionary: Dictionary, workers: int = 1,
+                 cache: Optional[SolveCache] = None):
+        super().__init__(address, _RequestHandler)
+        self._scoreboard = scoreboard
+        self._dictionary = dictionary
+        self._cache = cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                 initargs=(scoreboard, dictionary))
+
+    def solve(self, request: dict) -> dict:
+        if self._executor is None:
+            return solve_request(self._scoreboard, self._dictionary, request, self._cache)
+        if self._cache is None:
+            return self._solve_in_pool(request)
+        (board, player_tiles, k) = parse_request(self._scoreboard, self._dictionary, request)
+        key = get_cache_key(board, self._scoreboard, self._dictionary, player_tiles, k)
+        start_time = time.time()
+        solutions = self._cache.get(key)
+        if solutions is not None:
+            return _get_cached_response(solutions, start_time, parse_budget(request))
+        response = self._solve_in_pool(request)
+        if not response.get('partial'):
+            self._cache.put(key, response['solutions'])
+        return response
+
+    def _solve_in_pool(self, request: dict) -> dict:
+        registry = metrics.get_registry()
+        (response, snapshot) = self._executor.submit(_solve_in_worker, request, registry is not None).result()
+        if registry is not None and snapshot is not None:
+            registry.merge(snapshot)
+        return response
+
+    def server_close(self):
+        super().server_close()
+        if self._executor is not None:
+            self._executor.shutdown()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: SolverServer
+
+    def do_GET(self):
+        if self.path != METRICS_PATH:
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+        registry = metrics.get_registry()
+        if registry is None:
+            self._send_json(404, {'error': 'Metrics are disabled.'})
+            return
+        data = registry.to_prometheus().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if self.path != SOLVE_PATH:
+            self._send_json(404, {'error': f'Unknown path: {self.path}'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError('Expected a JSON object.')
+            response = self.server.solve(request)
+        except ValueError as e:
+            metrics.increment('requests_total', labels={'status': '400'})
+            self._send_json(400, {'error': str(e)})
+            return
+        metrics.increment('requests_total', labels={'status': '200'})
+        self._send_json(200, response)
+
+    def _send_json(self, status: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(scoreboard: Scoreboard, dictionary: Dictionary, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          workers: int = 1, cache: Optional[SolveCache] = None):
+    """Runs a SolverServer until interrupted or terminated."""
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    with SolverServer((host, port), scoreboard, dictionary, workers, cache) as server:
+        print(f'Serving on http://{host}:{server.server_port}{SOLVE_PATH}')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print('Exiting.')
+        if cache is not None:
+            print(f'Cache: {cache.hits} hits ({cache.disk_hits} from disk), {cache.misses} misses.')
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
@@ -0,0 +1,277 @@
+from __future__ import annotations
+import io
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Optional
+
+import metrics
+from board import Board
+from board_analysis import BoardAnalysis
+from constants import MAX_PLAYER_TILES
+from dictionary import Dictionary
+from leaves import LeaveTable
+from placement import Placement
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+from solver import solve_top_k
+
+WILDCARD = '*'
+# The game ends after this many turns in a row without a score.
+MAX_SCORELESS_TURNS = 6
+
+
+def load_tile_counts(filepath: str) -> dict[str, int]:
+    """Reads the number of each tile in the bag, one "<letter> <count>" per line, with * for the wildcards."""
+    counts = {}
+    with open(filepath, 'r') as file:
+        for line in file.readlines():
+            if line.strip() == '':
+                continue
+            elements = line.strip().split(' ')
+            if len(elements) != 2:
+                raise ValueError(f'Invalid line for tile counts: {line}')
+            counts[elements[0]] = int(elements[1])
+    return counts
+
+
+def remove_placed_tiles(rack: list[str], placements: list[Placement]):
+    """Removes the tiles of the placements from the rack, where a placed wildcard uses up a * tile."""
+    for placement in placements:
+        rack.remove(WILDCARD if placement.letter.is_wildcard else placement.letter.val)
+
+
+class TileBag:
+    """The tiles not yet drawn, in a random order."""
+
+    def __init__(self, counts: dict[str, int], rng: random.Random):
+        self._tiles = [tile for (tile, count) in sorted(counts.items()) for _ in range(count)]
+        rng.shuffle(self._tiles)
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def draw(self, num_tiles: int) -> list[str]:
+        """Removes up to the given number of tiles, fewer if the bag runs out."""
+        num_tiles = min(num_tiles, len(self._tiles))
+        tiles = self._tiles[len(self._tiles) - num_tiles:]
+        del self._tiles[len(self._tiles) - num_tiles:]
+        return tiles
+
+
+class GameResult:
+    """The outcome of a simulated game, and the position that took the longest to solve."""
+
+    def __init__(self, seed: int, scores: list[int], move_scores: list[int], num_passes: int,
+                 leave_samples: list[tuple[str, int]], seconds: float, slowest_seconds: float, slowest_state: str,
+                 slowest_rack: str):
+        self._seed = seed
+        self._scores = scores
+        self._move_scores = move_scores
+        self._num_passes = num_passes
+        self._leave_samples = leave_samples
+        self._seconds = seconds
+        self._slowest_seconds = slowest_seconds
+        self._slowest_state = slowest_state
+        self._slowest_rack = slowest_rack
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def scores(self) -> list[int]:
+        """The final score of each player, after the tiles left on the racks are counted."""
+        return self._scores
+
+    @property
+    def move_scores(self) -> list[int]:
+        return self._move_scores
+
+    @property
+    def num_moves(self) -> int:
+        return len(self._move_scores)
+
+    @property
+    def num_passes(self) -> int:
+        return self._num_passes
+
+    @property
+    def leave_samples(self) -> list[tuple[str, int]]:
+        """The tiles kept by a move before drawing, and the score of that player's next turn, or 0 for a pass.
+
+        Only moves followed by a full rack and another turn are sampled.
+        """
+        return self._leave_samples
+
+    @property
+    def seconds(self) -> float:
+        return self._seconds
+
+    @property
+    def slowest_seconds(self) -> float:
+        return self._slowest_seconds
+
+    @property
+    def slowest_state(self) -> str:
+        """The board, in the state file format, of the slowest solve."""
+        return self._slowest_state
+
+    @property
+    def slowest_rack(self) -> str:
+        return self._slowest_rack
+
+
+def play_game(scoreboard: Scoreboard, dictionary: Dictionary, tile_counts: dict[str, int], seed: int,
+              num_players: int = 2) -> GameResult:
+    """Plays a game where every player makes the highest scoring move, or passes if there is none.
+
+    The game ends when a player uses their last tile with the bag empty, or
+    after MAX_SCORELESS_TURNS turns without a score. Each player then loses
+    the value of their remaining tiles, and a player who went out gains them.
+    The same seed always plays the same game.
+    """
+    start_time = time.perf_counter()
+    rng = random.Random(seed)
+    bag = TileBag(tile_counts, rng)
+    racks = [bag.draw(MAX_PLAYER_TILES) for _ in range(num_players)]
+    scores = [0] * num_players
+    move_scores = []
+    num_passes = 0
+    leave_samples = []
+    # The tiles each player kept on their last move, until their next turn is scored.
+    leaves: list[Optional[str]] = [None] * num_players
+    scoreless_turns = 0
+    (slowest_seconds, slowest_state, slowest_rack) = (0.0, '', '')
+    analysis = BoardAnalysis(Board(scoreboard.size, dictionary), scoreboard, dictionary)
+    player = 0
+    while True:
+        rack = racks[player]
+        solve_start_time = time.perf_counter()
+        solutions = solve_top_k(analysis.board, scoreboard, dictionary, PlayerTiles(''.join(rack)), 1, analysis)
+        solve_seconds = time.perf_counter() - solve_start_time
+        if solve_seconds > slowest_seconds:
+            (slowest_seconds, slowest_state, slowest_rack) = (solve_seconds, str(analysis.board), ''.join(rack))
+
+        if leaves[player] is not None:
+            leave_samples.append((leaves[player], solutions[0].score if len(solutions) > 0 else 0))
+            leaves[player] = None
+
+        if len(solutions) == 0:
+            num_passes += 1
+            scoreless_turns += 1
+            if scoreless_turns >= MAX_SCORELESS_TURNS:
+                break
+        else:
+            solution = solutions[0]
+            placements = solution.turn.generate_placement_list()
+            analysis = analysis.copy_and_apply_placements(placements)
+            remove_placed_tiles(rack, placements)
+            leave = ''.join(sorted(rack))
+            rack.extend(bag.draw(MAX_PLAYER_TILES - len(rack)))
+            if len(rack) == MAX_PLAYER_TILES:
+                leaves[player] = leave
+            scores[player] += solution.score
+            move_scores.append(solution.score)
+            scoreless_turns = 0 if solution.score > 0 else scoreless_turns + 1
+            if len(rack) == 0:
+                break
+        player = (player + 1) % num_players
+
+    rack_values = [sum(scoreboard.get_letter_value(tile) for tile in rack if tile != WILDCARD) for rack in racks]
+    for (index, rack_value) in enumerate(rack_values):
+        scores[index] -= rack_value
+    if len(racks[player]) == 0:
+        scores[player] += sum(rack_values)
+    metrics.increment('games_total')
+    metrics.increment('moves_total', len(move_scores))
+    metrics.increment('passes_total', num_passes)
+    return GameResult(seed, scores, move_scores, num_passes, leave_samples, time.perf_counter() - start_time,
+                      slowest_seconds, slowest_state, slowest_rack)
+
+
+def run_games(scoreboard: Scoreboard, dictionary: Dictionary, tile_counts: dict[str, int], num_games: int,
+              seed: int, num_players: int = 2, workers: int = 1) -> list[GameResult]:
+    """Plays games with seeds seed, seed + 1, ..., in a process pool if there is more than one worker.
+
+    The results are in seed order, and are the same for any number of workers.
+    """
+    seeds = list(range(seed, seed + num_games))
+    if workers <= 1:
+        with redirect_stdout(io.StringIO()):
+            return [play_game(scoreboard, dictionary, tile_counts, game_seed, num_players) for game_seed in seeds]
+
+    registry = metrics.get_registry()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scoreboard, dictionary, tile_counts, num_players)) as executor:
+        results = []
+        for (result, snapshot) in executor.map(_play_game_in_worker, seeds, [registry is not None] * len(seeds)):
+            if registry is not None and snapshot is not None:
+                registry.merge(snapshot)
+            results.append(result)
+    return results
+
+
+def generate_leave_table(scoreboard: Scoreboard, dictionary: Dictionary, tile_counts: dict[str, int],
+                         num_games: int, seed: int, workers: int = 1) -> tuple[LeaveTable, int]:
+    """Estimates the leave values from the leave samples of simulated games.
+
+    Returns the table and the number of samples it was estimated from.
+    """
+    results = run_games(scoreboard, dictionary, tile_counts, num_games, seed, workers=workers)
+    samples = [sample for result in results for sample in result.leave_samples]
+    return (LeaveTable.from_samples(samples), len(samples))
+
+
+def format_summary(results: list[GameResult], seconds: float) -> str:
+    """Describes the throughput, the score distributions and the slowest position."""
+    num_moves = sum(result.num_moves for result in results)
+    final_scores = [score for result in results for score in result.scores]
+    move_scores = [score for result in results for score in result.move_scores]
+    output = (f'Played {len(results)} games with {num_moves} moves and {sum(result.num_passes for result in results)} passes'
+              f' in {seconds:.2f} seconds ({len(results) / seconds:.3f} games/sec, {num_moves / seconds:.2f} moves/sec).')
+    output += f'\nFinal scores: {_format_distribution(final_scores)}'
+    output += f'\nMove scores:  {_format_distribution(move_scores)}'
+    slowest = max(results, key=lambda result: result.slowest_seconds, default=None)
+    if slowest is not None and slowest.slowest_state != '':
+        output += (f'\nSlowest solve: {slowest.slowest_seconds:.3f} seconds in game {slowest.seed}'
+                   f' with tiles {slowest.slowest_rack}\n{slowest.slowest_state}')
+    return output
+
+
+def _format_distribution(values: list[int]) -> str:
+    if len(values) == 0:
+        return 'none'
+    ordered = sorted(values)
+    return (f'mean {statistics.mean(ordered):.1f}, stdev {statistics.pstdev(ordered):.1f}, min {ordered[0]},'
+            f' p50 {_get_percentile(ordered, 0.5)}, p90 {_get_percentile(ordered, 0.9)}, max {ordered[-1]}')
+
+
+def _get_percentile(ordered: list[int], fraction: float) -> int:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Set in each worker process of run_games by _init_worker.
+_worker_scoreboard: Optional[Scoreboard] = None
+_worker_dictionary: Optional[Dictionary] = None
+_worker_tile_counts: dict[str, int] = {}
+_worker_num_players = 2
+
+
+def _init_worker(scoreboard: Scoreboard, dictionary: Dictionary, tile_counts: dict[str, int], num_players: int):
+    global _worker_scoreboard, _worker_dictionary, _worker_tile_counts, _worker_num_players
+    _worker_scoreboard = scoreboard
+    _worker_dictionary = dictionary
+    _worker_tile_counts = tile_counts
+    _worker_num_players = num_players
+
+
+def _play_game_in_worker(seed: int, collect_metrics: bool) -> tuple[GameResult, Optional[dict]]:
+    with redirect_stdout(io.StringIO()):
+        if collect_metrics:
+            return metrics.collect(play_game, _worker_scoreboard, _worker_dictionary, _worker_tile_counts, seed,
+                                   _worker_num_players)
+        return (play_game(_worker_scoreboard, _worker_dictionary, _worker_tile_counts, seed, _worker_num_players),
+                None)
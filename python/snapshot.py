@@ -0,0 +1,114 @@
+from __future__ import annotations
+import atexit
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import BinaryIO, Optional
+
+from gaddag import Gaddag
+
+SNAPSHOT_EXTENSION = '.gaddag'
+SNAPSHOT_MAGIC = b'SCRBLGDG'
+SNAPSHOT_VERSION = 2
+# Snapshots written for other processes to map go here when the system has
+# it, so that they are kept in memory rather than written to disk.
+SHARED_MEMORY_DIRECTORY = '/dev/shm'
+
+# Stored at the end of the file: magic, version, whether the arrays are
+# little endian, dictionary hash, and word, node and edge counts.
+_TRAILER = struct.Struct('<8sI?32sIII')
+
+
+def hash_file(filepath: Optional[str]) -> bytes:
+    """Returns the SHA-256 digest of the file contents. A missing file hashes as empty."""
+    digest = hashlib.sha256()
+    if filepath and os.path.exists(filepath):
+        with open(filepath, 'rb') as file:
+            digest.update(file.read())
+    return digest.digest()
+
+
+def get_snapshot_path(filepath: str) -> str:
+    """Returns the snapshot path for a dictionary, e.g. 279k-dictionary.gaddag."""
+    return os.path.splitext(filepath)[0] + SNAPSHOT_EXTENSION
+
+
+class Snapshot:
+    """A compiled dictionary that is memory mapped instead of parsed.
+
+    The omit list is not compiled in, but applied on load, so one snapshot
+    serves any omit list.
+    """
+
+    def __init__(self, gaddag: Gaddag, num_words: int, source_hash: bytes):
+        self._gaddag = gaddag
+        self._num_words = num_words
+        self._source_hash = source_hash
+
+    @property
+    def gaddag(self) -> Gaddag:
+        return self._gaddag
+
+    @property
+    def num_words(self) -> int:
+        return self._num_words
+
+    @property
+    def source_hash(self) -> bytes:
+        """The hash of the dictionary the snapshot was compiled from."""
+        return self._source_hash
+
+    def is_current(self, source_hash: bytes) -> bool:
+        """Whether the snapshot was compiled from the given dictionary contents."""
+        return self._source_hash == source_hash
+
+    def save(self, filepath: str):
+        """Writes the snapshot, replacing any existing file only once it is complete."""
+        temp_filepath = f'{filepath}.{os.getpid()}.tmp'
+        with open(temp_filepath, 'wb') as file:
+            self._write(file)
+        os.replace(temp_filepath, filepath)
+
+    def save_shared(self) -> str:
+        """Writes the snapshot to a new temporary file for other processes to map, returning its path.
+
+        The file is removed when this process exits. Processes that have
+        mapped it by then keep their mapping.
+        """
+        directory = SHARED_MEMORY_DIRECTORY if os.path.isdir(SHARED_MEMORY_DIRECTORY) else None
+        (fd, filepath) = tempfile.mkstemp(prefix='scrabble-', suffix=SNAPSHOT_EXTENSION, dir=directory)
+        with os.fdopen(fd, 'wb') as file:
+            self._write(file)
+        atexit.register(_remove_shared, filepath, os.getpid())
+        return filepath
+
+    def _write(self, file: BinaryIO):
+        self._gaddag.write(file)
+        file.write(_TRAILER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, sys.byteorder == 'little',
+                                 self._source_hash, self._num_words,
+                                 self._gaddag.num_nodes, self._gaddag.num_edges))
+
+    @classmethod
+    def load(cls, filepath: str) -> Optional[Snapshot]:
+        """Maps the snapshot file. Returns None if it is missing or was written in an incompatible format."""
+        if not os.path.exists(filepath):
+            return None
+        with open(filepath, 'rb') as file:
+            if os.fstat(file.fileno()).st_size < _TRAILER.size:
+                return None
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, is_little_endian, source_hash, num_words, num_nodes, num_edges) = \
+            _TRAILER.unpack(buffer[-_TRAILER.size:])
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or is_little_endian != (sys.byteorder == 'little'):
+            buffer.close()
+            return None
+        return cls(Gaddag.from_buffer(buffer, num_nodes, num_edges), num_words, source_hash)
+
+
+def _remove_shared(filepath: str, pid: int):
+    """Removes a file written by save_shared, unless this is a forked child of the process that wrote it."""
+    if os.getpid() == pid and os.path.exists(filepath):
+        os.remove(filepath)
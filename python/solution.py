@@ -1,16 +1,22 @@
 from __future__ import annotations
+from typing import Optional
+
 from board import Board
 from constants import ENDC, RED
 from scoreboard import Scoreboard
-from scorer import calculate_score
+from scorer import calculate_score, calculate_tracked_score
 from turns import Turn
 
 
 class Solution:
-    def __init__(self, original_board: Board, scoreboard: Scoreboard, turn: Turn):
+    def __init__(self, original_board: Board, scoreboard: Scoreboard, turn: Turn,
+                 leave_value: Optional[float] = None):
         self._original_board = original_board
         self._turn = turn
-        self._score = calculate_score(original_board, scoreboard, turn)
+        self._leave_value = leave_value
+        # Use the score tracked by the solver if there is one.
+        tracked_score = calculate_tracked_score(turn)
+        self._score = tracked_score if tracked_score is not None else calculate_score(original_board, scoreboard, turn)
 
     @property
     def score(self) -> int:
@@ -20,13 +26,25 @@ class Solution:
     def turn(self) -> Turn:
         return self._turn
 
+    @property
+    def leave_value(self) -> Optional[float]:
+        """The value of the tiles kept, if solved with a leave table."""
+        return self._leave_value
+
+    @property
+    def equity(self) -> float:
+        """The score plus the leave value, which solutions are ranked by."""
+        return self._score + (self._leave_value or 0.0)
+
     def __lt__(self, other: Solution):
-        return self.score < other.score
+        return self.equity < other.equity
 
     def __str__(self):
         updated_board = self._original_board.copy_and_apply_placements(self._turn.generate_placement_list())
         output = updated_board.get_diff(self._original_board)
         output += f"\nScore: {RED}{self._score}{ENDC}"
+        if self._leave_value is not None:
+            output += f" (leave {self._leave_value:+.2f}, equity {self.equity:.2f})"
         return output
 
     def serialize(self) -> str:
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import metrics
+from board import Board
+from dictionary import Dictionary
+from player_tiles import PlayerTiles
+from scoreboard import Scoreboard
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def get_cache_key(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+                  k: Optional[int]) -> str:
+    """Returns a digest of everything the solutions depend on.
+
+    The rack is sorted, so racks with the same tiles in any order share a key.
+    Without k, the key is for all of the solutions.
+    """
+    rack = ''.join(letter.val for letter in tiles.letters) + '*' * tiles.num_wildcards
+    parts = [board.fingerprint, rack, 'all' if k is None else str(k), dictionary.version, scoreboard.fingerprint]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+class SolveCache:
+    """Serialized solutions by cache key, with the least recently used entries evicted from memory.
+
+    With a directory, every entry is also written there as a JSON file, so
+    that entries evicted from memory, or stored by an earlier process, are
+    read back instead of solved again. Safe to use from several threads.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, directory: Optional[str] = None):
+        self._max_entries = max_entries
+        self._directory = directory
+        self._entries: OrderedDict[str, list[str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def hits(self) -> int:
+        """The number of lookups found in memory or on disk."""
+        return self._memory_hits + self._disk_hits
+
+    @property
+    def disk_hits(self) -> int:
+        return self._disk_hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[list[str]]:
+        with self._lock:
+            solutions = self._entries.get(key)
+            if solutions is not None:
+                self._entries.move_to_end(key)
+                self._memory_hits += 1
+                metrics.increment('solve_cache_lookups_total', labels={'result': 'hit'})
+                return solutions
+        solutions = self._read(key)
+        with self._lock:
+            if solutions is None:
+                self._misses += 1
+                metrics.increment('solve_cache_lookups_total', labels={'result': 'miss'})
+                return None
+            self._disk_hits += 1
+            metrics.increment('solve_cache_lookups_total', labels={'result': 'disk_hit'})
+            self._add(key, solutions)
+        return solutions
+
+    def put(self, key: str, solutions: list[str]):
+        with self._lock:
+            self._add(key, solutions)
+        self._write(key, solutions)
+
+    def _add(self, key: str, solutions: list[str]):
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = solutions
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_filepath(self, key: str) -> str:
+        return os.path.join(self._directory, f'{key}.json')
+
+    def _read(self, key: str) -> Optional[list[str]]:
+        """Reads the entry, treating a missing or malformed file as a miss."""
+        if self._directory is None:
+            return None
+        try:
+            with open(self._get_filepath(key), 'r') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        solutions = entry.get('solutions') if isinstance(entry, dict) else None
+        if not isinstance(solutions, list) or not all(isinstance(solution, str) for solution in solutions):
+            return None
+        return solutions
+
+    def _write(self, key: str, solutions: list[str]):
+        """Writes the entry, replacing any existing file only once it is complete."""
+        if self._directory is None:
+            return
+        filepath = self._get_filepath(key)
+        temp_filepath = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_filepath, 'w') as file:
+                json.dump({'solutions': solutions}, file)
+            os.replace(temp_filepath, filepath)
+        except OSError as e:
+            print(f'Unable to write {filepath}: {e}', file=sys.stderr)
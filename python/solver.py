@@ -1,176 +1,419 @@
-import copy
-from typing import Dict
+import heapq
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
 
+import metrics
 from board import Board
+from board_analysis import BoardAnalysis
+from constants import ALPHABET
+from cross_checks import CrossChecks, get_letter_bit
 from dictionary import Dictionary
 from enums import Shape
-from iterators import ColIterator, NextLetterIterator, RowIterator, WildcardIterator
+from gaddag import SEPARATOR
+from iterators import NextLetterIterator
+from leaves import LeaveTable
 from letter import Letter
 from placement import Placement
 from player_tiles import PlayerTiles
+from position import Position
 from range import Range
 from scoreboard import Scoreboard
+from search_budget import SearchBudget
+from scorer import calculate_score, calculate_tracked_score, score_board_letter, score_placement
 from solution import Solution
 from turns import Turn
 from util import timer
 
+# Wildcards can stand in for any letter, so the placed letters are shared.
+WILDCARD_LETTERS = {char: Letter(char, True) for char in ALPHABET}
+
 
 @timer
-def solve(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles, validate: bool = False) -> list[Solution]:
+def solve(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles, validate: bool = False,
+          workers: int = 1, analysis: Optional[BoardAnalysis] = None,
+          leaves: Optional[LeaveTable] = None, budget: Optional[SearchBudget] = None) -> list[Solution]:
     """A recursive solver.
 
     Given a list of player tiles and a board state, returns a list of
-    valid and deduped solutions, sorted by descending score.
+    valid solutions, sorted by descending score. Each turn is generated
+    exactly once, so no deduping is needed.
 
     Validation is off by default since this adds extra time and the
     generated solutions should be valid. However, this can be turned on
-    as a debugging option.
+    as a debugging option, which records the number of invalid, duplicate
+    and mismatched score turns as metrics.
+
+    With more than one worker, the anchors are searched in a process pool.
+    The solutions are the same as with a single worker.
+
+    The analysis of the board, if given, is used instead of finding the
+    anchors and cross checks again. With a leave table, the solutions are
+    sorted by descending score plus the value of the tiles kept instead.
 
+    With a budget, the search stops once it runs out of time or nodes or is
+    cancelled, and the solutions found so far are returned. The budget is
+    then exhausted, which marks the result as partial. The anchors are
+    searched in an order that tends to find high scoring turns first, see
+    _generate_turns.
     """
-    turns = _turns_finder(board, scoreboard, dictionary, tiles)
-    print(f"Generated {len(turns)} initial solutions.")
+    if workers > 1:
+        turns = _parallel_turns_finder(board, scoreboard, dictionary, tiles, workers, analysis, budget)
+    else:
+        turns = _turns_finder(board, scoreboard, dictionary, tiles, analysis, budget)
+    _record_turns_generated(len(turns), budget)
     if validate:
         valid_turns = _filter_valid_turns(turns, board)
-        print(f"Validation resulted in {len(valid_turns)} solutions.")
-        deduped_turns = _dedup_turns(turns)
-        print(f"Deduping resulted in {len(deduped_turns)} solutions.")
-    else:
-        deduped_turns = _dedup_turns(turns)
-        print(f"Deduping resulted in {len(deduped_turns)} solutions.")
-    return _score_turns(board, scoreboard, deduped_turns)
+        num_duplicates = len(turns) - len(set(turn.serialize() for turn in turns))
+        mismatched_turns = _filter_mismatched_scores(turns, board, scoreboard)
+        metrics.increment("turns_validated_total", len(turns))
+        metrics.increment("turns_invalid_total", len(turns) - len(valid_turns))
+        metrics.increment("turns_duplicate_total", num_duplicates)
+        metrics.increment("turns_mismatched_score_total", len(mismatched_turns))
+    return _score_turns(board, scoreboard, turns, tiles, leaves)
+
+
+def solve_iter(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+               analysis: Optional[BoardAnalysis] = None, budget: Optional[SearchBudget] = None) -> Iterator[Solution]:
+    """Yields solutions as the recursive solver finds them, in no particular order, until the budget runs out."""
+    for turn in _generate_turns(board, scoreboard, dictionary, tiles, analysis, budget):
+        yield Solution(board, scoreboard, turn)
 
 
 @timer
-def _turns_finder(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles) -> list[Turn]:
-    """Expands all wildcards and runs the recursive solver."""
-    turns = []
-    for wildcard_letters in WildcardIterator(tiles.num_wildcards):
-        letters = tiles.letters + wildcard_letters
-        turns.extend(_initial_expand(board, scoreboard, dictionary, letters))
-    return turns
+def solve_top_k(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles, k: int,
+                analysis: Optional[BoardAnalysis] = None, leaves: Optional[LeaveTable] = None,
+                budget: Optional[SearchBudget] = None) -> list[Solution]:
+    """Returns the k highest scoring solutions, sorted by descending score.
+
+    Only the best k turns found so far are kept, in a min-heap by score. Ties
+    at the k-th score keep the turn found first. With a leave table, the
+    score plus the value of the tiles kept is used instead of the score.
+    With a budget, these are the best of the turns found before it ran out,
+    as in solve.
+    """
+    if k <= 0:
+        return []
+    rack_leaves = leaves.get_rack_leaves(tiles) if leaves is not None else None
+    # Entries are (score, order found, turn). The order breaks score ties so
+    # that turns are never compared.
+    heap: list[tuple[float, int, Turn]] = []
+    num_turns = 0
+    for (order, turn) in enumerate(_generate_turns(board, scoreboard, dictionary, tiles, analysis, budget)):
+        num_turns += 1
+        score = calculate_tracked_score(turn)
+        if rack_leaves is not None:
+            score += rack_leaves.get_turn_value(turn)
+        if len(heap) < k:
+            heapq.heappush(heap, (score, order, turn))
+        elif score > heap[0][0]:
+            heapq.heapreplace(heap, (score, order, turn))
+    _record_turns_generated(num_turns, budget)
+    return _score_turns(board, scoreboard, [turn for (_, _, turn) in heap], tiles, leaves)
+
+
+def _record_turns_generated(num_turns: int, budget: Optional[SearchBudget] = None):
+    metrics.increment("solves_total")
+    if budget is not None:
+        metrics.increment("search_nodes_total", budget.num_nodes)
+        if budget.is_exhausted:
+            metrics.increment("solves_partial_total")
+    metrics.increment("turns_generated_total", num_turns)
+    metrics.observe("solve_turns_generated", num_turns, buckets=metrics.COUNT_BUCKETS)
 
 
-def _initial_expand(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, letters: list[Letter]) -> list[Turn]:
-    # For an empty board, any word must use the star tile.
-    if board.is_empty():
-        next_positions = [scoreboard.get_star_position()]
-    else:
-        next_positions = board.get_first_tile_positions()
+@timer
+def _turns_finder(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+                  analysis: Optional[BoardAnalysis] = None, budget: Optional[SearchBudget] = None) -> list[Turn]:
+    return list(_generate_turns(board, scoreboard, dictionary, tiles, analysis, budget))
 
-    # The first tile placement is a special case in that each tile can act as part of a vertical or
-    turns = []
-    for (letter, remaining_letters) in NextLetterIterator(letters):
-        for position in next_positions:
-            placement = Placement(position, letter)
-            words: Dict[Shape, tuple[str, Range]] = {}
-            for shape in [Shape.HORIZONTAL, Shape.VERTICAL]:
-                words[shape] = board.get_word_from_placement(placement, shape)
-
-            for shape in [Shape.HORIZONTAL, Shape.VERTICAL]:
-                (cross_word, _) = words[shape.opposite]
-                if len(cross_word) > 1 and not dictionary.is_word(cross_word):
-                    continue
-
-                (word, range) = words[shape]
-                word_type = dictionary.check(word)
-                if word_type is not None:
-                    placements = {placement.position: placement.letter}
-                    turn = Turn(placements, range, shape)
-                    # If this is a valid word, store this as a solution.
-                    if word_type.is_word:
-                        turns.append(turn)
-                    # If this is a substring, recurse into this branch.
-                    if word_type.is_substring:
-                        turns.extend(_expand(board, dictionary, remaining_letters, turn))
-    return turns
 
+@timer
+def _parallel_turns_finder(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+                           workers: int, analysis: Optional[BoardAnalysis] = None,
+                           budget: Optional[SearchBudget] = None) -> list[Turn]:
+    """Searches each anchor and shape as a separate task, keeping the turns in the same order as _turns_finder.
 
-def _expand(board: Board, dictionary: Dictionary, letters: list[Letter], turn: Turn) -> list[Turn]:
-    """The recursive helper method used for second and later tile placements in a turn.
+    The board, dictionary and cross checks are sent to each worker once when
+    the pool starts, and the tasks only send the anchor and shape.
 
-    Assumes that the given turn has at least one placement.
+    With a budget, each task stops at its deadline, and the nodes and token
+    are checked here as the tasks finish. The tasks not yet started are then
+    cancelled, but running ones only stop at the deadline.
     """
-    turns: list[Turn] = []
+    if analysis is None:
+        analysis = BoardAnalysis(board, scoreboard, dictionary)
+    anchors = analysis.get_anchors()
+    if not anchors:
+        return []
+    cross_checks = analysis.cross_checks
+    tasks = [(anchor, shape) for anchor in anchors for shape in [Shape.HORIZONTAL, Shape.VERTICAL]]
+    if budget is not None:
+        tasks = _order_tasks(tasks, board, scoreboard, len(tiles.letters) + tiles.num_wildcards)
+    # Several tasks per worker evens out anchors that take much longer than others.
+    chunksize = max(1, len(tasks) // (workers * 4))
+    deadline = budget.deadline if budget is not None else None
+    count_nodes = [budget is not None] * len(tasks)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(board, scoreboard, dictionary, cross_checks, anchors, tiles)) as executor:
+        turns = []
+        for (task_turns, num_nodes) in executor.map(_generate_task_turns, *zip(*tasks), count_nodes,
+                                                    [deadline] * len(tasks), chunksize=chunksize):
+            turns.extend(task_turns)
+            if budget is not None and (not budget.spend(num_nodes) or not budget.check()):
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+    return turns
 
-    # Base case.
-    if len(letters) == 0:
-        return turns
 
-    shape = turn.shape
+def _generate_turns(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, tiles: PlayerTiles,
+                    analysis: Optional[BoardAnalysis] = None, budget: Optional[SearchBudget] = None
+                    ) -> Iterator[Turn]:
+    """Runs the recursive solver from every anchor in both shapes, expanding wildcards as they are placed.
 
-    # Attempt to add a new tile at the start of the current word.
-    start_position = board.get_next_empty_tile(turn.range.start, shape.start_direction)
-    if start_position:
-        existing_word_start_position = start_position.move(shape.start_direction.reverse)
-        existing_word_range = Range(existing_word_start_position, turn.range.end)
-        existing_word = _form_word(board, turn, existing_word_range, shape)
-        prefix_word = board.get_adjacent_tiles_until_empty(start_position, shape.start_direction)
+    The anchors and cross checks are found from the board unless an analysis is given.
 
-        for (letter, remaining_letters) in NextLetterIterator(letters):
-            placement = Placement(start_position, letter)
+    With a budget, the search may stop early, so the anchors and shapes with
+    the most open and premium squares nearby are searched first. The same
+    turns are found in either order.
+    """
+    if analysis is None:
+        analysis = BoardAnalysis(board, scoreboard, dictionary)
+    anchors = analysis.get_anchors()
+    generator = _TurnGenerator(board, scoreboard, dictionary, analysis.cross_checks, anchors)
+    tasks = [(anchor, shape) for anchor in anchors for shape in [Shape.HORIZONTAL, Shape.VERTICAL]]
+    if budget is not None:
+        tasks = _order_tasks(tasks, board, scoreboard, len(tiles.letters) + tiles.num_wildcards)
+    for (anchor, shape) in tasks:
+        if budget is not None and not budget.check():
+            return
+        yield from generator.generate(anchor, shape, tiles.letters, tiles.num_wildcards, budget)
+
+
+def _order_tasks(tasks: list[tuple[Position, Shape]], board: Board, scoreboard: Scoreboard,
+                 reach: int) -> list[tuple[Position, Shape]]:
+    """Sorts the anchors and shapes by descending potential, so that high scoring turns tend to be found first.
+
+    The potential is the premium of each empty square along the shape within
+    reach of the tiles, word multiplier times letter multiplier, divided by
+    its distance from the anchor. This favours room for long words and
+    premium squares close to the board tiles.
+    """
+    def get_potential(task: tuple[Position, Shape]) -> float:
+        (anchor, shape) = task
+        potential = float(scoreboard.get_word_multiplier(anchor) * scoreboard.get_letter_multiplier(anchor))
+        for direction in [shape.start_direction, shape.end_direction]:
+            position = anchor
+            for distance in range(1, reach):
+                position = position.move(direction)
+                if not board.size.is_within_bounds(position):
+                    break
+                if board.get_letter(position) is None:
+                    potential += (scoreboard.get_word_multiplier(position)
+                                  * scoreboard.get_letter_multiplier(position) / distance)
+        return potential
+
+    return sorted(tasks, key=get_potential, reverse=True)
+
+
+def _next_letters(letters: list[Letter], num_wildcards: int, mask: int) -> Iterator[tuple[Letter, list[Letter], int]]:
+    """Yields each letter allowed by the mask that can be placed next, along with the remaining tiles.
+
+    A wildcard is tried as every allowed letter, including ones also held as
+    regular tiles, since the wildcard may take any of the squares for that
+    letter. See _TurnGenerator._create_turn for the turns that are dropped.
+    """
+    for (letter, remaining_letters) in NextLetterIterator(letters):
+        if mask & get_letter_bit(letter.val):
+            yield (letter, remaining_letters, num_wildcards)
+    if num_wildcards > 0:
+        for char in ALPHABET:
+            if mask & get_letter_bit(char):
+                yield (WILDCARD_LETTERS[char], letters, num_wildcards - 1)
+
+
+class _TurnGenerator:
+    """Generates every valid turn exactly once by walking the GADDAG out from anchors.
+
+    Anchors are the empty squares where a turn can connect to the board. From
+    an anchor, tiles are first placed towards the start of the word, following
+    the reversed prefix in the GADDAG. After the separator, tiles are placed
+    after the anchor towards the end of the word. Board tiles along the way
+    are followed but not placed.
+
+    A turn can cover several anchors, so it is only generated from the
+    start-most one: the start part never places a tile on another anchor.
+    A single tile turn is the only one that fits both shapes. It is generated
+    horizontally, unless its horizontal word is a lone letter that is not a
+    word, in which case only the vertical word makes it valid.
+
+    The score parts are carried along and added to as each tile is placed or
+    followed, see scorer.calculate_tracked_score.
+    """
 
-            # If the new letter touches other tiles in the opposite
-            # shape, check that the "cross" word it forms is valid.
-            (cross_word, _) = board.get_word_from_placement(placement, turn.shape.opposite)
-            if len(cross_word) > 1 and not dictionary.is_word(cross_word):
+    def __init__(self, board: Board, scoreboard: Scoreboard, dictionary: Dictionary, cross_checks: CrossChecks,
+                 anchors: list[Position]):
+        self._board = board
+        self._scoreboard = scoreboard
+        self._dictionary = dictionary
+        self._gaddag = dictionary.gaddag
+        self._cross_checks = cross_checks
+        self._anchors = set(anchors)
+        # The anchor being searched from, set by generate.
+        self._anchor: Optional[Position] = None
+        self._shape = Shape.HORIZONTAL
+        self._placements: list[Placement] = []
+        self._budget: Optional[SearchBudget] = None
+
+    def generate(self, anchor: Position, shape: Shape, letters: list[Letter], num_wildcards: int,
+                 budget: Optional[SearchBudget] = None) -> Iterator[Turn]:
+        """Yields the turns that have the given anchor as their start-most anchor, until the budget runs out."""
+        self._anchor = anchor
+        self._shape = shape
+        self._budget = budget
+        self._placements = []
+        yield from self._extend_start(anchor, self._gaddag.root, letters, num_wildcards, 0, 1, 0)
+
+    def _get_letter(self, position: Position) -> Optional[Letter]:
+        """Returns the board letter, or None if the square is empty or off the board."""
+        return self._board.get_letter_checked(position)
+
+    def _extend_start(self, position: Position, node: int, letters: list[Letter], num_wildcards: int,
+                      main_word_score: int, word_multiplier: int, cross_words_score: int) -> Iterator[Turn]:
+        """Fills the square at the start of the word so far, or follows the board tile on it."""
+        if self._budget is not None and not self._budget.spend():
+            return
+        board_letter = self._board.get_letter(position)
+        if board_letter is not None:
+            next_node = self._gaddag.follow(node, board_letter.val)
+            if next_node >= 0:
+                yield from self._after_start(position, next_node, letters, num_wildcards,
+                                             main_word_score + score_board_letter(self._scoreboard, board_letter),
+                                             word_multiplier, cross_words_score)
+            return
+        # Turns that place a tile on an earlier anchor are generated from that anchor.
+        if position != self._anchor and position in self._anchors:
+            return
+
+        mask = self._cross_checks.get_mask(position, self._shape.opposite)
+        for (letter, remaining_letters, remaining_wildcards) in _next_letters(letters, num_wildcards, mask):
+            next_node = self._gaddag.follow(node, letter.val)
+            if next_node < 0:
                 continue
-
-            # Check if the new word formed by adding the letter is:
-            # 1) A dictionary word. If so, store the turn.
-            # 2) A substring. If so, keep recursing.
-            new_word = prefix_word + letter.val + existing_word
-
-            word_type = dictionary.check(new_word)
-            if word_type is not None:
-                # Do not update the original reference, since this is
-                # being used by all the branches.
-                updated_turn = copy.copy(turn)
-                updated_turn.add_placement(placement)
-                updated_turn.update_range_start(start_position.move(shape.start_direction, len(prefix_word)))
-                if word_type.is_word:
-                    turns.append(updated_turn)
-                if word_type.is_substring:
-                    turns.extend(_expand(board, dictionary, remaining_letters, updated_turn))
-
-    # Attempt to add a new tile at the end of the current word.
-    end_position = board.get_next_empty_tile(turn.range.end, shape.end_direction)
-    if end_position:
-        existing_word_end_position = end_position.move(shape.end_direction.reverse)
-        existing_word_range = Range(turn.range.start, existing_word_end_position)
-        existing_word = _form_word(board, turn, existing_word_range, shape)
-        suffix_word = board.get_adjacent_tiles_until_empty(end_position, shape.end_direction)
-
-        for (letter, remaining_letters) in NextLetterIterator(letters):
-            placement = Placement(end_position, letter)
-
-            # If the new letter touches other tiles in the opposite
-            # shape, check that the "cross" word it forms is valid.
-            (cross_word, _) = board.get_word_from_placement(placement, turn.shape.opposite)
-            if len(cross_word) > 1 and not dictionary.is_word(cross_word):
+            placement = Placement(position, letter)
+            (letter_score, letter_word_multiplier, cross_score) = score_placement(
+                self._scoreboard, self._cross_checks, placement, self._shape)
+            self._placements.append(placement)
+            yield from self._after_start(position, next_node, remaining_letters, remaining_wildcards,
+                                         main_word_score + letter_score, word_multiplier * letter_word_multiplier,
+                                         cross_words_score + cross_score)
+            self._placements.pop()
+
+    def _after_start(self, start: Position, node: int, letters: list[Letter], num_wildcards: int,
+                     main_word_score: int, word_multiplier: int, cross_words_score: int) -> Iterator[Turn]:
+        """Continues from a filled start square: the word either starts here, or extends further towards the start."""
+        before_start = start.move(self._shape.start_direction)
+        if self._get_letter(before_start) is None:
+            end_node = self._gaddag.follow(node, SEPARATOR)
+            if end_node >= 0:
+                after_anchor = self._anchor.move(self._shape.end_direction)
+                if self._get_letter(after_anchor) is None and self._gaddag.is_final(end_node):
+                    turn = self._create_turn(start, self._anchor, letters, main_word_score, word_multiplier, cross_words_score)
+                    if turn is not None:
+                        yield turn
+                if self._board.size.is_within_bounds(after_anchor):
+                    yield from self._extend_end(after_anchor, start, end_node, letters, num_wildcards,
+                                                main_word_score, word_multiplier, cross_words_score)
+        if self._board.size.is_within_bounds(before_start) and (len(letters) > 0 or num_wildcards > 0
+                                                                 or self._get_letter(before_start) is not None):
+            yield from self._extend_start(before_start, node, letters, num_wildcards,
+                                          main_word_score, word_multiplier, cross_words_score)
+
+    def _extend_end(self, position: Position, start: Position, node: int, letters: list[Letter], num_wildcards: int,
+                    main_word_score: int, word_multiplier: int, cross_words_score: int) -> Iterator[Turn]:
+        """Fills the square after the end of the word so far, or follows the board tile on it."""
+        if self._budget is not None and not self._budget.spend():
+            return
+        board_letter = self._board.get_letter(position)
+        if board_letter is not None:
+            next_node = self._gaddag.follow(node, board_letter.val)
+            if next_node >= 0:
+                yield from self._after_end(position, start, next_node, letters, num_wildcards,
+                                           main_word_score + score_board_letter(self._scoreboard, board_letter),
+                                           word_multiplier, cross_words_score)
+            return
+
+        mask = self._cross_checks.get_mask(position, self._shape.opposite)
+        for (letter, remaining_letters, remaining_wildcards) in _next_letters(letters, num_wildcards, mask):
+            next_node = self._gaddag.follow(node, letter.val)
+            if next_node < 0:
                 continue
-
-            # Check if the new word formed by adding the letter is:
-            # 1) A dictionary word. If so, store the turn.
-            # 2) A substring. If so, keep recursing.
-            new_word = existing_word + letter.val + suffix_word
-            word_type = dictionary.check(new_word)
-            if word_type is not None:
-                # Do not update the original reference, since this is
-                # being used by all the branches.
-                updated_turn = copy.copy(turn)
-                updated_turn.add_placement(placement)
-                updated_turn.update_range_end(end_position.move(shape.end_direction, len(suffix_word)))
-                if word_type.is_word:
-                    turns.append(updated_turn)
-                if word_type.is_substring:
-                    turns.extend(_expand(board, dictionary, remaining_letters, updated_turn))
-
-    return turns
-
-
-@timer
-def _dedup_turns(turns: list[Turn]) -> list[Turn]:
-    return list(set(turns))
+            placement = Placement(position, letter)
+            (letter_score, letter_word_multiplier, cross_score) = score_placement(
+                self._scoreboard, self._cross_checks, placement, self._shape)
+            self._placements.append(placement)
+            yield from self._after_end(position, start, next_node, remaining_letters, remaining_wildcards,
+                                       main_word_score + letter_score, word_multiplier * letter_word_multiplier,
+                                       cross_words_score + cross_score)
+            self._placements.pop()
+
+    def _after_end(self, end: Position, start: Position, node: int, letters: list[Letter], num_wildcards: int,
+                   main_word_score: int, word_multiplier: int, cross_words_score: int) -> Iterator[Turn]:
+        """Continues from a filled end square: the word either ends here, or extends further towards the end."""
+        after_end = end.move(self._shape.end_direction)
+        if self._get_letter(after_end) is None and self._gaddag.is_final(node):
+            turn = self._create_turn(start, end, letters, main_word_score, word_multiplier, cross_words_score)
+            if turn is not None:
+                yield turn
+        if self._board.size.is_within_bounds(after_end) and (len(letters) > 0 or num_wildcards > 0
+                                                              or self._get_letter(after_end) is not None):
+            yield from self._extend_end(after_end, start, node, letters, num_wildcards,
+                                        main_word_score, word_multiplier, cross_words_score)
+
+    def _create_turn(self, start: Position, end: Position, letters: list[Letter], main_word_score: int,
+                     word_multiplier: int, cross_words_score: int) -> Optional[Turn]:
+        """Creates the turn for the current placements, or returns None if it should not be generated here.
+
+        A wildcard standing for a letter that is left over as a regular tile is
+        dropped, since playing the regular tile instead forms the same words.
+        """
+        if letters:
+            remaining = set(letter.val for letter in letters)
+            if any(placement.letter.is_wildcard and placement.letter.val in remaining
+                   for placement in self._placements):
+                return None
+        if len(self._placements) == 1 and self._shape == Shape.VERTICAL:
+            position = self._placements[0].position
+            if (self._cross_checks.has_adjacent_tiles(position, Shape.HORIZONTAL)
+                    or self._dictionary.is_word(self._placements[0].letter.val)):
+                return None
+        placements = {placement.position: placement.letter for placement in self._placements}
+        return Turn(placements, Range(start, end), self._shape, main_word_score, word_multiplier, cross_words_score)
+
+
+# Set in each worker process of _parallel_turns_finder by _init_worker.
+_worker_generator: Optional[_TurnGenerator] = None
+_worker_tiles: Optional[PlayerTiles] = None
+
+
+def _init_worker(board: Board, scoreboard: Scoreboard, dictionary: Dictionary, cross_checks: CrossChecks,
+                 anchors: list[Position], tiles: PlayerTiles):
+    global _worker_generator, _worker_tiles
+    _worker_generator = _TurnGenerator(board, scoreboard, dictionary, cross_checks, anchors)
+    _worker_tiles = tiles
+
+
+def _generate_task_turns(anchor: Position, shape: Shape, count_nodes: bool,
+                         deadline: Optional[float]) -> tuple[list[Turn], int]:
+    """Returns the turns of a task and the number of nodes visited if counted, stopping at the deadline if any."""
+    budget = None
+    if count_nodes:
+        budget = SearchBudget(deadline - time.monotonic() if deadline is not None else None)
+        if not budget.check():
+            return ([], 0)
+    turns = list(_worker_generator.generate(anchor, shape, _worker_tiles.letters, _worker_tiles.num_wildcards,
+                                            budget))
+    return (turns, budget.num_nodes if budget is not None else 0)
 
 
 def _is_turn_valid(turn: Turn, board: Board) -> bool:
@@ -183,31 +426,23 @@ def _filter_valid_turns(turns: list[Turn], board: Board) -> list[Turn]:
     return list(filter(lambda turn: _is_turn_valid(turn, board), turns))
 
 
-def _form_word(board: Board, turn: Turn, range: Range, shape: Shape) -> str:
-    """Uses the board and the placements made to form the word made by selecting the range."""
-    letters: list[str] = []
-    if shape == Shape.HORIZONTAL:
-        for position in RowIterator(range):
-            tile = board.get_tile(position)
-            if tile == '':
-                tile = turn.get_tile_unchecked(position)
-            letters.append(tile)
-        return ''.join(letters)
-    elif shape == Shape.VERTICAL:
-        for position in ColIterator(range):
-            tile = board.get_tile(position)
-            if tile == '':
-                tile = turn.get_tile_unchecked(position)
-            letters.append(tile)
-        return ''.join(letters)
-    else:
-        raise ValueError(f"Unsupported enum value: {shape}")
+@timer
+def _filter_mismatched_scores(turns: list[Turn], board: Board, scoreboard: Scoreboard) -> list[Turn]:
+    return list(filter(lambda turn: calculate_tracked_score(turn) != calculate_score(board, scoreboard, turn), turns))
 
 
 @timer
-def _score_turns(board: Board, scoreboard: Scoreboard, turns: list[Turn]) -> list[Solution]:
+def _score_turns(board: Board, scoreboard: Scoreboard, turns: list[Turn], tiles: Optional[PlayerTiles] = None,
+                 leaves: Optional[LeaveTable] = None) -> list[Solution]:
+    """Sorts the turns by descending score, plus the value of the tiles kept from the rack with a leave table."""
     solutions = []
-    for turn in turns:
-        solutions.append(Solution(board, scoreboard, turn))
+    if leaves is None or tiles is None:
+        for turn in turns:
+            solutions.append(Solution(board, scoreboard, turn))
+    else:
+        rack_leaves = leaves.get_rack_leaves(tiles)
+        for turn in turns:
+            solutions.append(Solution(board, scoreboard, turn, rack_leaves.get_turn_value(turn)))
     solutions.sort(reverse=True)
+    metrics.increment("turns_scored_total", len(solutions))
     return solutions
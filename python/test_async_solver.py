@@ -0,0 +1,96 @@
+import asyncio
+import io
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from async_solver import AsyncSolver
+from fixtures import FixtureTestCase, load_test_board
+from player_tiles import PlayerTiles
+from solver import solve_top_k
+
+
+class TestAsyncSolver(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with redirect_stdout(io.StringIO()):
+            cls.board = load_test_board(cls.scoreboard, cls.dictionary, "test3")
+            cls.tiles = PlayerTiles("GETHUTO")
+            cls.expected = solve_top_k(cls.board, cls.scoreboard, cls.dictionary, cls.tiles, 5)
+
+    def test_solve_async(self):
+        async def run():
+            async with AsyncSolver(self.scoreboard, self.dictionary) as solver:
+                updates = [update async for update in solver.solve_async(self.board, self.tiles, 5)]
+                limited = await solver.solve(self.board, self.tiles, 5, time_limit=0)
+            return (updates, limited)
+
+        (updates, limited) = asyncio.run(run())
+        self.assertEqual([update.is_final for update in updates], [False] * (len(updates) - 1) + [True])
+        self.assertFalse(updates[-1].is_partial)
+        self.assertEqual([solution.score for solution in updates[-1].solutions],
+                         [solution.score for solution in self.expected])
+        self.assertTrue(limited.is_partial)
+        self.assertEqual(limited.solutions, [])
+
+    def test_cancel_and_backpressure(self):
+        async def run():
+            async with AsyncSolver(self.scoreboard, self.dictionary, max_in_flight=1) as solver:
+                task = asyncio.create_task(solver.solve(self.board, self.tiles))
+                await asyncio.sleep(0.1)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                # The slot is freed once the worker has stopped.
+                while solver.num_in_flight > 0:
+                    await asyncio.sleep(0.01)
+
+                most_in_flight = 0
+
+                async def solve():
+                    nonlocal most_in_flight
+                    async for _ in solver.solve_async(self.board, self.tiles, 1):
+                        most_in_flight = max(most_in_flight, solver.num_in_flight)
+                    return await solver.solve(self.board, self.tiles, 1)
+
+                results = await asyncio.gather(*[solve() for _ in range(3)])
+            return (results, most_in_flight)
+
+        (results, most_in_flight) = asyncio.run(run())
+        self.assertEqual(most_in_flight, 1)
+        self.assertEqual([result.solutions[0].score for result in results], [self.expected[0].score] * 3)
+
+    def test_reuse_across_loops(self):
+        async def run(solver):
+            # The second solve waits for the first one's slot.
+            return await asyncio.gather(*[solver.solve(self.board, self.tiles, 1) for _ in range(2)])
+
+        solver = AsyncSolver(self.scoreboard, self.dictionary, max_in_flight=1)
+        try:
+            for _ in range(2):
+                results = asyncio.run(run(solver))
+                self.assertEqual([result.solutions[0].score for result in results], [self.expected[0].score] * 2)
+        finally:
+            solver.close()
+
+    def test_loop_closed_before_worker(self):
+        solver = AsyncSolver(self.scoreboard, self.dictionary)
+        updates = solver.solve_async(self.board, self.tiles)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(updates.__anext__())
+        loop.close()
+        try:
+            # The worker finishes after its loop has closed, and still frees its slot.
+            deadline = time.monotonic() + 30
+            while solver.num_in_flight > 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(solver.num_in_flight, 0)
+        finally:
+            asyncio.run(updates.aclose())
+            solver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import io
+import json
+import os
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from batch import run_batch
+from board import Board
+from fixtures import ROOT_PATH, FixtureTestCase
+from player_tiles import PlayerTiles
+from solver import solve_top_k
+
+
+class TestBatch(FixtureTestCase):
+
+    def test_run_batch(self):
+        game_path = os.path.join(ROOT_PATH, "testcases", "test3_state.txt")
+        with open(game_path) as file:
+            state = file.read()
+        jobs = io.StringIO("\n".join([
+            json.dumps({"game": game_path, "tiles": "GETHUTO", "k": 3}),
+            "",
+            json.dumps({"id": "inline", "state": state, "tiles": "GETHUTO", "k": 3}),
+            "not json",
+        ]))
+        output = io.StringIO()
+        with redirect_stderr(io.StringIO()) as stderr:
+            run_batch(self.scoreboard, self.dictionary, jobs, output)
+
+        with redirect_stdout(io.StringIO()):
+            board = Board(self.scoreboard.size, self.dictionary)
+            board.load_state_text(state)
+            expected = [solution.serialize() for solution in
+                        solve_top_k(board, self.scoreboard, self.dictionary, PlayerTiles("GETHUTO"), 3)]
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([result["id"] for result in results], [1, "inline", 4])
+        self.assertEqual(results[0]["solutions"], expected)
+        self.assertEqual(results[1]["solutions"], expected)
+        self.assertIn("error", results[2])
+        self.assertIn("Solved 3 jobs with 1 errors", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
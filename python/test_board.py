@@ -0,0 +1,99 @@
+import copy
+import random
+import unittest
+
+from board import Board
+from constants import ALPHABET
+from enums import Direction
+from fixtures import load_dictionary
+from letter import Letter
+from placement import Placement
+from position import Position
+from size import Size
+
+
+class TestBoard(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.dictionary = load_dictionary()
+
+    def setUp(self):
+        # C A T across the top row, with S below the A.
+        self.board = Board(Size(3, 4), self.dictionary)
+        self.board.set_tile(Placement(Position(0, 0), Letter("C")))
+        self.board.set_tile(Placement(Position(0, 1), Letter("A")))
+        self.board.set_tile(Placement(Position(0, 2), Letter("T", True)))
+        self.board.set_tile(Placement(Position(1, 1), Letter("S")))
+
+    def test_letters(self):
+        self.assertEqual(str(self.board), "C A t -\n- S - -\n- - - -\n")
+        self.assertEqual(self.board.get_letter(Position(0, 2)), Letter("T", True))
+        self.assertEqual(self.board.get_tile(Position(0, 2)), "T")
+        self.assertIsNone(self.board.get_letter(Position(2, 2)))
+        self.assertEqual(self.board.get_tile(Position(2, 2)), "")
+        self.assertIsNone(self.board.get_letter_checked(Position(-1, 0)))
+        self.assertEqual(self.board.get_row(1), [None, Letter("S"), None, None])
+        self.assertEqual(self.board.get_column(1), [Letter("A"), Letter("S"), None])
+        with self.assertRaises(ValueError):
+            self.board.set_tile(Placement(Position(0, 0), Letter("B")))
+
+    def test_walks_stop_at_border(self):
+        self.assertIsNone(self.board.get_adjacent_tile(Position(0, 0), Direction.UP))
+        self.assertEqual(self.board.get_adjacent_tile(Position(0, 3), Direction.DOWN), "")
+        self.assertEqual(self.board.get_adjacent_tiles_until_empty(Position(0, 3), Direction.LEFT), "CAT")
+        self.assertEqual(self.board.get_adjacent_tiles_until_empty(Position(2, 1), Direction.UP), "AS")
+        self.assertEqual(self.board.get_last_non_empty_tile(Position(0, 2), Direction.LEFT), Position(0, 0))
+        self.assertIsNone(self.board.get_next_empty_tile(Position(0, 2), Direction.LEFT))
+        self.assertEqual(self.board.get_next_empty_tile(Position(0, 0), Direction.RIGHT), Position(0, 3))
+        self.assertEqual(self.board.get_first_tile_positions(),
+                         [Position(0, 3), Position(1, 0), Position(1, 2), Position(2, 1)])
+
+    def test_copy_is_independent(self):
+        new_board = self.board.copy_and_apply_placements([Placement(Position(0, 3), Letter("S"))])
+        self.assertEqual(new_board.get_tile(Position(0, 3)), "S")
+        self.assertEqual(self.board.get_tile(Position(0, 3)), "")
+        self.assertTrue(new_board.is_state_valid()[0])
+        self.assertFalse(self.board.is_empty())
+        self.assertTrue(copy.copy(Board(Size(3, 4), self.dictionary)).is_empty())
+
+    def test_zobrist_hash(self):
+        self.assertEqual(Board(Size(3, 4), self.dictionary).zobrist_hash, 0)
+        # The same tiles set in another order, or loaded from text, have the same hash.
+        board = Board(Size(3, 4), self.dictionary)
+        for (position, letter) in [((1, 1), "S"), ((0, 2), "t"), ((0, 0), "C"), ((0, 1), "A")]:
+            board.set_tile(Placement(Position(*position), Letter(letter.upper(), letter.islower())))
+        loaded = Board(Size(3, 4), self.dictionary)
+        loaded.load_state_text(str(self.board))
+        self.assertEqual(board.zobrist_hash, self.board.zobrist_hash)
+        self.assertEqual(loaded.zobrist_hash, self.board.zobrist_hash)
+        self.assertEqual(str(board), str(self.board))
+        # A wildcard hashes differently from the regular letter.
+        board = Board(Size(3, 4), self.dictionary)
+        board.set_tile(Placement(Position(0, 0), Letter("C", True)))
+        self.assertNotEqual(board.zobrist_hash, Board(Size(3, 4), self.dictionary).copy_and_apply_placements(
+            [Placement(Position(0, 0), Letter("C"))]).zobrist_hash)
+
+    def test_zobrist_hash_collisions(self):
+        # Random playouts of up to 7 tiles per turn, whose boards share many tiles.
+        rng = random.Random(17)
+        size = Size(15, 15)
+        boards_by_hash: dict[int, str] = {}
+        for _ in range(100):
+            board = Board(size, self.dictionary)
+            empty = [Position(row, col) for row in range(size.num_rows) for col in range(size.num_cols)]
+            rng.shuffle(empty)
+            while len(empty) > 7:
+                placements = [Placement(empty.pop(), Letter(rng.choice(ALPHABET), rng.random() < 0.05))
+                              for _ in range(rng.randint(1, 7))]
+                board = board.copy_and_apply_placements(placements)
+                state = str(board)
+                self.assertEqual(boards_by_hash.setdefault(board.zobrist_hash, state), state)
+                loaded = Board(size, self.dictionary)
+                loaded.load_state_text(state)
+                self.assertEqual(loaded.zobrist_hash, board.zobrist_hash)
+        self.assertGreater(len(boards_by_hash), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
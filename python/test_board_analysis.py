@@ -0,0 +1,49 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from board import Board
+from board_analysis import BoardAnalysis
+from enums import Shape
+from fixtures import FixtureTestCase
+from iterators import BoardIterator
+from player_tiles import PlayerTiles
+from solver import solve, solve_top_k
+
+
+class TestBoardAnalysis(FixtureTestCase):
+
+    def assertAnalysisEqual(self, analysis: BoardAnalysis, expected: BoardAnalysis):
+        self.assertEqual(analysis.get_anchors(), expected.get_anchors())
+        for position in BoardIterator(self.scoreboard.size):
+            for shape in [Shape.HORIZONTAL, Shape.VERTICAL]:
+                self.assertEqual(analysis.cross_checks.get_mask(position, shape),
+                                 expected.cross_checks.get_mask(position, shape), (position, shape))
+                self.assertEqual(analysis.cross_checks.get_cross_score(position, shape),
+                                 expected.cross_checks.get_cross_score(position, shape), (position, shape))
+
+    def test_copy_and_apply_placements(self):
+        board = Board(self.scoreboard.size, self.dictionary)
+        analysis = BoardAnalysis(board, self.scoreboard, self.dictionary)
+        for tiles in ["GETHUTO", "RAINSEL", "PLOWMEN", "DARKEST", "QUIZ*ES", "BOXCART"]:
+            with redirect_stdout(io.StringIO()):
+                solutions = solve_top_k(analysis.board, self.scoreboard, self.dictionary, PlayerTiles(tiles), 1,
+                                        analysis)
+            placements = solutions[0].turn.generate_placement_list()
+            next_analysis = analysis.copy_and_apply_placements(placements)
+            expected = BoardAnalysis(next_analysis.board, self.scoreboard, self.dictionary)
+            self.assertAnalysisEqual(next_analysis, expected)
+            # The previous analysis is unchanged.
+            self.assertAnalysisEqual(analysis, BoardAnalysis(analysis.board, self.scoreboard, self.dictionary))
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(
+                    [solution.serialize() for solution in
+                     solve(next_analysis.board, self.scoreboard, self.dictionary, PlayerTiles("ENTRAPS"),
+                           analysis=next_analysis)],
+                    [solution.serialize() for solution in
+                     solve(next_analysis.board, self.scoreboard, self.dictionary, PlayerTiles("ENTRAPS"))])
+            analysis = next_analysis
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import random
+import unittest
+
+from fixtures import ROOT_PATH
+from gaddag import SEPARATOR, Gaddag, OmittedWords
+
+
+class TestGaddag(unittest.TestCase):
+
+    def setUp(self):
+        self.words = ["CAT", "CATS", "AT", "SCAT", "DOG"]
+        self.gaddag = Gaddag.from_words(self.words)
+
+    def test_is_word(self):
+        for word in self.words:
+            self.assertTrue(self.gaddag.is_word(word))
+        for value in ["", "CA", "ATS", "SCATS", "DOGS", "TAC"]:
+            self.assertFalse(self.gaddag.is_word(value))
+
+    def test_check_matches_all_substrings(self):
+        substrings = set()
+        for word in self.words:
+            for start in range(len(word)):
+                for end in range(start + 1, len(word) + 1):
+                    substrings.add(word[start:end])
+
+        for substring in substrings:
+            word_type = self.gaddag.check(substring)
+            self.assertIsNotNone(word_type)
+            self.assertTrue(word_type.is_substring)
+            self.assertEqual(word_type.is_word, substring in self.words)
+
+        for value in ["", "TC", "CATT", "GOD", "SD", "Z"]:
+            self.assertIsNone(self.gaddag.check(value))
+            self.assertFalse(self.gaddag.is_substring(value))
+
+    def test_follow(self):
+        # The prefix 'CA' is walked in reverse, then the separator, then the suffix.
+        node = self.gaddag.root
+        for char in "AC>":
+            node = self.gaddag.follow(node, char)
+        self.assertFalse(self.gaddag.is_final(node))
+        node = self.gaddag.follow(node, "T")
+        self.assertTrue(self.gaddag.is_final(node))
+        node = self.gaddag.follow(node, "S")
+        self.assertTrue(self.gaddag.is_final(node))
+        self.assertEqual(self.gaddag.follow(node, "Q"), -1)
+
+    def test_omitted_words(self):
+        omitted = OmittedWords(self.gaddag, ["SCAT", "DOG", "CATSUP"])
+        self.assertEqual(omitted.words, ["DOG", "SCAT"])
+        self.assertFalse(omitted.is_word("SCAT"))
+        self.assertTrue(omitted.is_word("CATS"))
+        # SC and DO were only part of omitted words, while S is still part of CATS.
+        for value in ["SC", "SCA", "DO", "G"]:
+            self.assertIsNone(omitted.check(value))
+        self.assertTrue(omitted.is_substring("S"))
+        self.assertTrue(omitted.is_substring("CAT"))
+
+    def test_omitted_words_match_rebuilt(self):
+        with open(os.path.join(ROOT_PATH, "dictionaries", "10k-dictionary.txt"), "r") as file:
+            words = sorted(set(line.strip().upper() for line in file if line.strip() != ""))
+        randomizer = random.Random(0)
+        words = randomizer.sample(words, 400)
+        omitted_words = randomizer.sample(words, 60)
+        omitted = OmittedWords(Gaddag.from_words(words), omitted_words)
+        rebuilt = Gaddag.from_words(set(words) - set(omitted_words))
+
+        # Every path that can be walked, and whether it ends at a final node.
+        def get_paths(gaddag) -> set[tuple[str, bool]]:
+            paths = set()
+            stack = [(gaddag.root, "")]
+            while stack:
+                (node, path) = stack.pop()
+                paths.add((path, gaddag.is_final(node)))
+                for char in "ABCDEFGHIJKLMNOPQRSTUVWXYZ" + SEPARATOR:
+                    next_node = gaddag.follow(node, char)
+                    if next_node >= 0:
+                        stack.append((next_node, path + char))
+            return paths
+
+        self.assertEqual(get_paths(omitted), get_paths(rebuilt))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from fixtures import ROOT_PATH, FixtureTestCase
+from goldens import BINARY_FORMAT, TEXT_FORMAT, get_golden_path, iter_golden, run_goldens
+
+
+class TestGoldens(FixtureTestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for test_name in ["test3", "test6"]:
+            for suffix in ["state", "tiles"]:
+                shutil.copy(os.path.join(ROOT_PATH, "testcases", f"{test_name}_{suffix}.txt"), self.directory)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_goldens(self, golden_format: str, workers: int = 1, regenerate: bool = False) -> dict:
+        diffs = run_goldens(self.scoreboard, self.dictionary, self.directory, ["test3", "test6"], golden_format,
+                            workers, regenerate)
+        return {diff.test_name: diff for diff in diffs}
+
+    def test_regenerate_and_compare(self):
+        self.run_goldens(TEXT_FORMAT, regenerate=True)
+        self.run_goldens(BINARY_FORMAT, workers=2, regenerate=True)
+        for test_name in ["test3", "test6"]:
+            self.assertEqual(list(iter_golden(get_golden_path(self.directory, test_name, BINARY_FORMAT))),
+                             list(iter_golden(get_golden_path(self.directory, test_name, TEXT_FORMAT))))
+
+        for golden_format in [TEXT_FORMAT, BINARY_FORMAT]:
+            diffs = self.run_goldens(golden_format, workers=2)
+            self.assertTrue(all(diff.is_pass for diff in diffs.values()))
+            self.assertGreater(diffs["test3"].num_turns, 0)
+
+    def test_diff(self):
+        self.run_goldens(TEXT_FORMAT, regenerate=True)
+        golden_file = get_golden_path(self.directory, "test3", TEXT_FORMAT)
+        with open(golden_file, "r") as file:
+            lines = file.readlines()
+        (score, placements) = lines[0].strip().split("||")
+        # Changes a score, drops a turn and adds a turn that cannot be made.
+        lines[0] = f"{int(score) + 1}||{placements}\n"
+        del lines[1]
+        lines.append("5||0Q\n")
+        with open(golden_file, "w") as file:
+            file.writelines(lines)
+
+        diffs = self.run_goldens(TEXT_FORMAT)
+        self.assertTrue(diffs["test6"].is_pass)
+        diff = diffs["test3"]
+        self.assertFalse(diff.is_pass)
+        self.assertEqual((diff.num_extra, diff.num_missing, diff.num_incorrect), (1, 1, 1))
+        self.assertIn("missing 5||0Q", diff.examples)
+
+        with open(golden_file, "w") as file:
+            file.write("5|0Q\n")
+        self.assertIn("Improperly formatted line", self.run_goldens(TEXT_FORMAT)["test3"].error)
+        self.assertIsNotNone(self.run_goldens(BINARY_FORMAT)["test3"].error)
+
+
+if __name__ == "__main__":
+    unittest.main()
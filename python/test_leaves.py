@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from itertools import combinations_with_replacement
+
+from fixtures import FixtureTestCase, load_test_board
+from leaves import NUM_LEAVES, NUM_TILE_CODES, LeaveTable, get_leave_index
+from player_tiles import PlayerTiles
+from solver import solve, solve_top_k
+
+
+class TestLeaves(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Keeping an S or a wildcard scores more next turn, and keeping a Q scores less.
+        samples = [("S", 40)] * 20 + [("*", 50)] * 20 + [("Q", 10)] * 20 + [("AE", 25)] * 40
+        cls.leaves = LeaveTable.from_samples(samples)
+
+    def test_get_leave_index(self):
+        indexes = [get_leave_index(codes) for num_tiles in range(3)
+                   for codes in combinations_with_replacement(range(NUM_TILE_CODES), num_tiles)]
+        self.assertEqual(sorted(indexes), list(range(len(indexes))))
+        self.assertEqual(get_leave_index([NUM_TILE_CODES - 1] * 6), NUM_LEAVES - 1)
+
+    def test_from_samples(self):
+        self.assertEqual(len(self.leaves), NUM_LEAVES)
+        self.assertGreater(self.leaves.get_value("*"), self.leaves.get_value("S"))
+        self.assertGreater(self.leaves.get_value("S"), 0)
+        self.assertLess(self.leaves.get_value("Q"), 0)
+        # Unsampled leaves are estimated from the smaller leaves, in any order.
+        self.assertAlmostEqual(self.leaves.get_value("SQ"),
+                               self.leaves.get_value("S") + self.leaves.get_value("Q") - self.leaves.get_value(""),
+                               delta=0.02)
+        self.assertEqual(self.leaves.get_value("QS*"), self.leaves.get_value("*SQ"))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "leaves.bin")
+            self.leaves.save(filepath)
+            loaded = LeaveTable.load(filepath)
+            for leave in ["", "S", "Q", "AE", "EEIOU*"]:
+                self.assertEqual(loaded.get_value(leave), self.leaves.get_value(leave))
+            with open(filepath, "r+b") as file:
+                file.truncate(100)
+            self.assertIsNone(LeaveTable.load(filepath))
+            self.assertIsNone(LeaveTable.load(os.path.join(directory, "missing.bin")))
+
+    def test_solve_with_leaves(self):
+        board = load_test_board(self.scoreboard, self.dictionary, "test3")
+        tiles = PlayerTiles("QSTEAR*")
+        with redirect_stdout(io.StringIO()):
+            solutions = solve(board, self.scoreboard, self.dictionary, tiles, leaves=self.leaves)
+            top = solve_top_k(board, self.scoreboard, self.dictionary, tiles, 3, leaves=self.leaves)
+
+        equities = [solution.equity for solution in solutions]
+        self.assertEqual(equities, sorted(equities, reverse=True))
+        for solution in solutions[:20]:
+            leave = list("QSTEAR*")
+            for letter in solution.turn.letters:
+                leave.remove("*" if letter.is_wildcard else letter.val)
+            self.assertEqual(solution.leave_value, self.leaves.get_value("".join(leave)))
+            self.assertEqual(solution.equity, solution.score + solution.leave_value)
+        self.assertEqual([solution.equity for solution in top], equities[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
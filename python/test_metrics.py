@@ -0,0 +1,72 @@
+import io
+import json
+import unittest
+from contextlib import redirect_stdout
+
+import metrics
+from board import Board
+from fixtures import load_dictionary, load_scoreboard
+from player_tiles import PlayerTiles
+from solver import solve
+
+
+class TestMetrics(unittest.TestCase):
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_registry(self):
+        registry = metrics.MetricsRegistry()
+        registry.increment("solves_total")
+        registry.increment("solves_total", 2)
+        registry.increment("requests_total", labels={"status": "400"})
+        registry.observe("phase_seconds", 0.02, {"phase": "solve"})
+        registry.observe("phase_seconds", 2.0, {"phase": "solve"})
+
+        self.assertEqual(registry.get_counter("solves_total"), 3)
+        self.assertEqual(registry.get_counter("requests_total", {"status": "400"}), 1)
+        self.assertEqual(registry.get_counter("requests_total"), 0)
+        histogram = registry.get_histogram("phase_seconds", {"phase": "solve"})
+        self.assertEqual(histogram.count, 2)
+        self.assertAlmostEqual(histogram.sum, 2.02)
+        self.assertEqual(dict(histogram.get_buckets())[0.05], 1)
+        self.assertEqual(dict(histogram.get_buckets())[5.0], 2)
+
+        self.assertEqual(json.loads(registry.to_json()), registry.snapshot())
+        text = registry.to_prometheus()
+        self.assertIn("# TYPE scrabble_solves_total counter\nscrabble_solves_total 3\n", text)
+        self.assertIn('scrabble_requests_total{status="400"} 1\n', text)
+        self.assertIn('scrabble_phase_seconds_bucket{phase="solve",le="0.05"} 1\n', text)
+        self.assertIn('scrabble_phase_seconds_bucket{phase="solve",le="+Inf"} 2\n', text)
+        self.assertIn('scrabble_phase_seconds_count{phase="solve"} 2\n', text)
+
+        merged = metrics.MetricsRegistry()
+        merged.merge(registry.snapshot())
+        merged.merge(registry.snapshot())
+        self.assertEqual(merged.get_counter("solves_total"), 6)
+        self.assertEqual(merged.get_histogram("phase_seconds", {"phase": "solve"}).count, 4)
+
+    def test_solve(self):
+        scoreboard = load_scoreboard()
+        dictionary = load_dictionary()
+        board = Board(scoreboard.size, dictionary)
+
+        # Nothing is recorded, or printed, while metrics are disabled.
+        with redirect_stdout(io.StringIO()) as stdout:
+            solutions = solve(board, scoreboard, dictionary, PlayerTiles("GETHUTO"))
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertIsNone(metrics.get_registry())
+
+        registry = metrics.enable()
+        solve(board, scoreboard, dictionary, PlayerTiles("GETHUTO"), validate=True)
+        self.assertEqual(registry.get_counter("solves_total"), 1)
+        self.assertEqual(registry.get_counter("turns_generated_total"), len(solutions))
+        self.assertEqual(registry.get_counter("turns_scored_total"), len(solutions))
+        self.assertEqual(registry.get_counter("turns_validated_total"), len(solutions))
+        self.assertEqual(registry.get_counter("turns_duplicate_total"), 0)
+        self.assertEqual(registry.get_counter("turns_mismatched_score_total"), 0)
+        self.assertEqual(registry.get_histogram("phase_seconds", {"phase": "solver.solve"}).count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
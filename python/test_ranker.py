@@ -0,0 +1,60 @@
+import io
+import os
+import time
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+
+from fixtures import ROOT_PATH, FixtureTestCase, load_test_board
+from player_tiles import PlayerTiles
+from ranker import get_unseen_tiles, rank_moves
+from simulator import load_tile_counts
+from solver import solve_top_k
+
+
+class TestRanker(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.board = load_test_board(cls.scoreboard, cls.dictionary, "test3")
+        cls.tile_counts = load_tile_counts(os.path.join(ROOT_PATH, "tiles.txt"))
+        cls.tiles = PlayerTiles("GETHUT*")
+
+    def test_get_unseen_tiles(self):
+        unseen = Counter(get_unseen_tiles(self.board, self.tiles, self.tile_counts))
+        seen = Counter("*" if letter.is_wildcard else letter.val
+                       for row in range(15) for letter in self.board.get_row(row) if letter is not None)
+        seen.update("GETHUT*")
+        for (tile, count) in self.tile_counts.items():
+            self.assertEqual(unseen[tile], max(0, count - seen[tile]), tile)
+
+    def test_rank_moves(self):
+        start_time = time.perf_counter()
+        moves = rank_moves(self.board, self.scoreboard, self.dictionary, self.tiles, self.tile_counts, 2.0,
+                           num_candidates=5, workers=2)
+        elapsed = time.perf_counter() - start_time
+        # Only terminating the pool may run past the budget, which is slow on a loaded machine.
+        self.assertLess(elapsed, 10.0)
+
+        with redirect_stdout(io.StringIO()):
+            candidates = solve_top_k(self.board, self.scoreboard, self.dictionary, self.tiles, 5)
+        self.assertEqual(sorted(move.solution.serialize() for move in moves),
+                         sorted(solution.serialize() for solution in candidates))
+        for move in moves:
+            self.assertEqual(move.mean_spread is None, move.num_samples == 0)
+            self.assertEqual(move.value, move.solution.score + (move.mean_spread or 0.0))
+        # Sampled moves come first by value, then the rest by score.
+        self.assertGreater(moves[0].num_samples, 0)
+        keys = [(move.num_samples > 0, move.value) for move in moves]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_no_budget(self):
+        # Even the candidates are not searched for.
+        moves = rank_moves(self.board, self.scoreboard, self.dictionary, self.tiles, self.tile_counts, 0.0,
+                           num_candidates=3)
+        self.assertEqual(moves, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
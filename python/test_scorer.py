@@ -0,0 +1,32 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from fixtures import FixtureTestCase, load_test_board, read_test_tiles
+from scorer import calculate_score, calculate_tracked_score
+from solver import solve
+
+TEST_NAMES = ["test1", "test2", "test3", "test4", "test5", "test6"]
+
+
+class TestScorer(FixtureTestCase):
+
+    def test_tracked_score_matches_reference(self):
+        """The score tracked during the search agrees with the reference scorer on every test case."""
+        for test_name in TEST_NAMES:
+            with self.subTest(test_name), redirect_stdout(io.StringIO()):
+                board = load_test_board(self.scoreboard, self.dictionary, test_name)
+                solutions = solve(board, self.scoreboard, self.dictionary, read_test_tiles(test_name))
+
+                self.assertGreater(len(solutions), 0)
+                for solution in solutions:
+                    self.assertIsNotNone(calculate_tracked_score(solution.turn))
+                    self.assertEqual(
+                        solution.score,
+                        calculate_score(board, self.scoreboard, solution.turn),
+                        solution.serialize(),
+                    )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import json
+import os
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from contextlib import redirect_stdout
+
+import metrics
+from board import Board
+from fixtures import ROOT_PATH, FixtureTestCase
+from player_tiles import PlayerTiles
+from server import METRICS_PATH, SOLVE_PATH, SolverServer, solve_request
+from solve_cache import SolveCache
+from solver import solve_top_k
+
+
+class TestServer(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(ROOT_PATH, "testcases", "test3_state.txt")) as file:
+            cls.state = file.read()
+        cls.server = SolverServer(("127.0.0.1", 0), cls.scoreboard, cls.dictionary)
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def post(self, body: bytes) -> tuple[int, dict]:
+        url = f"http://127.0.0.1:{self.server.server_port}{SOLVE_PATH}"
+        try:
+            with redirect_stdout(io.StringIO()), urllib.request.urlopen(url, body) as response:
+                return (response.status, json.loads(response.read()))
+        except urllib.error.HTTPError as e:
+            return (e.code, json.loads(e.read()))
+
+    def test_solve(self):
+        (status, response) = self.post(json.dumps({"state": self.state, "tiles": "GETHUTO", "k": 5}).encode())
+
+        with redirect_stdout(io.StringIO()):
+            board = Board(self.scoreboard.size, self.dictionary)
+            board.load_state_text(self.state)
+            expected = solve_top_k(board, self.scoreboard, self.dictionary, PlayerTiles("GETHUTO"), 5)
+        self.assertEqual(status, 200)
+        self.assertEqual(response["solutions"], [solution.serialize() for solution in expected])
+
+    def test_partial(self):
+        cache = SolveCache()
+        with redirect_stdout(io.StringIO()):
+            partial = solve_request(self.scoreboard, self.dictionary,
+                                    {"state": self.state, "tiles": "GETHUTO", "max_nodes": 50}, cache)
+            complete = solve_request(self.scoreboard, self.dictionary,
+                                     {"state": self.state, "tiles": "GETHUTO", "time_limit": 60}, cache)
+        self.assertTrue(partial["partial"])
+        self.assertFalse(complete["partial"])
+        self.assertLess(len(partial["solutions"]), len(complete["solutions"]))
+        # Only the complete solutions are cached, and a cached response has the same fields.
+        self.assertEqual(len(cache), 1)
+        cached = solve_request(self.scoreboard, self.dictionary,
+                               {"state": self.state, "tiles": "GETHUTO", "max_nodes": 50}, cache)
+        self.assertEqual(cached["solutions"], complete["solutions"])
+        self.assertFalse(cached["partial"])
+        self.assertEqual(cache.hits, 1)
+
+        # The same holds for a server that solves in a pool.
+        server = SolverServer(("127.0.0.1", 0), self.scoreboard, self.dictionary, workers=2, cache=SolveCache())
+        try:
+            request = {"state": self.state, "tiles": "GETHUTO", "k": 3, "time_limit": 60}
+            self.assertEqual([server.solve(request)["partial"] for _ in range(2)], [False, False])
+        finally:
+            server.server_close()
+
+    def test_invalid_requests(self):
+        for body in [b"not json", b"[]", json.dumps({"state": self.state}).encode(),
+                     json.dumps({"state": self.state, "tiles": "G3"}).encode(),
+                     json.dumps({"state": self.state, "tiles": "GETHUTO", "time_limit": "1"}).encode()]:
+            with self.subTest(body=body[:20]):
+                (status, response) = self.post(body)
+                self.assertEqual(status, 400)
+                self.assertIn("error", response)
+
+    def test_metrics(self):
+        url = f"http://127.0.0.1:{self.server.server_port}{METRICS_PATH}"
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(url)
+        self.assertEqual(context.exception.code, 404)
+
+        metrics.enable()
+        try:
+            self.post(json.dumps({"state": self.state, "tiles": "GETHUTO", "k": 5}).encode())
+            with urllib.request.urlopen(url) as response:
+                text = response.read().decode()
+        finally:
+            metrics.disable()
+        self.assertIn('scrabble_requests_total{status="200"} 1', text)
+        self.assertIn("scrabble_turns_scored_total 5", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
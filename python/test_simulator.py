@@ -0,0 +1,50 @@
+import os
+import random
+import unittest
+
+from fixtures import ROOT_PATH, FixtureTestCase
+from simulator import TileBag, format_summary, load_tile_counts, play_game, run_games
+
+
+class TestSimulator(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # A small bag keeps the games short.
+        cls.tile_counts = {"A": 4, "E": 5, "I": 3, "O": 3, "N": 3, "R": 3, "S": 2, "T": 3, "L": 2, "D": 2, "*": 1}
+
+    def test_tile_bag(self):
+        counts = load_tile_counts(os.path.join(ROOT_PATH, "tiles.txt"))
+        self.assertEqual(sum(counts.values()), 100)
+        bag = TileBag(counts, random.Random(1))
+        tiles = bag.draw(7) + bag.draw(100)
+        self.assertEqual(len(bag), 0)
+        self.assertEqual(bag.draw(7), [])
+        self.assertEqual(sorted(tiles), sorted(tile for (tile, count) in counts.items() for _ in range(count)))
+
+    def test_play_game(self):
+        result = play_game(self.scoreboard, self.dictionary, self.tile_counts, 3)
+        self.assertGreater(result.num_moves, 2)
+        self.assertEqual(len(result.scores), 2)
+        self.assertNotEqual(result.slowest_state, "")
+        # Tiles left on the racks only move points between the players.
+        self.assertLessEqual(sum(result.scores), sum(result.move_scores))
+        self.assertGreater(len(result.leave_samples), 0)
+        self.assertTrue(all(len(leave) < 7 for (leave, _) in result.leave_samples))
+        again = play_game(self.scoreboard, self.dictionary, self.tile_counts, 3)
+        self.assertEqual((again.scores, again.move_scores), (result.scores, result.move_scores))
+
+    def test_run_games(self):
+        serial = run_games(self.scoreboard, self.dictionary, self.tile_counts, 2, 5)
+        parallel = run_games(self.scoreboard, self.dictionary, self.tile_counts, 2, 5, workers=2)
+        self.assertEqual([result.seed for result in parallel], [5, 6])
+        self.assertEqual([result.move_scores for result in parallel], [result.move_scores for result in serial])
+        self.assertEqual([result.scores for result in parallel], [result.scores for result in serial])
+        summary = format_summary(serial, 1.0)
+        self.assertIn("2 games", summary)
+        self.assertIn("games/sec", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
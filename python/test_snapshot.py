@@ -0,0 +1,55 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from fixtures import load_dictionary
+from gaddag import Gaddag
+from snapshot import Snapshot, get_snapshot_path
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def test_save_and_load(self):
+        words = ["CAT", "CATS", "AT", "SCAT", "DOG"]
+        snapshot = Snapshot(Gaddag.from_words(words), len(words), b"s" * 32)
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "words.gaddag")
+            snapshot.save(filepath)
+            loaded = Snapshot.load(filepath)
+
+        self.assertIsNotNone(loaded)
+        self.assertEqual(loaded.num_words, len(words))
+        self.assertTrue(loaded.is_current(b"s" * 32))
+        self.assertFalse(loaded.is_current(b"x" * 32))
+        for word in words:
+            self.assertTrue(loaded.gaddag.is_word(word))
+        self.assertTrue(loaded.gaddag.is_substring("CA"))
+        self.assertEqual(loaded.gaddag.get_count(loaded.gaddag.root), sum(len(word) for word in words))
+        self.assertFalse(loaded.gaddag.is_word("CA"))
+        self.assertIsNone(loaded.gaddag.check("TC"))
+
+    def test_load_missing(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(Snapshot.load(os.path.join(directory, "missing.gaddag")))
+
+    def test_send_unsaved_dictionary(self):
+        dictionary = load_dictionary()
+        dictionary.set_omitted_words(["ABOUT"])
+        data = pickle.dumps(dictionary)
+        # The lexicon is written once to a file that every copy maps, rather than sent.
+        self.assertLess(len(data), 4096)
+        self.assertEqual(len(pickle.dumps(dictionary)), len(data))
+        copy = pickle.loads(data)
+        self.assertTrue(os.path.exists(copy.shared_filepath))
+        self.assertEqual(copy.version, dictionary.version)
+        self.assertFalse(copy.is_word("ABOUT"))
+        self.assertTrue(copy.is_word("ABOVE"))
+        self.assertEqual(pickle.loads(pickle.dumps(copy)).shared_filepath, copy.shared_filepath)
+
+    def test_get_snapshot_path(self):
+        self.assertEqual(get_snapshot_path("dictionaries/10k-dictionary.txt"), "dictionaries/10k-dictionary.gaddag")
+
+
+if __name__ == "__main__":
+    unittest.main()
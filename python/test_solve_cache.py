@@ -0,0 +1,95 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from batch import run_batch
+from board import Board
+from fixtures import ROOT_PATH, FixtureTestCase
+from player_tiles import PlayerTiles
+from server import solve_request
+from solve_cache import SolveCache, get_cache_key
+
+
+class TestSolveCache(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with open(os.path.join(ROOT_PATH, "testcases", "test3_state.txt")) as file:
+            cls.state = file.read()
+
+    def test_get_cache_key(self):
+        board = Board(self.scoreboard.size, self.dictionary)
+        board.load_state_text(self.state)
+        key = get_cache_key(board, self.scoreboard, self.dictionary, PlayerTiles("GETHUTO"), 5)
+        self.assertEqual(key, get_cache_key(board, self.scoreboard, self.dictionary, PlayerTiles("UTOGTHE"), 5))
+        self.assertNotEqual(key, get_cache_key(board, self.scoreboard, self.dictionary, PlayerTiles("GETHUT*"), 5))
+        self.assertNotEqual(key, get_cache_key(board, self.scoreboard, self.dictionary, PlayerTiles("GETHUTO"), None))
+        empty_board = Board(self.scoreboard.size, self.dictionary)
+        self.assertNotEqual(key, get_cache_key(empty_board, self.scoreboard, self.dictionary, PlayerTiles("GETHUTO"), 5))
+
+    def test_lru_and_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = SolveCache(2, directory)
+            cache.put("a", ["1||1A"])
+            cache.put("b", ["2||2B"])
+            self.assertEqual(cache.get("a"), ["1||1A"])
+            cache.put("c", ["3||3C"])
+            # b was the least recently used, so it is only on disk.
+            self.assertEqual(len(cache), 2)
+            self.assertEqual(cache.get("b"), ["2||2B"])
+            self.assertIsNone(cache.get("d"))
+            self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (2, 1, 1))
+
+            # A new cache reads the entries stored by the first.
+            cache = SolveCache(2, directory)
+            self.assertEqual(cache.get("c"), ["3||3C"])
+            self.assertEqual(cache.disk_hits, 1)
+
+            # Malformed entries are misses.
+            for (key, entry) in [("e", "[]"), ("f", '"solutions"'), ("g", '{"solutions": "1||1A"}'),
+                                 ("h", '{"solutions": [1]}'), ("i", "{")]:
+                with open(os.path.join(directory, f"{key}.json"), "w") as file:
+                    file.write(entry)
+                self.assertIsNone(cache.get(key), entry)
+
+        cache = SolveCache(1)
+        cache.put("a", ["1||1A"])
+        cache.put("b", ["2||2B"])
+        self.assertIsNone(cache.get("a"))
+
+    def test_solve_request(self):
+        cache = SolveCache()
+        request = {"state": self.state, "tiles": "GETHUTO", "k": 5}
+        with redirect_stdout(io.StringIO()):
+            expected = solve_request(self.scoreboard, self.dictionary, request)
+            first = solve_request(self.scoreboard, self.dictionary, request, cache)
+            second = solve_request(self.scoreboard, self.dictionary, {**request, "tiles": "OTUHTEG"}, cache)
+        self.assertEqual(first["solutions"], expected["solutions"])
+        self.assertEqual(second["solutions"], expected["solutions"])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_run_batch(self):
+        job = json.dumps({"state": self.state, "tiles": "GETHUTO", "k": 3})
+        jobs = "\n".join([job, json.dumps({"state": self.state, "tiles": "HUTOGET", "k": 3}), "not json", job])
+        for workers in [1, 2]:
+            with self.subTest(workers=workers):
+                cache = SolveCache()
+                output = io.StringIO()
+                with redirect_stderr(io.StringIO()):
+                    run_batch(self.scoreboard, self.dictionary, io.StringIO(jobs), output, workers, cache)
+                results = [json.loads(line) for line in output.getvalue().splitlines()]
+                self.assertEqual([result["id"] for result in results], [1, 2, 3, 4])
+                self.assertIn("error", results[2])
+                self.assertEqual(results[1]["solutions"], results[0]["solutions"])
+                self.assertEqual(results[3]["solutions"], results[0]["solutions"])
+                # With workers, the repeats are submitted while the first job is still being solved.
+                self.assertEqual(cache.hits, 2 if workers == 1 else 0)
+                self.assertEqual(len(cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from board import Board
+from fixtures import FixtureTestCase, load_test_board
+from player_tiles import PlayerTiles
+from search_budget import CancellationToken, SearchBudget
+from solver import solve, solve_iter, solve_top_k
+
+
+class TestSolver(FixtureTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        with redirect_stdout(io.StringIO()):
+            cls.board = load_test_board(cls.scoreboard, cls.dictionary, "test3")
+            cls.tiles = PlayerTiles("GETHUTO")
+            cls.solutions = solve(cls.board, cls.scoreboard, cls.dictionary, cls.tiles)
+
+    def test_solve_iter(self):
+        with redirect_stdout(io.StringIO()):
+            solutions = list(solve_iter(self.board, self.scoreboard, self.dictionary, self.tiles))
+
+        self.assertEqual(
+            sorted(solution.serialize() for solution in solutions),
+            sorted(solution.serialize() for solution in self.solutions),
+        )
+
+    def test_solve_workers(self):
+        with redirect_stdout(io.StringIO()):
+            solutions = solve(self.board, self.scoreboard, self.dictionary, self.tiles, workers=2)
+
+        self.assertEqual(
+            [solution.serialize() for solution in solutions],
+            [solution.serialize() for solution in self.solutions],
+        )
+
+    def test_solve_top_k(self):
+        for k in [0, 1, 5, 50, len(self.solutions) + 1]:
+            with self.subTest(k=k), redirect_stdout(io.StringIO()):
+                solutions = solve_top_k(self.board, self.scoreboard, self.dictionary, self.tiles, k)
+
+            self.assertEqual(
+                [solution.score for solution in solutions],
+                [solution.score for solution in self.solutions[:k]],
+            )
+            self.assertEqual(len(set(solution.serialize() for solution in solutions)), len(solutions))
+
+    def test_solve_budget(self):
+        all_solutions = set(solution.serialize() for solution in self.solutions)
+        unlimited = SearchBudget()
+        limited = SearchBudget(max_nodes=500)
+        token = CancellationToken()
+        token.cancel()
+        cancelled = SearchBudget(token=token)
+        with redirect_stdout(io.StringIO()):
+            solutions = solve(self.board, self.scoreboard, self.dictionary, self.tiles, budget=unlimited)
+            partial = solve(self.board, self.scoreboard, self.dictionary, self.tiles, budget=limited)
+            parallel = solve(self.board, self.scoreboard, self.dictionary, self.tiles, workers=2,
+                             budget=SearchBudget(max_nodes=300))
+            self.assertEqual(solve_top_k(self.board, self.scoreboard, self.dictionary, self.tiles, 5,
+                                         budget=cancelled), [])
+
+        # Without running out, the budget only reorders the search.
+        self.assertFalse(unlimited.is_exhausted)
+        self.assertEqual(set(solution.serialize() for solution in solutions), all_solutions)
+        self.assertTrue(limited.is_exhausted)
+        self.assertTrue(cancelled.is_exhausted)
+        self.assertGreater(len(partial), 0)
+        self.assertLess(len(partial), len(self.solutions))
+        self.assertLessEqual(set(solution.serialize() for solution in partial + parallel), all_solutions)
+        scores = [solution.score for solution in partial]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_no_anchors(self):
+        # A full board leaves nowhere to place a tile.
+        board = Board(self.scoreboard.size, self.dictionary)
+        board.load_state_text("\n".join([" ".join(["A"] * board.size.num_cols)] * board.size.num_rows))
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(solve(board, self.scoreboard, self.dictionary, self.tiles), [])
+            self.assertEqual(solve(board, self.scoreboard, self.dictionary, self.tiles, workers=2), [])
+            self.assertEqual(solve_top_k(board, self.scoreboard, self.dictionary, self.tiles, 5), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
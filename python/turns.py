@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 from enums import Shape
 from letter import Letter
 from placement import Placement
@@ -8,12 +8,21 @@ from range import Range
 
 
 class Turn:
-    """Stores the tile placements made in a player's current turn."""
+    """Stores the tile placements made in a player's current turn.
 
-    def __init__(self, placements: Dict[Position, Letter], range: Range, shape: Shape):
+    The solver also tracks the parts of the score as tiles are placed (see
+    scorer.calculate_tracked_score). A turn created without them leaves the
+    main word score as None.
+    """
+
+    def __init__(self, placements: Dict[Position, Letter], range: Range, shape: Shape,
+                 main_word_score: Optional[int] = None, word_multiplier: int = 1, cross_words_score: int = 0):
         self._placements = placements
         self._range = range
         self._shape = shape
+        self._main_word_score = main_word_score
+        self._word_multiplier = word_multiplier
+        self._cross_words_score = cross_words_score
 
     def __eq__(self, other: object):
         if not isinstance(other, Turn):
@@ -36,7 +45,8 @@ class Turn:
         return hash(value)
 
     def __copy__(self):
-        return Turn(self._placements.copy(), self._range, self._shape)
+        return Turn(self._placements.copy(), self._range, self._shape,
+                    self._main_word_score, self._word_multiplier, self._cross_words_score)
 
     def __str__(self):
         return f"{self._shape}\n{self._range}\n{self._placements}"
@@ -49,6 +59,28 @@ class Turn:
     def shape(self) -> Shape:
         return self._shape
 
+    @property
+    def num_placements(self) -> int:
+        return len(self._placements)
+
+    @property
+    def main_word_score(self) -> Optional[int]:
+        """The letter scores of the main word, before applying the word multiplier."""
+        return self._main_word_score
+
+    @property
+    def word_multiplier(self) -> int:
+        return self._word_multiplier
+
+    @property
+    def cross_words_score(self) -> int:
+        return self._cross_words_score
+
+    @property
+    def letters(self) -> Iterable[Letter]:
+        """The placed letters, in no particular order."""
+        return self._placements.values()
+
     def generate_placement_list(self) -> list[Placement]:
         """Converts the dictionary entries into a list of placements, in random order.
         """
@@ -56,18 +88,6 @@ class Turn:
             Placement(position, letter) for position, letter in self._placements.items()
         ]
 
-    def add_placement(self, placement: Placement):
-        self._placements[placement.position] = placement.letter
-
-    def update_range_start(self, start: Position):
-        self._range = Range(start, self._range.end)
-
-    def update_range_end(self, end: Position):
-        self._range = Range(self._range.start, end)
-
-    def get_tile_unchecked(self, position: Position) -> str:
-        return self._placements[position].val
-
     def get_tile_checked(self, position: Position) -> Optional[Letter]:
         return self._placements.get(position)
 
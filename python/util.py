@@ -1,29 +1,24 @@
 import time
 from functools import wraps
 
+import metrics
+
 
 def timer(func):
+    """Records the duration of each call in the phase_seconds histogram, labelled by the function.
+
+    While metrics are disabled, the function is called without timing it.
+    """
+    phase = f"{func.__module__}.{func.__name__}"
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        print(
-            f"Execution time for {func.__module__}.{func.__name__}: {(end_time - start_time):.3f} seconds"
-        )
-        return result
+        if metrics.get_registry() is None:
+            return func(*args, **kwargs)
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.observe("phase_seconds", time.perf_counter() - start_time, {"phase": phase})
 
     return wrapper
-
-
-def get_all_substrings(word: str) -> set[str]:
-    """Returns a set all substrings of the given word.
-
-    Valid substrings are the word itself, all single letters and
-    everything in between.
-    """
-    substrings: set[str] = set()
-    for substring_len in range(1, len(word) + 1):
-        for start_index in range(len(word) - substring_len + 1):
-            substrings.add(word[start_index : (start_index + substring_len)])
-    return substrings